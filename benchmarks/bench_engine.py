@@ -0,0 +1,123 @@
+"""
+Micro-benchmarks for SentimentEngine: routing, analyze_statement on each
+backend, and conversation analysis at growing history lengths.
+
+Everything runs offline: the multilingual API is a local stub server and
+the Hinglish backend is a tiny random RoBERTa unless --hinglish-model
+points at a real save_pretrained directory.
+
+Run from the repository root:
+    python -m benchmarks.bench_engine [--output engine.json]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from benchmarks.bench_routing import MESSAGES
+from benchmarks.results import latency_metrics, print_results, result, write_results
+from src.analytics import ConversationAggregator
+from src.backends import AsyncRemoteBackend, LocalPipelineBackend, RemoteMultilingualBackend
+from src.sentiment import SentimentEngine
+from src.testing import StubInferenceServer, build_tiny_model
+
+HINGLISH = ["yeh bahut acha hai bhai", "kya mast movie hai yaar", "bhai yeh bekaar hai", "nahi yaar acha nahi"]
+HISTORY_LENGTHS = (10, 100, 1000, 10000)
+
+
+def timed_calls(fn, args, repeat):
+    samples = []
+    for _ in range(repeat):
+        for arg in args:
+            start = time.perf_counter()
+            fn(arg)
+            samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_routing(engine, repeat):
+    # langdetect loads on the first tie-break; keep that out of the numbers
+    timed_calls(engine._is_hinglish, MESSAGES, 1)
+    return result("route.is_hinglish", latency_metrics(timed_calls(engine._is_hinglish, MESSAGES, repeat)))
+
+
+def bench_backends(hinglish_model_path, stub_url, repeat):
+    vader_engine = SentimentEngine()
+    vader_engine.use_vader = True
+
+    remote_engines = {
+        'remote': remote_only_engine(RemoteMultilingualBackend(stub_url, timeout=5.0)),
+        'remote_async': remote_only_engine(AsyncRemoteBackend(stub_url, timeout=5.0)),
+        'remote_async_batched': remote_only_engine(AsyncRemoteBackend(stub_url, timeout=5.0, batch_inputs=True)),
+    }
+
+    hinglish_engine = SentimentEngine(hinglish_backend=LocalPipelineBackend("hinglish", model_path=hinglish_model_path))
+
+    results = []
+    for backend, engine, texts in (('vader', vader_engine, MESSAGES),
+                                   ('remote', remote_engines['remote'], MESSAGES),
+                                   ('remote_async', remote_engines['remote_async'], MESSAGES),
+                                   ('hinglish', hinglish_engine, HINGLISH)):
+        engine.analyze_statement(texts[0]) # warm up lazy loading
+        samples = timed_calls(engine.analyze_statement, texts, repeat)
+        results.append(result("analyze_statement", latency_metrics(samples), backend=backend))
+
+    # A whole batch of remote statements (the micro-batcher's case)
+    for backend, engine in remote_engines.items():
+        engine.analyze_many(MESSAGES[:1])
+        samples = timed_calls(engine.analyze_many, [MESSAGES], repeat)
+        results.append(result("analyze_many", latency_metrics(samples), backend=backend, batch=len(MESSAGES)))
+    return results
+
+
+def remote_only_engine(backend):
+    engine = SentimentEngine(
+        multilingual_backend=backend,
+        hinglish_backend=LocalPipelineBackend("none", pipeline_factory=lambda: None)
+    )
+    engine.has_hinglish_model = False
+    return engine
+
+
+def bench_conversation(repeat):
+    engine = SentimentEngine()
+    results = []
+    for length in HISTORY_LENGTHS:
+        statements = [{'compound': ((i * 37) % 200 - 100) / 100} for i in range(length)]
+        samples = timed_calls(engine.analyze_conversation, [statements], repeat)
+        results.append(result("analyze_conversation", latency_metrics(samples), history=length))
+
+        aggregator = ConversationAggregator()
+        for statement in statements:
+            aggregator.add(statement['compound'])
+        samples = timed_calls(lambda _: aggregator.summary(), [None], repeat)
+        results.append(result("aggregator.summary", latency_metrics(samples), history=length))
+        samples = timed_calls(lambda _: aggregator.trends(), [None], repeat)
+        results.append(result("aggregator.trends", latency_metrics(samples), history=length))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Engine micro-benchmarks.")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--stub-latency-ms", type=float, default=20.0)
+    parser.add_argument("--hinglish-model", help="save_pretrained directory of the Hinglish model")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp, StubInferenceServer(args.stub_latency_ms) as stub:
+        model_path = args.hinglish_model or build_tiny_model(tmp)
+        results = [bench_routing(SentimentEngine(), args.repeat)]
+        results += bench_backends(model_path, stub.url, args.repeat)
+        results += bench_conversation(args.repeat)
+
+    print_results(results)
+    if args.output:
+        write_results(args.output, "engine", results)
+    return results
+
+
+if __name__ == '__main__':
+    main()
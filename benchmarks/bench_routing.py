@@ -0,0 +1,76 @@
+"""
+Compares the precompiled LanguageRouter against the previous per-call
+langdetect routing.
+
+Run from the repository root:
+    python -m benchmarks.bench_routing
+"""
+import sys
+import time
+
+from langdetect import detect, DetectorFactory, LangDetectException
+
+from src.routing import LanguageRouter
+from src.sentiment import SentimentEngine
+
+MESSAGES = [
+    "tu mujhe pasandh heh",
+    "yeh bahut acha hai bhai",
+    "I am happy",
+    "मुझे यह पसंद है",
+    "This is absolutely amazing!",
+    "kya haal hai bhai, sab theek?",
+    "The service was slow and the food was cold.",
+    "ok ab chalo",
+    "thanks",
+    "bhai sahi hai",
+]
+
+
+def legacy_is_hinglish(text, hinglish_words):
+    """
+    The routing SentimentEngine used before LanguageRouter (minus its prints).
+    """
+    try:
+        lang = detect(text)
+    except LangDetectException:
+        lang = None
+    if any('\u0900' <= char <= '\u097F' for char in text):
+        return False
+    words = set(text.lower().split())
+    if lang == 'hi':
+        return True
+    return bool(words.intersection(hinglish_words))
+
+
+def time_per_call(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in MESSAGES:
+            fn(text)
+    return (time.perf_counter() - start) / (repeat * len(MESSAGES))
+
+
+def main(repeat=20, required_speedup=10):
+    DetectorFactory.seed = 0
+    engine = SentimentEngine()
+
+    legacy = time_per_call(lambda t: legacy_is_hinglish(t, engine.hinglish_words), repeat)
+
+    # Without the tie-break memo every message pays full price, as if unseen
+    cold_router = LanguageRouter(engine.hinglish_words, memo_size=0)
+    # Warm up first so the one-off lazy langdetect import is not timed
+    time_per_call(cold_router.is_hinglish, 1)
+    cold = time_per_call(cold_router.is_hinglish, repeat)
+    time_per_call(engine.router.is_hinglish, 1)
+    warm = time_per_call(engine.router.is_hinglish, repeat * 10)
+
+    speedup = legacy / cold
+    print(f"legacy langdetect routing : {legacy * 1e6:10.1f} us/message")
+    print(f"LanguageRouter (no memo)  : {cold * 1e6:10.1f} us/message  ({speedup:.1f}x)")
+    print(f"LanguageRouter (memo)     : {warm * 1e6:10.1f} us/message  ({legacy / warm:.1f}x)")
+    return 0 if speedup >= required_speedup else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
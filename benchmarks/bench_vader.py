@@ -0,0 +1,54 @@
+"""
+Compares per-message VADER polarity_scores against the batched BatchVader
+path used when the models are unavailable.
+
+Run from the repository root:
+    python -m benchmarks.bench_vader
+"""
+import sys
+import time
+
+from nltk.sentiment.vader import SentimentIntensityAnalyzer
+
+from src.vader import BatchVader
+
+MESSAGES = [
+    "I am happy",
+    "This is absolutely amazing!",
+    "The service was slow and the food was cold.",
+    "thanks, that was helpful",
+    "I hate waiting in line",
+    "Worst experience EVER!!",
+    "ok see you tomorrow",
+    "I'm not sure this is what I wanted",
+    "great job, loved it :)",
+    "why is this so complicated??",
+]
+
+
+def main(batch_size=1000, repeat=5, required_speedup=3):
+    analyzer = SentimentIntensityAnalyzer()
+    batch = BatchVader(analyzer)
+    texts = (MESSAGES * (batch_size // len(MESSAGES) + 1))[:batch_size]
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        expected = [analyzer.polarity_scores(text) for text in texts]
+    per_message = (time.perf_counter() - start) / repeat
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        actual = batch.analyze_many(texts)
+    batched = (time.perf_counter() - start) / repeat
+
+    drift = max(abs(e[key] - a[key]) for e, a in zip(expected, actual) for key in e)
+    speedup = per_message / batched
+    print(f"polarity_scores loop: {batch_size / per_message:10.0f} messages/s")
+    print(f"BatchVader:           {batch_size / batched:10.0f} messages/s  ({speedup:.1f}x)")
+    print(f"fast path: {batch.fast_path_hits / (batch.fast_path_hits + batch.fallbacks):.0%} of messages, "
+          f"max drift {drift:.4f}")
+    return speedup >= required_speedup
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,30 @@
+"""
+Compares two benchmark result files and exits non-zero on regressions.
+
+Run from the repository root:
+    python -m benchmarks.compare baseline.json current.json [--tolerance 0.1]
+"""
+import argparse
+import sys
+
+from benchmarks.results import compare, load_results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="relative change allowed before a metric counts as a regression (default: 0.10)")
+    args = parser.parse_args(argv)
+
+    regressions = compare(load_results(args.baseline), load_results(args.current), args.tolerance)
+    for metric, old, new, change in regressions:
+        print(f"REGRESSION {metric}: {old:g} -> {new:g} ({change:+.1%})")
+    if not regressions:
+        print(f"No regressions beyond {args.tolerance:.0%}.")
+    return not regressions
+
+
+if __name__ == '__main__':
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,96 @@
+"""
+In-process load test of the FastAPI app.
+
+Virtual users (one session each) post /chat back to back through an ASGI
+transport, at increasing concurrency. The multilingual API is a local stub
+server with a fixed latency and the Hinglish backend a tiny random RoBERTa,
+so runs are reproducible offline. Reports p50/p95/p99 latency, successful
+requests/s and rejected (503/504) requests per level.
+
+Run from the repository root:
+    python -m benchmarks.load_test [--levels 1 4 16 64] [--output load.json]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+# Simulated users send back to back; measure capacity, not the per-session limit
+os.environ.setdefault("RATE_LIMIT_SESSION_PER_S", "0")
+
+import httpx
+
+from benchmarks.bench_routing import MESSAGES
+from benchmarks.results import latency_metrics, print_results, result, write_results
+from src.backends import LocalPipelineBackend, RemoteMultilingualBackend
+from src.registry import register_engine
+from src.sentiment import SentimentEngine
+from src.testing import StubInferenceServer, build_tiny_model
+
+
+async def run_level(client, concurrency, requests_per_user):
+    latencies = []
+    statuses = {}
+
+    async def user(n):
+        cookies = {'user_id': f"load-{concurrency}-{n}"}
+        for i in range(requests_per_user):
+            message = MESSAGES[(n + i) % len(MESSAGES)]
+            start = time.perf_counter()
+            response = await client.post("/chat", json={'message': message, 'since': 0}, cookies=cookies)
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user(n) for n in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    metrics = latency_metrics(latencies, unit='ms')
+    metrics['requests_per_s'] = round(statuses.get(200, 0) / elapsed, 2)
+    metrics['rejected'] = sum(count for status, count in statuses.items() if status in (503, 504))
+    metrics['errors'] = sum(count for status, count in statuses.items() if status != 200) - metrics['rejected']
+    return result("load.chat", metrics, concurrency=concurrency)
+
+
+async def run(levels, requests_per_user):
+    import main_api
+
+    await main_api.startup_event()
+    main_api.model_loader.wait()
+    try:
+        transport = httpx.ASGITransport(app=main_api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            # Warm up lazy model and langdetect loading outside the measured levels
+            for message in MESSAGES:
+                await client.post("/chat", json={'message': message}, cookies={'user_id': 'warmup'})
+            return [await run_level(client, level, requests_per_user) for level in levels]
+    finally:
+        await main_api.shutdown_event()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test /chat at increasing concurrency.")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--requests-per-user", type=int, default=20)
+    parser.add_argument("--stub-latency-ms", type=float, default=20.0)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp, StubInferenceServer(args.stub_latency_ms) as stub:
+        # Installed before main_api starts, so its startup wraps this engine
+        register_engine(SentimentEngine(
+            multilingual_backend=RemoteMultilingualBackend(stub.url, timeout=5.0),
+            hinglish_backend=LocalPipelineBackend("tiny-hinglish", model_path=build_tiny_model(tmp))
+        ))
+        results = asyncio.run(run(args.levels, args.requests_per_user))
+
+    print_results(results)
+    if args.output:
+        write_results(args.output, "load", results)
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+JSON results format shared by the benchmark suite.
+
+A results file looks like:
+
+    {
+      "suite": "engine",
+      "created": "2026-01-01T12:00:00+00:00",
+      "environment": {"git_commit": "...", "python": "3.11.7", "platform": "...", "cpu_count": 8},
+      "results": [
+        {"name": "route.is_hinglish", "params": {}, "metrics": {"mean_us": 4.1, "p95_us": 6.0}},
+        {"name": "load.chat", "params": {"concurrency": 16}, "metrics": {"p99_ms": 41.0, "requests_per_s": 380.0}}
+      ]
+    }
+
+A result is identified by name plus params, so two runs can be compared
+with `python -m benchmarks.compare baseline.json current.json`. Metrics
+ending in `_per_s` are throughputs (higher is better); every other metric
+is a latency or error count (lower is better).
+"""
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+
+def percentile(samples, q):
+    """
+    Linear-interpolated q-th percentile (0-100) of samples.
+    """
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * q / 100
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def latency_metrics(samples, unit='us'):
+    """
+    Summarizes latencies given in seconds as mean/p50/p95/p99 in unit
+    ('us' or 'ms').
+    """
+    scale = 1e6 if unit == 'us' else 1e3
+    return {
+        f'mean_{unit}': round(statistics.fmean(samples) * scale, 3),
+        f'p50_{unit}': round(percentile(samples, 50) * scale, 3),
+        f'p95_{unit}': round(percentile(samples, 95) * scale, 3),
+        f'p99_{unit}': round(percentile(samples, 99) * scale, 3),
+    }
+
+
+def result(name, metrics, **params):
+    return {'name': name, 'params': params, 'metrics': metrics}
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'git_commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def write_results(path, suite, results):
+    document = {
+        'suite': suite,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'environment': environment(),
+        'results': results,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2)
+        f.write('\n')
+    return document
+
+
+def load_results(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _key(entry):
+    return entry['name'], json.dumps(entry['params'], sort_keys=True)
+
+
+def compare(baseline, current, tolerance=0.10):
+    """
+    Returns (metric, baseline value, current value, relative change) for
+    every metric of current that got worse than baseline by more than
+    tolerance. Results missing from either run are ignored.
+    """
+    previous = {_key(entry): entry['metrics'] for entry in baseline['results']}
+    regressions = []
+    for entry in current['results']:
+        before = previous.get(_key(entry))
+        if before is None:
+            continue
+        for metric, value in entry['metrics'].items():
+            old = before.get(metric)
+            if not old:
+                continue
+            change = (value - old) / old
+            worse = -change if metric.endswith('_per_s') else change
+            if worse > tolerance:
+                label = entry['name'] + (f" {entry['params']}" if entry['params'] else "")
+                regressions.append((f"{label} {metric}", old, value, change))
+    return regressions
+
+
+def print_results(results, out=sys.stdout):
+    for entry in results:
+        params = " ".join(f"{k}={v}" for k, v in entry['params'].items())
+        metrics = "  ".join(f"{k}={v:g}" for k, v in entry['metrics'].items())
+        print(f"{entry['name']:<32} {params:<18} {metrics}", file=out)
@@ -1,13 +1,31 @@
-from fastapi import FastAPI, Request, Response, Depends
+from fastapi import FastAPI, Request, Response, Depends, WebSocket, WebSocketDisconnect
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
+from src.analytics import ConversationAggregator
 from src.chatbot import Chatbot
+import os
+import json
+import logging
+import math
+import time
 import uuid
-from typing import Dict, Optional
+from typing import Optional
 
-from src.sentiment import SentimentEngine
+from src.registry import get_engine
+from src.batching import MicroBatcher
+from src.executor import CommitGuard, InferenceExecutor, ExecutorSaturated, InferenceTimeout
+from src.ratelimit import RateLimiter, RateLimited
+from src.session_store import SessionConflict, create_session_store
+from src.logging_config import configure_logging, stop_logging
+from src.lifecycle import ModelLoader
+from src.conversation import turns_to_json
+from src import metrics
+
+configure_logging()
+logger = logging.getLogger("main_api")
 
 app = FastAPI()
 
@@ -19,45 +37,146 @@ templates = Jinja2Templates(directory="templates")
 
 # Global Sentiment Engine (Initialized on startup)
 global_sentiment_engine = None
+# Preloads and warms up the models (MODEL_PRELOAD=background|sync|off); /readyz reports it
+model_loader = None
+
+# Blocking inference runs here instead of on the event loop
+inference_executor = InferenceExecutor(
+    max_workers=int(os.getenv("INFERENCE_WORKERS", "4")),
+    max_queue_depth=int(os.getenv("INFERENCE_QUEUE_DEPTH", "32")),
+    timeout=float(os.getenv("INFERENCE_TIMEOUT_S", "15")),
+    retry_after=int(os.getenv("INFERENCE_RETRY_AFTER_S", "1")),
+    # Waiting jobs are served round-robin per session; this caps one session's share
+    max_queue_per_key=int(os.getenv("INFERENCE_QUEUE_PER_SESSION", "4"))
+)
+
+# Token buckets per session and for the whole process (a rate of 0 disables a limit)
+rate_limiter = RateLimiter(
+    session_rate=float(os.getenv("RATE_LIMIT_SESSION_PER_S", "2")),
+    session_burst=float(os.getenv("RATE_LIMIT_SESSION_BURST", "10")),
+    global_rate=float(os.getenv("RATE_LIMIT_GLOBAL_PER_S", "0")),
+    global_burst=float(os.getenv("RATE_LIMIT_GLOBAL_BURST", "0")),
+    max_sessions=int(os.getenv("RATE_LIMIT_MAX_SESSIONS", "100000"))
+)
 
 @app.on_event("startup")
 async def startup_event():
-    global global_sentiment_engine
-    print("--- STARTUP: Initializing Global Sentiment Engine ---")
-    global_sentiment_engine = SentimentEngine()
-    print("--- STARTUP: Sentiment Engine Ready ---")
+    global global_sentiment_engine, model_loader
+    logger.info("--- STARTUP: Initializing Global Sentiment Engine ---")
+    # Concurrent requests are coalesced into batches before hitting the models
+    # The engine itself is the process-wide shared one; its models load on first use
+    global_sentiment_engine = MicroBatcher(
+        get_engine(),
+        max_batch_size=int(os.getenv("SENTIMENT_BATCH_SIZE", "16")),
+        max_wait_ms=float(os.getenv("SENTIMENT_BATCH_WAIT_MS", "5")),
+        max_workers=int(os.getenv("SENTIMENT_BATCH_WORKERS", "4"))
+    )
+    metrics.BATCHER_PENDING.set_function(lambda: global_sentiment_engine.pending)
+    model_loader = ModelLoader(
+        get_engine(),
+        mode=os.getenv("MODEL_PRELOAD", "background").lower(),
+        warm_up=os.getenv("MODEL_WARMUP", "1") != "0"
+    ).start()
+    logger.info("--- STARTUP: Sentiment Engine Ready ---")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    inference_executor.shutdown()
+    if global_sentiment_engine:
+        global_sentiment_engine.close()
+    stop_logging()
+
+@app.exception_handler(ExecutorSaturated)
+async def executor_saturated_handler(request: Request, exc: ExecutorSaturated):
+    return JSONResponse(
+        status_code=503,
+        content={'detail': 'Server is busy, please retry shortly.'},
+        headers={'Retry-After': str(exc.retry_after)}
+    )
+
+@app.exception_handler(RateLimited)
+async def rate_limited_handler(request: Request, exc: RateLimited):
+    return JSONResponse(
+        status_code=429,
+        content={'detail': 'Too many requests, please slow down.'},
+        headers={'Retry-After': str(max(1, math.ceil(exc.retry_after)))}
+    )
 
-# In-memory storage
+@app.exception_handler(SessionConflict)
+async def session_conflict_handler(request: Request, exc: SessionConflict):
+    return JSONResponse(status_code=409, content={'detail': 'The session changed concurrently, please retry.'})
+
+@app.exception_handler(InferenceTimeout)
+async def inference_timeout_handler(request: Request, exc: InferenceTimeout):
+    return JSONResponse(status_code=504, content={'detail': 'Sentiment analysis timed out.'})
+
+# Streaming trend estimators; ANALYTICS_MAX_SCORES caps the per-session score
+# history so a saved session stays bounded (0 keeps every score)
+analytics_options = dict(
+    ewma_alpha=float(os.getenv("TREND_EWMA_ALPHA", "0.3")),
+    window=int(os.getenv("TREND_WINDOW", "20")),
+    max_scores=int(os.getenv("ANALYTICS_MAX_SCORES", "1000")) or None
+)
+
+# /analysis for a user without a session
+EMPTY_ANALYSIS = {
+    'compound': 0,
+    'label': 'Neutral',
+    'trend': 'No data',
+    'trends': ConversationAggregator(**analytics_options).trends(),
+    'history_scores': []
+}
+
+def new_chatbot():
+    # Inject the shared engine; sessions never load models of their own
+    return Chatbot(
+        sentiment_engine=global_sentiment_engine,
+        max_history=int(os.getenv("SESSION_MAX_HISTORY", "200")),
+        analytics_options=analytics_options
+    )
+
+# Session storage (in-process LRU by default, sqlite with SESSION_BACKEND=sqlite)
 # Key: user_id (str), Value: Chatbot instance
-chatbots: Dict[str, Chatbot] = {}
+session_store = create_session_store(new_chatbot)
+
+# Gauges read at scrape time
+metrics.INFERENCE_IN_FLIGHT.set_function(lambda: inference_executor.in_flight)
+metrics.INFERENCE_QUEUE_DEPTH.set_function(lambda: inference_executor.queue_depth)
+metrics.ACTIVE_SESSIONS.set_function(lambda: len(session_store))
+
+# Endpoints timed by the middleware; anything else is reported as 'other'
+TIMED_ENDPOINTS = {"/", "/chat", "/analysis", "/history", "/reset"}
+
+@app.middleware("http")
+async def time_requests(request: Request, call_next):
+    start = time.perf_counter()
+    try:
+        return await call_next(request)
+    finally:
+        path = request.url.path
+        metrics.REQUEST_SECONDS.observe(
+            time.perf_counter() - start, endpoint=path if path in TIMED_ENDPOINTS else 'other'
+        )
 
 class ChatRequest(BaseModel):
     message: str
+    # Opt-in delta mode: when set, 'history' only holds turns from this sequence number on
+    since: Optional[int] = None
 
 def get_user_id(request: Request):
     return request.cookies.get("user_id")
 
+def check_rate_limit(user_id, client):
+    # Requests without a session cookie are limited per client address instead
+    key = user_id or f"ip:{client.host if client else 'unknown'}"
+    try:
+        rate_limiter.check(key)
+    except RateLimited as e:
+        metrics.RATE_LIMITED.inc(scope=e.scope)
+        raise
+
 def get_chatbot(user_id: str):
-    if user_id not in chatbots:
-        # Pass the global engine to the chatbot
-        # We need to modify Chatbot class to accept an engine, or we can just inject it here
-        # For now, let's assume Chatbot creates its own, BUT we want to share the client.
-        # Better approach: Modify Chatbot to accept an engine.
-        # Since we can't easily change Chatbot signature without breaking other things,
-        # let's just make Chatbot use the global one if available.
-        
-        # Actually, let's just modify Chatbot to take an engine argument
-        # But wait, Chatbot imports SentimentEngine inside itself.
-        # Let's do a quick monkey-patch or just instantiate it.
-        # The cleanest way is to pass it.
-        
-        bot = Chatbot()
-        # Inject the already initialized engine to avoid re-initializing
-        if global_sentiment_engine:
-            bot.sentiment_engine = global_sentiment_engine
-            
-        chatbots[user_id] = bot
-    return chatbots[user_id]
+    return session_store.get(user_id)
 
 @app.get("/")
 async def index(request: Request):
@@ -73,6 +192,7 @@ async def index(request: Request):
 @app.post("/chat")
 async def chat(chat_request: ChatRequest, request: Request, response: Response):
     user_id = request.cookies.get("user_id")
+    check_rate_limit(user_id, request.client)
     
     # Handle case where cookie might be missing (e.g. direct API call without visiting root first)
     if not user_id:
@@ -80,48 +200,209 @@ async def chat(chat_request: ChatRequest, request: Request, response: Response):
         # We can't easily set a cookie on the response here if we are returning a direct dict/JSON
         # unless we use JSONResponse.
         
-    bot = get_chatbot(user_id)
-    bot_response = bot.process_user_input(chat_request.message)
-    
-    json_response = JSONResponse(content={
-        'bot_response': bot_response['response'],
-        'user_sentiment': bot_response['user_sentiment'],
-        'history': bot.history
-    })
+    guard = CommitGuard()
+
+    def run_chat():
+        bot, result = run_turn(user_id, chat_request.message, guard)
+        if result is None:
+            return None
+        # Serialized here, while this job is the only one touching the session
+        with metrics.STAGE_SECONDS.time(stage='serialize'):
+            history = bot.history if chat_request.since is None else bot.turns_since(chat_request.since)
+            return {
+                'bot_response': result['response'],
+                'user_sentiment': result['user_sentiment'],
+                'history': turns_to_json(history),
+                'cursor': bot.cursor
+            }
+
+    content = await run_guarded(run_chat, user_id, guard)
+    json_response = JSONResponse(content=content)
     
     if not request.cookies.get("user_id"):
         json_response.set_cookie(key="user_id", value=user_id)
         
     return json_response
 
+# Attempts to record a turn when the session keeps changing under it
+SESSION_SAVE_ATTEMPTS = 5
+
+def run_turn(user_id, message, guard):
+    """
+    Scores message and records the turn in user_id's session. Runs on the
+    inference executor, which runs one job per session at a time. The turn
+    is recorded only if the request is still waiting (see CommitGuard);
+    otherwise result is None. If the session changed before the save (a
+    reset, or another worker), the turn is recorded again on the fresh
+    session; the message is scored only once.
+    """
+    analysis = None
+    for _ in range(SESSION_SAVE_ATTEMPTS):
+        bot = get_chatbot(user_id)
+        if analysis is None:
+            analysis = bot.sentiment_engine.analyze_statement(message)
+        if not guard.commit():
+            return bot, None
+        result = bot.add_turn(message, analysis)
+        try:
+            session_store.save(user_id, bot)
+        except SessionConflict:
+            continue
+        return bot, result
+    raise SessionConflict(user_id)
+
+async def run_guarded(fn, user_id, guard):
+    try:
+        return await inference_executor.run(fn, key=user_id)
+    except InferenceTimeout:
+        guard.abandon()
+        raise
+
+async def load_session(user_id):
+    # Session reads stay off the inference pool, so they work while it is saturated
+    if not user_id:
+        return None
+    return await run_in_threadpool(session_store.get, user_id, False)
+
 @app.get("/analysis")
 async def analysis(request: Request):
-    user_id = request.cookies.get("user_id")
-    if not user_id or user_id not in chatbots:
-        return JSONResponse(content={
-            'compound': 0,
-            'label': 'Neutral',
-            'trend': 'No data',
-            'history_scores': []
-        })
+    bot = await load_session(request.cookies.get("user_id"))
+    if bot is None:
+        return JSONResponse(content=EMPTY_ANALYSIS)
         
-    bot = chatbots[user_id]
-    analysis_result = bot.get_final_analysis()
-    
-    # Add the raw history of scores for the graph
-    # We extract just the compound scores from the user statements analysis
-    history_scores = [s['compound'] for s in bot.user_statements_analysis]
-    analysis_result['history_scores'] = history_scores
-    
+    return analysis_payload(bot)
+
+def analysis_payload(bot):
+    # Served from the session's running aggregates, no per-poll rescans
+    if bot is None:
+        return EMPTY_ANALYSIS
+    with bot.lock:
+        analysis_result = bot.get_final_analysis()
+        analysis_result['trends'] = bot.analytics.trends()
+
+        # Add the raw history of scores for the graph
+        analysis_result['history_scores'] = bot.analytics.scores.tolist()
+
     return analysis_result
 
+@app.get("/history")
+async def history(request: Request, offset: int = 0, limit: int = 50):
+    bot = await load_session(request.cookies.get("user_id"))
+    if bot is None:
+        return {'turns': [], 'offset': 0, 'next': None, 'cursor': 0}
+
+    limit = max(1, min(limit, 200))
+    with bot.lock:
+        start = max(offset, bot.history_offset)
+        turns = bot.history_page(start, limit)
+        end = start + len(turns)
+        return {
+            'turns': turns_to_json(turns),
+            'offset': start,
+            'next': end if end < bot.cursor else None,
+            'cursor': bot.cursor
+        }
+
 @app.post("/reset")
 async def reset(request: Request):
     user_id = request.cookies.get("user_id")
     if user_id:
-        chatbots[user_id] = Chatbot()
+        await run_in_threadpool(session_store.reset, user_id)
     return {"status": "reset"}
 
+@app.websocket("/ws")
+async def chat_stream(websocket: WebSocket):
+    """
+    One connection per session. The client sends {"message": ...}; for each
+    message the server pushes, in order:
+        {"type": "sentiment", "seq", "sentiment"}   the user turn, once scored
+        {"type": "reply", "seq", "content"}          the bot turn
+        {"type": "analysis", "score", ...summary}    the updated aggregate
+    The events go out once the turn is persisted, and the aggregate carries
+    only the new score; the full score history is sent once, in the
+    {"type": "session"} event on connect.
+    """
+    await websocket.accept()
+    user_id = websocket.cookies.get("user_id") or str(uuid.uuid4())
+
+    bot = await load_session(user_id)
+    snapshot = analysis_payload(bot)
+    await websocket.send_json({
+        'type': 'session', 'user_id': user_id, 'cursor': bot.cursor if bot else 0, 'analysis': snapshot
+    })
+
+    try:
+        while True:
+            try:
+                payload = json.loads(await websocket.receive_text())
+            except ValueError:
+                payload = None
+            message = payload.get('message') if isinstance(payload, dict) else None
+            if not isinstance(message, str) or not message.strip():
+                await websocket.send_json({'type': 'error', 'status': 422, 'detail': "Expected {\"message\": \"...\"}"})
+                continue
+            await _stream_turn(websocket, user_id, message)
+    except WebSocketDisconnect:
+        pass
+
+async def _stream_turn(websocket, user_id, message):
+    start = time.perf_counter()
+    try:
+        check_rate_limit(user_id, websocket.client)
+
+        guard = CommitGuard()
+
+        def run_chat():
+            bot, result = run_turn(user_id, message, guard)
+            if result is None:
+                return None
+            summary = bot.get_final_analysis()
+            summary.update(type='analysis', score=result['user_sentiment']['compound'], cursor=bot.cursor,
+                           trends=bot.analytics.trends())
+            return bot.cursor - 2, result, summary
+
+        seq, result, summary = await run_guarded(run_chat, user_id, guard)
+        await websocket.send_json({'type': 'sentiment', 'seq': seq, 'sentiment': result['user_sentiment']})
+        await websocket.send_json({'type': 'reply', 'seq': seq + 1, 'content': result['response']})
+        await websocket.send_json(summary)
+    except ExecutorSaturated as exc:
+        await websocket.send_json({
+            'type': 'error', 'status': 503, 'detail': 'Server is busy, please retry shortly.',
+            'retry_after': exc.retry_after
+        })
+    except RateLimited as exc:
+        await websocket.send_json({
+            'type': 'error', 'status': 429, 'detail': 'Too many requests, please slow down.',
+            'retry_after': exc.retry_after
+        })
+    except InferenceTimeout:
+        await websocket.send_json({'type': 'error', 'status': 504, 'detail': 'Sentiment analysis timed out.'})
+    except SessionConflict:
+        await websocket.send_json({'type': 'error', 'status': 409, 'detail': 'The session changed concurrently, please retry.'})
+    except WebSocketDisconnect:
+        raise
+    except Exception:
+        # Report the failed turn and keep the connection for the next one
+        logger.exception("WebSocket turn failed")
+        await websocket.send_json({'type': 'error', 'status': 500, 'detail': 'Internal server error.'})
+    finally:
+        metrics.REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint='/ws')
+
+@app.get("/healthz")
+async def healthz():
+    # Liveness: the process serves requests, whether or not models are loaded
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    # Readiness: models preloaded and warmed up
+    status = model_loader.status() if model_loader else {'status': 'starting'}
+    return JSONResponse(status_code=200 if status['status'] == 'ready' else 503, content=status)
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main_api:app", host="127.0.0.1", port=8000, reload=True)
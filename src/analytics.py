@@ -0,0 +1,287 @@
+from array import array
+from collections import deque
+from itertools import islice
+
+
+def conversation_label(compound_score):
+    if compound_score >= 0.1:
+        return 'Positive'
+    elif compound_score <= -0.1:
+        return 'Negative'
+    else:
+        return 'Neutral'
+
+
+def conversation_trend(mean_first, mean_second):
+    """
+    Compares the mean sentiment of the first and second half of a conversation.
+    """
+    if mean_second - mean_first > 0.2:
+        return "Improving"
+    elif mean_first - mean_second > 0.2:
+        return "Declining"
+    return "Stable"
+
+
+def trend_from_change(change):
+    """
+    Labels an estimated change in mean sentiment with the same threshold as
+    conversation_trend.
+    """
+    return conversation_trend(0.0, change)
+
+
+class EwmaTrend:
+    """
+    Exponentially weighted moving average of the scores: each new score
+    gets weight alpha and the older ones decay geometrically, so the value
+    follows recent messages however long the conversation is. The trend
+    compares it with the conversation's overall mean.
+    """
+    __slots__ = ('alpha', 'value', 'count')
+
+    def __init__(self, alpha=0.3):
+        if not 0 < alpha <= 1:
+            raise ValueError("alpha must be in (0, 1]")
+        self.alpha = alpha
+        self.value = 0.0
+        self.count = 0
+
+    def add(self, compound):
+        if self.count == 0:
+            self.value = compound
+        else:
+            self.value += self.alpha * (compound - self.value)
+        self.count += 1
+
+    def summary(self, overall_mean):
+        if self.count == 0:
+            return {'value': None, 'alpha': self.alpha, 'trend': 'No data'}
+        trend = conversation_trend(overall_mean, self.value) if self.count > 1 else "Stable"
+        return {'value': self.value, 'alpha': self.alpha, 'trend': trend}
+
+    def to_state(self):
+        return {'value': self.value, 'count': self.count}
+
+    def load_state(self, state):
+        self.value = state['value']
+        self.count = state['count']
+
+
+class WindowTrend:
+    """
+    Mean of the last `size` scores, with the half-split trend applied to
+    that window only: fixed memory, and as responsive after a thousand
+    messages as after ten.
+    """
+    __slots__ = ('size', 'values')
+
+    def __init__(self, size=20):
+        if size < 2:
+            raise ValueError("size must be at least 2")
+        self.size = size
+        self.values = deque(maxlen=size)
+
+    def add(self, compound):
+        self.values.append(compound)
+
+    def summary(self):
+        n = len(self.values)
+        if n == 0:
+            return {'mean': None, 'size': self.size, 'count': 0, 'trend': 'No data'}
+        total = sum(self.values)
+        trend = "Stable"
+        if n > 1:
+            half = n // 2
+            first = sum(islice(self.values, half))
+            trend = conversation_trend(first / half, (total - first) / (n - half))
+        return {'mean': total / n, 'size': self.size, 'count': n, 'trend': trend}
+
+    def to_state(self):
+        return {'values': list(self.values)}
+
+    def load_state(self, state):
+        self.values = deque(state['values'], maxlen=self.size)
+
+
+class SlopeTrend:
+    """
+    Least-squares slope of the scores against message number, with older
+    messages weighted down exponentially so the slope follows the recent
+    part of the conversation (decayed Welford co-moments, O(1) state). A
+    span of `horizon` messages sets the decay the way an EWMA span does.
+    The trend labels the change the slope predicts over `horizon` messages.
+    """
+    __slots__ = ('horizon', 'decay', 'count', 'weight', 'mean_x', 'mean_y', 'c_xy', 'm2_x')
+
+    def __init__(self, horizon=20):
+        self.horizon = horizon
+        self.decay = 1.0 - 2.0 / (horizon + 1)
+        self.count = 0
+        self.weight = 0.0
+        self.mean_x = 0.0
+        self.mean_y = 0.0
+        self.c_xy = 0.0
+        self.m2_x = 0.0
+
+    def add(self, compound):
+        x = float(self.count)
+        self.count += 1
+        # Scaling every earlier weight by decay scales the co-moments by it
+        # and leaves the means unchanged
+        self.weight = self.decay * self.weight + 1.0
+        dx = x - self.mean_x
+        self.mean_x += dx / self.weight
+        self.mean_y += (compound - self.mean_y) / self.weight
+        self.c_xy = self.decay * self.c_xy + dx * (compound - self.mean_y)
+        self.m2_x = self.decay * self.m2_x + dx * (x - self.mean_x)
+
+    @property
+    def slope(self):
+        return self.c_xy / self.m2_x if self.m2_x > 0 else 0.0
+
+    def summary(self):
+        if self.count == 0:
+            return {'per_message': None, 'trend': 'No data'}
+        if self.count == 1:
+            return {'per_message': 0.0, 'trend': 'Stable'}
+        span = min(self.count - 1, self.horizon)
+        return {'per_message': self.slope, 'trend': trend_from_change(self.slope * span)}
+
+    def to_state(self):
+        return {'count': self.count, 'weight': self.weight, 'mean_x': self.mean_x, 'mean_y': self.mean_y,
+                'c_xy': self.c_xy, 'm2_x': self.m2_x}
+
+    def load_state(self, state):
+        self.count = state['count']
+        self.weight = state['weight']
+        self.mean_x = state['mean_x']
+        self.mean_y = state['mean_y']
+        self.c_xy = state['c_xy']
+        self.m2_x = state['m2_x']
+
+
+class ConversationAggregator:
+    """
+    Running conversation statistics, updated in O(1) per message.
+
+    Produces the same result as SentimentEngine.analyze_conversation without
+    rescanning the statements. The half-split trend needs the sum of the
+    first len//2 scores: every time the count becomes even the split point
+    moves right by one, so a single score moves from the second half to the
+    first. The per-message scores are kept in a float array (they also feed
+    the chart) so that score can be found by index.
+
+    trends() adds streaming estimators with O(1) or O(window) state (see
+    EwmaTrend, WindowTrend, SlopeTrend). With max_scores set, only the last
+    max_scores scores are kept; once the half-split score has been dropped
+    (after about 2 * max_scores messages) `trend` is the window's trend.
+    """
+
+    def __init__(self, ewma_alpha=0.3, window=20, max_scores=None):
+        self.max_scores = max_scores
+        self.scores = array('d')
+        self.count = 0
+        self.total = 0.0
+        self.first_half_total = 0.0
+        # False once the score at the split point was trimmed before reaching the first half
+        self.exact_trend = True
+        self.ewma = EwmaTrend(ewma_alpha)
+        self.window = WindowTrend(window)
+        self.slope = SlopeTrend(window)
+
+    @property
+    def scores_offset(self):
+        """
+        Message number of scores[0] (scores before it were trimmed).
+        """
+        return self.count - len(self.scores)
+
+    def add(self, compound):
+        self.scores.append(compound)
+        self.count += 1
+        self.total += compound
+        n = self.count
+        if n % 2 == 0 and self.exact_trend:
+            self.first_half_total += self.scores[n // 2 - 1 - self.scores_offset]
+        self.ewma.add(compound)
+        self.window.add(compound)
+        self.slope.add(compound)
+        if self.max_scores and len(self.scores) > self.max_scores:
+            del self.scores[:len(self.scores) - self.max_scores]
+            if n // 2 < self.scores_offset:
+                # The next score to move into the first half is gone
+                self.exact_trend = False
+
+    def summary(self):
+        n = self.count
+        if n == 0:
+            return {
+                'compound': 0,
+                'label': 'Neutral',
+                'trend': 'No data'
+            }
+
+        avg_compound = self.total / n
+
+        trend = "Stable"
+        if not self.exact_trend:
+            trend = self.window.summary()['trend']
+        elif n > 1:
+            half = n // 2
+            mean_first = self.first_half_total / half
+            mean_second = (self.total - self.first_half_total) / (n - half)
+            trend = conversation_trend(mean_first, mean_second)
+
+        return {
+            'compound': avg_compound,
+            'label': conversation_label(avg_compound),
+            'trend': trend
+        }
+
+    def trends(self):
+        """
+        The streaming trend estimates, keyed by estimator.
+        """
+        mean = self.total / self.count if self.count else 0.0
+        return {
+            'ewma': self.ewma.summary(mean),
+            'window': self.window.summary(),
+            'slope': self.slope.summary()
+        }
+
+    def to_state(self):
+        return {
+            'scores': self.scores.tolist(),
+            'count': self.count,
+            'total': self.total,
+            'first_half_total': self.first_half_total,
+            'exact_trend': self.exact_trend,
+            'ewma': self.ewma.to_state(),
+            'window': self.window.to_state(),
+            'slope': self.slope.to_state()
+        }
+
+    @classmethod
+    def from_state(cls, state, **options):
+        aggregator = cls(**options)
+        aggregator.scores = array('d', state['scores'])
+        aggregator.count = state.get('count', len(aggregator.scores))
+        aggregator.total = state['total']
+        aggregator.first_half_total = state['first_half_total']
+        aggregator.exact_trend = state.get('exact_trend', True)
+        if 'ewma' in state:
+            aggregator.ewma.load_state(state['ewma'])
+            aggregator.window.load_state(state['window'])
+            aggregator.slope.load_state(state['slope'])
+        else:
+            # State saved before the estimators were kept: replay the scores
+            for compound in aggregator.scores:
+                aggregator.ewma.add(compound)
+                aggregator.window.add(compound)
+                aggregator.slope.add(compound)
+        if aggregator.max_scores and len(aggregator.scores) > aggregator.max_scores:
+            del aggregator.scores[:len(aggregator.scores) - aggregator.max_scores]
+            if aggregator.count // 2 < aggregator.scores_offset:
+                aggregator.exact_trend = False
+        return aggregator
@@ -0,0 +1,466 @@
+import asyncio
+import logging
+import os
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.chunking import estimate_tokens
+from src.runtime import build_text_classifier
+
+logger = logging.getLogger(__name__)
+
+# Sentiment classification backends used by SentimentEngine.
+#
+# A backend turns a batch of texts into one raw (label, score) prediction per
+# text; mapping labels to the engine's result dicts happens in the engine, so
+# every backend serving the same model shares one mapping. Backends load
+# lazily, and `remote` tells the engine whether to guard calls with its
+# circuit breaker.
+
+MULTILINGUAL_MODEL_ID = "tabularisai/multilingual-sentiment-analysis"
+HINGLISH_MODEL_ID = "pascalrai/hinglish-twitter-roberta-base-sentiment"
+
+# Input limit of the BERT-family models served here, special tokens included
+MODEL_MAX_TOKENS = 512
+
+# Serverless Inference API route used by InferenceClient for these models
+HF_INFERENCE_URL = "https://router.huggingface.co/hf-inference/models/{model_id}"
+
+
+class RemoteBackendError(Exception):
+    """
+    The inference endpoint answered with an error, or kept failing after
+    every retry.
+    """
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class RemoteMultilingualBackend:
+    """
+    A text-classification model served by the Hugging Face Inference API.
+    """
+    name = 'remote'
+    remote = True
+
+    def __init__(self, model_id, token=None, timeout=10.0, max_concurrency=8):
+        self.model_id = model_id
+        self.token = token
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self._client = None
+        # Fans batches out to the API; shared by every batch so the requests
+        # in flight stay bounded by max_concurrency
+        self._pool = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    from huggingface_hub import InferenceClient
+
+                    # Try to load token
+                    token = self.token or os.getenv("HF_TOKEN")
+
+                    if token:
+                        logger.info("Initializing Hugging Face API with token from .env...")
+                        self._client = InferenceClient(token=token, timeout=self.timeout)
+                    else:
+                        logger.warning("No HF_TOKEN found in .env. Using anonymous access (may be rate limited or restricted).")
+                        self._client = InferenceClient(timeout=self.timeout)
+        return self._client
+
+    @client.setter
+    def client(self, client):
+        self._client = client
+
+    @property
+    def available(self):
+        return True
+
+    def load(self):
+        self.client
+
+    @property
+    def max_tokens(self):
+        # Room for the special tokens the server-side tokenizer adds
+        return MODEL_MAX_TOKENS - 2
+
+    def count_tokens(self, text):
+        return estimate_tokens(text)
+
+    def classify(self, texts):
+        """
+        Returns the top (label, score) for each text. The Inference API client
+        takes one input per request, so a batch is fanned out concurrently and
+        costs roughly one round trip.
+        """
+        texts = list(texts)
+        if len(texts) == 1:
+            top = self.client.text_classification(texts[0], model=self.model_id)[0]
+            return [(top.label, top.score)]
+
+        client = self.client
+        responses = list(self._get_pool().map(
+            lambda text: client.text_classification(text, model=self.model_id),
+            texts
+        ))
+        return [(response[0].label, response[0].score) for response in responses]
+
+    def close(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+    def _get_pool(self):
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                                    thread_name_prefix="remote-backend")
+        return self._pool
+
+
+def _top_prediction(prediction):
+    """
+    Returns (label, score) of the best class in one input's prediction,
+    which the API sends as a list of {label, score} (possibly nested once).
+    """
+    if isinstance(prediction, dict):
+        return prediction['label'], prediction['score']
+    if prediction and isinstance(prediction[0], list):
+        prediction = prediction[0]
+    best = max(prediction, key=lambda item: item['score'])
+    return best['label'], best['score']
+
+
+class AsyncRemoteBackend:
+    """
+    A text-classification model behind the Hugging Face Inference API (or
+    any endpoint with the same JSON contract, given as a URL model_id),
+    called through one pooled asyncio HTTP client.
+
+    Requests run on a private event loop thread, so connections are kept
+    alive and reused across calls. At most max_concurrency requests are in
+    flight at once. Connection errors, timeouts, 5xx and 429 answers are
+    retried up to max_retries times with jittered exponential backoff. A
+    429 pauses every request until its Retry-After has passed. With
+    batch_inputs, a batch is sent as one request with a list of `inputs`
+    (up to max_batch_size per request) instead of one request per text.
+
+    classify() blocks the calling thread like the other backends;
+    classify_async() can be awaited from any event loop.
+    """
+    name = 'remote_async'
+    remote = True
+
+    def __init__(self, model_id, token=None, timeout=10.0, max_concurrency=8, max_retries=3,
+                 backoff_s=0.25, max_backoff_s=8.0, batch_inputs=False, max_batch_size=32):
+        self.model_id = model_id
+        self.url = model_id if model_id.startswith(("http://", "https://")) else HF_INFERENCE_URL.format(model_id=model_id)
+        self.token = token
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_s = backoff_s
+        self.max_backoff_s = max_backoff_s
+        self.batch_inputs = batch_inputs
+        self.max_batch_size = max_batch_size
+        # Requests sent, including retries
+        self.requests = 0
+        self._loop = None
+        self._client = None
+        self._semaphore = None
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def available(self):
+        return True
+
+    @property
+    def max_tokens(self):
+        return MODEL_MAX_TOKENS - 2
+
+    def count_tokens(self, text):
+        return estimate_tokens(text)
+
+    def load(self):
+        self._ensure_loop()
+
+    def classify(self, texts):
+        return asyncio.run_coroutine_threadsafe(self._classify(list(texts)), self._ensure_loop()).result()
+
+    async def classify_async(self, texts):
+        future = asyncio.run_coroutine_threadsafe(self._classify(list(texts)), self._ensure_loop())
+        return await asyncio.wrap_future(future)
+
+    def close(self):
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._client.aclose(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+
+    def _ensure_loop(self):
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    import httpx
+
+                    token = self.token or os.getenv("HF_TOKEN")
+                    headers = {'Authorization': f"Bearer {token}"} if token else {}
+                    loop = asyncio.new_event_loop()
+                    self._client = httpx.AsyncClient(
+                        timeout=self.timeout,
+                        headers=headers,
+                        limits=httpx.Limits(max_connections=self.max_concurrency,
+                                            max_keepalive_connections=self.max_concurrency)
+                    )
+                    # Created on the loop thread's behalf; only used from it
+                    self._semaphore = asyncio.Semaphore(self.max_concurrency)
+                    threading.Thread(target=loop.run_forever, name="remote-async-loop", daemon=True).start()
+                    self._loop = loop
+        return self._loop
+
+    async def _classify(self, texts):
+        if not texts:
+            return []
+        if self.batch_inputs and len(texts) > 1:
+            batches = [texts[i:i + self.max_batch_size] for i in range(0, len(texts), self.max_batch_size)]
+            responses = await asyncio.gather(*(self._post({'inputs': batch}) for batch in batches))
+            predictions = [prediction for response in responses for prediction in response]
+            if len(predictions) != len(texts):
+                raise RemoteBackendError(f"Expected {len(texts)} predictions, got {len(predictions)}")
+            return [_top_prediction(prediction) for prediction in predictions]
+
+        responses = await asyncio.gather(*(self._post({'inputs': text}) for text in texts))
+        return [_top_prediction(response) for response in responses]
+
+    async def _post(self, payload):
+        import httpx
+
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.max_retries + 1):
+            # Rate limited: hold every request until the endpoint's Retry-After
+            if self._paused_until > loop.time():
+                await asyncio.sleep(self._paused_until - loop.time())
+
+            retry_after = None
+            async with self._semaphore:
+                self.requests += 1
+                try:
+                    response = await self._client.post(self.url, json=payload)
+                except httpx.TransportError as e:
+                    error = RemoteBackendError(f"{type(e).__name__}: {e}")
+                else:
+                    if response.status_code < 400:
+                        return response.json()
+                    error = RemoteBackendError(
+                        f"{self.url} answered {response.status_code}: {response.text[:200]}", response.status_code
+                    )
+                    if response.status_code != 429 and response.status_code < 500:
+                        raise error
+                    retry_after = _retry_after_seconds(response.headers.get('Retry-After'))
+                    if response.status_code == 429 and retry_after is not None:
+                        self._paused_until = max(self._paused_until, loop.time() + retry_after)
+
+            if attempt == self.max_retries:
+                raise error
+            delay = retry_after if retry_after is not None else self._backoff(attempt)
+            logger.debug("Remote request failed (%s); retry %d in %.2fs", error, attempt + 1, delay)
+            await asyncio.sleep(delay)
+
+    def _backoff(self, attempt):
+        # Full jitter: spreads retries from concurrent requests apart
+        return random.uniform(0, min(self.max_backoff_s, self.backoff_s * 2 ** attempt))
+
+
+def _retry_after_seconds(value):
+    """
+    Parses a Retry-After header given in seconds; HTTP dates are ignored
+    (the caller falls back to its own backoff).
+    """
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class LocalPipelineBackend:
+    """
+    A text-classification model run in process with a transformers pipeline.
+
+    The model is loaded from model_path when given (a directory produced by
+    save_pretrained, used without touching the network), otherwise from
+    model_id through the Hugging Face cache in cache_dir. Batches go through
+    the pipeline in chunks of batch_size. runtime picks the inference runtime
+    ('torch', 'quantized', 'onnx' or 'auto', see src.runtime); runtime_used
+    records the one that actually loaded.
+    """
+    name = 'local'
+    remote = False
+
+    def __init__(self, model_id, model_path=None, cache_dir=None, batch_size=16, pipeline_factory=None,
+                 runtime='torch', intra_op_threads=None, inter_op_threads=None):
+        self.model_id = model_id
+        self.model_path = model_path
+        self.cache_dir = cache_dir
+        self.batch_size = batch_size
+        self.pipeline_factory = pipeline_factory or self._build_pipeline
+        self.runtime = runtime
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+        self.runtime_used = None
+        self._max_tokens = None
+        self._pipe = None
+        self._available = None
+        self._lock = threading.Lock()
+
+    @property
+    def pipe(self):
+        self.load()
+        return self._pipe
+
+    @pipe.setter
+    def pipe(self, pipe):
+        self._pipe = pipe
+        self._max_tokens = None
+        self._available = pipe is not None
+
+    @property
+    def available(self):
+        self.load()
+        return self._available
+
+    @available.setter
+    def available(self, value):
+        self._available = value
+
+    def load(self):
+        if self._available is not None:
+            return
+        with self._lock:
+            if self._available is not None:
+                return
+            logger.info("Initializing local model %s (this may take a moment)...", self.model_path or self.model_id)
+            try:
+                self._pipe = self.pipeline_factory()
+                self._available = True
+            except Exception as e:
+                logger.warning("Could not load local model %s: %s", self.model_id, e)
+                self._available = False
+
+    def save_snapshot(self, path):
+        """
+        Saves the loaded tokenizer and model to path with save_pretrained.
+        Pointing model_path at the snapshot loads it from local disk on the
+        next start; an ONNX snapshot also skips the export.
+        """
+        pipe = self.pipe
+        if pipe is None:
+            raise RuntimeError(f"Local model {self.model_id} is not loaded")
+        if self.runtime_used == 'quantized':
+            # Dynamically quantized modules do not round-trip through save_pretrained
+            raise ValueError("Snapshot the torch runtime and quantize on load (HINGLISH_RUNTIME=quantized)")
+        pipe.model.save_pretrained(path)
+        pipe.tokenizer.save_pretrained(path)
+        return path
+
+    @property
+    def max_tokens(self):
+        """
+        Tokens of text per input, after the tokenizer's special tokens.
+        """
+        if self._max_tokens is None:
+            tokenizer = getattr(self.pipe, 'tokenizer', None)
+            limit = getattr(tokenizer, 'model_max_length', None)
+            # Tokenizers saved without a limit report a huge sentinel
+            if not isinstance(limit, int) or limit > MODEL_MAX_TOKENS:
+                limit = MODEL_MAX_TOKENS
+            special = tokenizer.num_special_tokens_to_add() if tokenizer is not None else 2
+            self._max_tokens = limit - special
+        return self._max_tokens
+
+    def count_tokens(self, text):
+        tokenizer = getattr(self.pipe, 'tokenizer', None)
+        if tokenizer is None:
+            return estimate_tokens(text)
+        return len(tokenizer(text, add_special_tokens=False)['input_ids'])
+
+    def classify(self, texts):
+        outputs = self.pipe(list(texts), batch_size=self.batch_size, truncation=True)
+        return [(output['label'], output['score']) for output in outputs]
+
+    def _build_pipeline(self):
+        pipe, self.runtime_used = build_text_classifier(
+            self.model_path or self.model_id,
+            runtime=self.runtime,
+            intra_op_threads=self.intra_op_threads,
+            inter_op_threads=self.inter_op_threads,
+            cache_dir=self.cache_dir,
+            local_files_only=self.model_path is not None
+        )
+        logger.info("Local model %s loaded on the %s runtime.", self.model_id, self.runtime_used)
+        return pipe
+
+
+def create_multilingual_backend(model_id=MULTILINGUAL_MODEL_ID, timeout=10.0):
+    """
+    Builds the multilingual backend selected by MULTILINGUAL_BACKEND
+    ('remote', the default, 'async' or 'local'). The local backend reads
+    MULTILINGUAL_MODEL_PATH and MODEL_CACHE_DIR; the async one reads
+    SENTIMENT_REMOTE_CONCURRENCY, SENTIMENT_REMOTE_RETRIES,
+    SENTIMENT_REMOTE_BATCH_INPUTS and MULTILINGUAL_ENDPOINT_URL.
+    """
+    kind = os.getenv("MULTILINGUAL_BACKEND", "remote").lower()
+    if kind == "async":
+        return AsyncRemoteBackend(
+            os.getenv("MULTILINGUAL_ENDPOINT_URL") or model_id,
+            timeout=timeout,
+            max_concurrency=int(os.getenv("SENTIMENT_REMOTE_CONCURRENCY", "8")),
+            max_retries=int(os.getenv("SENTIMENT_REMOTE_RETRIES", "3")),
+            batch_inputs=os.getenv("SENTIMENT_REMOTE_BATCH_INPUTS", "0") == "1"
+        )
+    if kind == "local":
+        return LocalPipelineBackend(
+            model_id,
+            model_path=os.getenv("MULTILINGUAL_MODEL_PATH") or None,
+            cache_dir=os.getenv("MODEL_CACHE_DIR") or None,
+            batch_size=int(os.getenv("MULTILINGUAL_BATCH_SIZE", "16")),
+            runtime=os.getenv("MULTILINGUAL_RUNTIME", "torch").lower(),
+            **_thread_settings()
+        )
+    if kind != "remote":
+        raise ValueError(f"Unknown MULTILINGUAL_BACKEND '{kind}' (expected 'remote', 'async' or 'local')")
+    return RemoteMultilingualBackend(model_id, timeout=timeout)
+
+
+def create_hinglish_backend(model_id=HINGLISH_MODEL_ID):
+    """
+    Builds the local Hinglish backend, reading HINGLISH_MODEL_PATH,
+    MODEL_CACHE_DIR and HINGLISH_RUNTIME (see src.runtime).
+    """
+    return LocalPipelineBackend(
+        model_id,
+        model_path=os.getenv("HINGLISH_MODEL_PATH") or None,
+        cache_dir=os.getenv("MODEL_CACHE_DIR") or None,
+        batch_size=int(os.getenv("HINGLISH_BATCH_SIZE", "16")),
+        runtime=os.getenv("HINGLISH_RUNTIME", "torch").lower(),
+        **_thread_settings()
+    )
+
+
+def _thread_settings():
+    intra = os.getenv("INFERENCE_INTRA_OP_THREADS")
+    inter = os.getenv("INFERENCE_INTER_OP_THREADS")
+    return {
+        'intra_op_threads': int(intra) if intra else None,
+        'inter_op_threads': int(inter) if inter else None
+    }
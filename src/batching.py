@@ -0,0 +1,107 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class MicroBatcher:
+    """
+    Sits in front of a SentimentEngine and coalesces concurrent
+    analyze_statement calls into a single analyze_many call.
+
+    A batch is flushed as soon as it holds max_batch_size statements or the
+    oldest queued statement has waited max_wait_ms, whichever comes first.
+    Batches run on up to max_workers threads, so a batch waiting on a slow
+    remote call does not hold up the next one (local or cached statements
+    still come back at once). While every worker is busy, statements keep
+    queueing and go out together in the next batch.
+    Any other attribute (analyze_conversation, model_id, ...) is forwarded to
+    the wrapped engine, so the batcher can be used wherever an engine is.
+    """
+
+    def __init__(self, engine, max_batch_size=16, max_wait_ms=5, max_workers=4):
+        self.engine = engine
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0, max_wait_ms) / 1000.0
+        self.max_workers = max(1, int(max_workers))
+        self._queue = queue.Queue()
+        self._closed = False
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="sentiment-batch")
+        # A batch is only formed once a worker is free to run it
+        self._free_workers = threading.Semaphore(self.max_workers)
+        self._worker = threading.Thread(target=self._run, name="sentiment-batcher", daemon=True)
+        self._worker.start()
+
+    def __getattr__(self, name):
+        # Only called for attributes not found on the batcher itself
+        return getattr(self.engine, name)
+
+    @property
+    def pending(self):
+        """
+        Statements queued and not yet picked up by the worker.
+        """
+        return self._queue.qsize()
+
+    def analyze_statement(self, text):
+        return self._submit(text).result()
+
+    def analyze_many(self, texts):
+        futures = [self._submit(text) for text in texts]
+        return [future.result() for future in futures]
+
+    def close(self):
+        """
+        Stops the worker threads after the statements already queued are served.
+        """
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._worker.join()
+            self._pool.shutdown(wait=True)
+
+    def _submit(self, text):
+        if self._closed:
+            raise RuntimeError("MicroBatcher is closed")
+        future = Future()
+        self._queue.put((text, future))
+        return future
+
+    def _run(self):
+        while True:
+            self._free_workers.acquire()
+            item = self._queue.get()
+            if item is None:
+                return
+
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            stop = False
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._pool.submit(self._flush, batch)
+            if stop:
+                return
+
+    def _flush(self, batch):
+        texts = [text for text, _ in batch]
+        try:
+            results = self.engine.analyze_many(texts)
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        finally:
+            self._free_workers.release()
+
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
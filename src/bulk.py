@@ -0,0 +1,192 @@
+"""
+Bulk offline scoring of JSONL / CSV exports.
+
+    python -m src.bulk conversations.jsonl scored.jsonl --text-field body --workers 4
+
+Records are streamed from the input and scored in batches through
+SentimentEngine.analyze_many, so the Hinglish / multilingual / VADER routing
+is the same as in the chatbot. With workers > 0 batches are fanned out to a
+process pool, each worker holding its own engine (one model copy per
+worker). Results are written as JSONL in input order, each input record with
+a `sentiment` field added. After every batch a checkpoint next to the output
+records how far the job got; --resume continues from it.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from src.logging_config import configure_logging
+from src.registry import get_engine
+
+# Engine of the current pool worker, built once by _init_worker
+_worker_engine = None
+
+
+def read_records(path, fmt=None):
+    """
+    Yields the records of a JSONL or CSV file one at a time. The format is
+    taken from the extension unless fmt ('jsonl' or 'csv') is given.
+    """
+    fmt = fmt or ('csv' if path.lower().endswith('.csv') else 'jsonl')
+    with open(path, newline='', encoding='utf-8') as f:
+        if fmt == 'csv':
+            yield from csv.DictReader(f)
+        elif fmt == 'jsonl':
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{path}:{line_no}: invalid JSON ({e})") from None
+        else:
+            raise ValueError(f"Unknown input format '{fmt}' (expected 'jsonl' or 'csv')")
+
+
+def checkpoint_path(output_path):
+    return output_path + '.ckpt'
+
+
+def load_checkpoint(output_path):
+    """
+    Returns the checkpoint of a previous run writing output_path, or None.
+    """
+    try:
+        with open(checkpoint_path(output_path), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _save_checkpoint(output_path, input_path, records, offset):
+    tmp = checkpoint_path(output_path) + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'input': input_path, 'records': records, 'offset': offset}, f)
+    os.replace(tmp, checkpoint_path(output_path))
+
+
+def _batches(records, batch_size, skip=0):
+    batch = []
+    for index, record in enumerate(records):
+        if index < skip:
+            continue
+        batch.append(record)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _summarize(results):
+    return [{'label': r['label'], 'compound': r['compound'], 'scores': r['scores']} for r in results]
+
+
+def _init_worker(engine_factory):
+    global _worker_engine
+    configure_logging(level=os.getenv("LOG_LEVEL", "WARNING"))
+    _worker_engine = engine_factory()
+    _worker_engine.preload()
+
+
+def _score_in_worker(texts):
+    return _summarize(_worker_engine.analyze_many(texts))
+
+
+def score_file(input_path, output_path, text_field='text', batch_size=64, workers=0,
+               resume=False, fmt=None, engine=None, engine_factory=get_engine):
+    """
+    Scores every record of input_path into output_path (JSONL).
+
+    workers=0 scores in this process with engine (default: the shared
+    engine); otherwise a pool of that many processes is used, each building
+    its engine with engine_factory. At most two batches per worker are in
+    flight, so memory stays constant whatever the input size.
+    Returns a dict with the number of records scored, skipped (already done
+    by a resumed run), elapsed seconds and records per second.
+    """
+    checkpoint = load_checkpoint(output_path) if resume else None
+    if checkpoint and checkpoint.get('input') != input_path:
+        raise ValueError(f"Checkpoint for {output_path} belongs to {checkpoint.get('input')}, not {input_path}")
+    done = checkpoint['records'] if checkpoint else 0
+
+    out = open(output_path, 'r+b' if checkpoint else 'wb')
+    out.truncate(checkpoint['offset'] if checkpoint else 0)
+    out.seek(0, os.SEEK_END)
+
+    pool = None
+    if workers > 0:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(engine_factory,))
+    elif engine is None:
+        engine = engine_factory()
+
+    def write(batch, results):
+        nonlocal done
+        for record, sentiment in zip(batch, results):
+            out.write((json.dumps(dict(record, sentiment=sentiment), ensure_ascii=False) + '\n').encode('utf-8'))
+        out.flush()
+        os.fsync(out.fileno())
+        done += len(batch)
+        _save_checkpoint(output_path, input_path, done, out.tell())
+
+    skipped = done
+    start = time.perf_counter()
+    try:
+        pending = deque()
+        for batch in _batches(read_records(input_path, fmt), batch_size, skip=skipped):
+            texts = [str(record.get(text_field) or '') for record in batch]
+            if pool is None:
+                write(batch, _summarize(engine.analyze_many(texts)))
+                continue
+            pending.append((batch, pool.submit(_score_in_worker, texts)))
+            if len(pending) >= 2 * workers:
+                batch, future = pending.popleft()
+                write(batch, future.result())
+        while pending:
+            batch, future = pending.popleft()
+            write(batch, future.result())
+    finally:
+        out.close()
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    elapsed = time.perf_counter() - start
+    scored = done - skipped
+    return {
+        'records': scored,
+        'skipped': skipped,
+        'elapsed': elapsed,
+        'records_per_s': scored / elapsed if elapsed > 0 else 0.0
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a JSONL or CSV file with the sentiment engine.")
+    parser.add_argument("input", help="JSONL or CSV file to score")
+    parser.add_argument("output", help="JSONL file to write (a .ckpt checkpoint is kept next to it)")
+    parser.add_argument("--text-field", default="text", help="record field holding the text (default: text)")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="input format (default: from the extension)")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="scoring processes, 0 to score in this process (default: CPU count)")
+    parser.add_argument("--resume", action="store_true", help="continue from the output's checkpoint")
+    args = parser.parse_args(argv)
+    # Per-record analysis logs only with an explicit LOG_LEVEL=INFO
+    configure_logging(level=os.getenv("LOG_LEVEL", "WARNING"))
+
+    stats = score_file(args.input, args.output, text_field=args.text_field, batch_size=args.batch_size,
+                       workers=args.workers, resume=args.resume, fmt=args.format)
+    if stats['skipped']:
+        print(f"Resumed after {stats['skipped']} records already scored.", file=sys.stderr)
+    print(f"Scored {stats['records']} records in {stats['elapsed']:.1f}s "
+          f"({stats['records_per_s']:.1f} records/s).", file=sys.stderr)
+    return stats
+
+
+if __name__ == '__main__':
+    main()
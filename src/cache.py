@@ -0,0 +1,249 @@
+import hashlib
+import json
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text):
+    """
+    Canonical form used for cache keys: NFC unicode, trimmed, single spaces.
+    Case is kept because VADER treats ALL CAPS as emphasis.
+    """
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+class SentimentCache:
+    """
+    Content-addressed cache of analysis results.
+
+    Keys hash the normalized text together with the backend and model id
+    that produced the result, so a model change never serves stale scores.
+    The in-memory tier is an LRU bounded by entry count and optionally by
+    serialized size; entries can also expire after a TTL. When persist_path
+    is given, results are also written to a sqlite file and read back on an
+    in-memory miss, so they survive restarts. Disk writes are queued to a
+    background writer that commits them in batches; call flush() to wait for
+    them. No disk I/O happens under the in-memory lock.
+    """
+
+    def __init__(self, max_entries=10000, max_bytes=None, ttl=None, persist_path=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict() # key -> (expires_at, size, result)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        self.persist_path = persist_path
+        self._db = None
+        self._db_lock = threading.Lock()
+        self._writes = None
+        self._writer_pid = None
+        if persist_path:
+            self._db = _connect(persist_path)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS sentiment_cache "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+            )
+            self._db.commit()
+
+    @classmethod
+    def from_env(cls):
+        """
+        Builds a cache from SENTIMENT_CACHE_* environment variables, or returns
+        None when SENTIMENT_CACHE_SIZE is 0.
+        """
+        max_entries = int(os.getenv("SENTIMENT_CACHE_SIZE", "10000"))
+        if max_entries <= 0:
+            return None
+        max_bytes = os.getenv("SENTIMENT_CACHE_MAX_BYTES")
+        ttl = os.getenv("SENTIMENT_CACHE_TTL_S")
+        return cls(
+            max_entries=max_entries,
+            max_bytes=int(max_bytes) if max_bytes else None,
+            ttl=float(ttl) if ttl else None,
+            persist_path=os.getenv("SENTIMENT_CACHE_PATH") or None
+        )
+
+    @staticmethod
+    def make_key(text, backend, model_id):
+        raw = f"{backend}\0{model_id}\0{normalize_text(text)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key, text):
+        """
+        Returns a copy of the cached result for key with its 'text' set to
+        text, or None on a miss.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, _, result = entry
+                if expires_at is not None and expires_at <= now:
+                    self._remove(key)
+                    self.expirations += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return _copy_result(result, text)
+
+        if self._db is not None:
+            with self._db_lock:
+                row = self._db.execute(
+                    "SELECT value, expires_at FROM sentiment_cache WHERE key = ?", (key,)
+                ).fetchone()
+            if row is not None:
+                value, expires_at = row
+                if expires_at is not None and expires_at <= now:
+                    self._write(("DELETE FROM sentiment_cache WHERE key = ?", (key,)))
+                    with self._lock:
+                        self.expirations += 1
+                else:
+                    result = json.loads(value)
+                    with self._lock:
+                        self._insert(key, result, len(value), expires_at)
+                        self.disk_hits += 1
+                    return _copy_result(result, text)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, result):
+        # Stored without the caller's text; get() fills it back in
+        stored = {k: v for k, v in result.items() if k != 'text'}
+        value = json.dumps(stored)
+        expires_at = time.time() + self.ttl if self.ttl else None
+        with self._lock:
+            self._insert(key, stored, len(value), expires_at)
+        if self._db is not None:
+            self._write((
+                "INSERT OR REPLACE INTO sentiment_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at)
+            ))
+
+    def flush(self):
+        """
+        Waits until every queued disk write is committed.
+        """
+        if self._writes is not None and self._writer_pid == os.getpid():
+            self._writes.join()
+
+    def close(self):
+        """
+        Commits the queued disk writes and closes the sqlite file.
+        """
+        if self._writes is not None and self._writer_pid == os.getpid():
+            self._writes.put(None)
+            self._writes.join()
+            self._writes = None
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+            self._db = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        if self._db is not None:
+            self._write(("DELETE FROM sentiment_cache", ()))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _insert(self, key, result, size, expires_at):
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (expires_at, size, result)
+        self._bytes += size
+
+        # Evict least recently used entries until both bounds hold
+        while self._entries and (
+            len(self._entries) > self.max_entries
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            _, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def _write(self, statement):
+        with self._db_lock:
+            # A forked child inherits the queue but not the writer thread
+            if self._writer_pid != os.getpid():
+                self._writes = queue.Queue()
+                self._writer_pid = os.getpid()
+                threading.Thread(target=self._write_loop, args=(self._writes,),
+                                 name="sentiment-cache-writer", daemon=True).start()
+        self._writes.put(statement)
+
+    def _write_loop(self, writes):
+        # Its own connection: writes never wait on readers, and each batch is one commit
+        db = _connect(self.persist_path)
+        while True:
+            batch = [writes.get()]
+            while True:
+                try:
+                    batch.append(writes.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                for statement in batch:
+                    if statement is not None:
+                        db.execute(*statement)
+                db.commit()
+            except sqlite3.Error:
+                # A lost cache write only costs a recomputation
+                db.rollback()
+            finally:
+                for _ in batch:
+                    writes.task_done()
+            if None in batch:
+                db.close()
+                return
+
+
+def _connect(path):
+    db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    # WAL lets readers proceed during a write; NORMAL syncs at checkpoints, not every commit
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    return db
+
+
+def _copy_result(result, text):
+    copy = {'text': text, **result}
+    if isinstance(copy.get('scores'), dict):
+        copy['scores'] = dict(copy['scores'])
+    return copy
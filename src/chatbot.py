@@ -1,42 +1,118 @@
-from src.sentiment import SentimentEngine
+from src.analytics import ConversationAggregator
+from src.conversation import Turn
+from src.registry import get_engine
 import random
+import threading
 
 class Chatbot:
-    def __init__(self):
-        self.sentiment_engine = SentimentEngine()
-        self.history = [] # List of dicts: {'role': 'user'|'bot', 'content': '...', 'sentiment': ...}
-        self.user_statements_analysis = [] # Store analysis of user inputs specifically
+    def __init__(self, sentiment_engine=None, max_history=None, analytics_options=None):
+        # Sessions share one process-wide engine unless one is injected
+        self.sentiment_engine = sentiment_engine or get_engine()
+        # Cap on retained turns (user + bot); None keeps everything
+        self.max_history = max_history
+        self.history = [] # List of Turn records (see src.conversation); to_dict() gives the JSON shape
+        # Number of turns trimmed from the front of history; the turn at
+        # history[i] has sequence number history_offset + i
+        self.history_offset = 0
+        # Running conversation-level statistics (covers turns trimmed from history too);
+        # analytics_options are ConversationAggregator arguments (ewma_alpha, window, max_scores)
+        self.analytics_options = analytics_options or {}
+        self.analytics = ConversationAggregator(**self.analytics_options)
+        # Held while turns are added, so readers on other threads see whole turns
+        self.lock = threading.Lock()
+        # Version of the stored session this was loaded from (set by the session store)
+        self.store_version = None
 
     def process_user_input(self, user_text):
         # 1. Analyze sentiment of the user's input (Tier 2)
         analysis = self.sentiment_engine.analyze_statement(user_text)
-        self.user_statements_analysis.append(analysis)
-        
-        # 2. Store in history
-        self.history.append({
-            'role': 'user',
-            'content': user_text,
-            'sentiment': analysis
-        })
-
-        # 3. Generate response
-        bot_response = self._generate_response(user_text, analysis['label'])
-        
-        # 4. Store bot response
-        self.history.append({
-            'role': 'bot',
-            'content': bot_response,
-            'sentiment': None # We don't analyze bot's own sentiment for this requirement
-        })
+        return self.add_turn(user_text, analysis)
+
+    def add_turn(self, user_text, analysis):
+        """
+        Records a user message already scored by the engine and the bot's reply.
+        """
+        with self.lock:
+            self.analytics.add(analysis['compound'])
+
+            # 2. Store in history (the turn keeps the analysis, the text only once)
+            self.history.append(Turn.user(user_text, analysis))
+
+            # 3. Generate response
+            bot_response = self._generate_response(user_text, analysis['label'])
+
+            # 4. Store bot response (we don't analyze the bot's own sentiment)
+            self.history.append(Turn.bot(bot_response))
+            self._trim_history()
 
         return {
             'response': bot_response,
             'user_sentiment': analysis
         }
 
+    @property
+    def user_statements_analysis(self):
+        """
+        Analysis dicts of the retained user turns, built on demand.
+        """
+        return [turn.sentiment for turn in self.history if turn.label is not None]
+
+    @property
+    def cursor(self):
+        """
+        Sequence number of the next turn to be added.
+        """
+        return self.history_offset + len(self.history)
+
+    def turns_since(self, cursor):
+        """
+        Returns the turns with sequence number >= cursor that are still retained.
+        """
+        return self.history[max(0, cursor - self.history_offset):]
+
+    def history_page(self, offset, limit):
+        """
+        Returns up to limit retained turns starting at sequence number offset.
+        """
+        start = max(0, offset - self.history_offset)
+        return self.history[start:start + limit]
+
+    def to_state(self):
+        """
+        Returns the conversation as plain JSON-serializable data.
+        """
+        return {
+            'history': [turn.to_dict() for turn in self.history],
+            'history_offset': self.history_offset,
+            'analytics': self.analytics.to_state()
+        }
+
+    def load_state(self, state):
+        """
+        Restores a conversation saved with to_state().
+        """
+        self.history = [Turn.from_dict(turn) for turn in state.get('history', [])]
+        self.history_offset = state.get('history_offset', 0)
+        if 'analytics' in state:
+            self.analytics = ConversationAggregator.from_state(state['analytics'], **self.analytics_options)
+        else:
+            # State saved before the aggregates were kept
+            self.analytics = ConversationAggregator(**self.analytics_options)
+            for analysis in state.get('user_statements_analysis', []):
+                self.analytics.add(analysis['compound'])
+        self._trim_history()
+
+    def _trim_history(self):
+        if self.max_history is None:
+            return
+        excess = len(self.history) - self.max_history
+        if excess > 0:
+            del self.history[:excess]
+            self.history_offset += excess
+
     def get_final_analysis(self):
-        # Tier 1: Conversation-Level Sentiment Analysis
-        return self.sentiment_engine.analyze_conversation(self.user_statements_analysis)
+        # Tier 1: Conversation-Level Sentiment Analysis (O(1), see ConversationAggregator)
+        return self.analytics.summary()
 
     def _generate_response(self, text, sentiment_label):
         # Simple flexible logic based on sentiment
@@ -0,0 +1,152 @@
+import math
+import re
+from collections import defaultdict
+
+# Chunking of statements longer than a model's input limit.
+#
+# Transformer pipelines truncate at their token limit, so the end of a long
+# message would never be scored, and the Inference API may reject it. A text
+# over the limit is split on sentence boundaries into chunks that each fit,
+# the chunks are classified in the same batch as the other statements, and
+# the per-chunk results are combined into one result weighted by chunk
+# length (see combine_chunk_results). Texts that fit, which is nearly every
+# chat message, go through unchanged.
+
+# Sentence ends (. ! ? ... and the Devanagari danda) followed by whitespace, or line breaks
+_SENTENCE_END = re.compile(r'(?<=[.!?…।॥])\s+|\s*\n\s*')
+
+
+def split_sentences(text):
+    return [sentence for sentence in (part.strip() for part in _SENTENCE_END.split(text)) if sentence]
+
+
+def estimate_tokens(text):
+    """
+    Token count guess for a model whose tokenizer is not at hand (the remote
+    API): one token per three UTF-8 bytes, which overestimates subword
+    tokenizers on English and Devanagari alike.
+    """
+    return math.ceil(len(text.encode('utf-8')) / 3)
+
+
+class TextChunker:
+    """
+    Splits text into chunks of at most max_tokens, as counted by
+    count_tokens, packing whole sentences greedily. A sentence that is too
+    long on its own is split between words.
+    """
+
+    def __init__(self, count_tokens, max_tokens):
+        if max_tokens < 1:
+            raise ValueError("max_tokens must be positive")
+        self.count_tokens = count_tokens
+        self.max_tokens = max_tokens
+
+    def fits(self, text):
+        # Subword tokenizers emit at most one token per UTF-8 byte, so short
+        # texts skip the tokenizer
+        return len(text.encode('utf-8')) <= self.max_tokens or self.count_tokens(text) <= self.max_tokens
+
+    def split(self, text):
+        """
+        Returns the (chunk, token count) pairs covering text.
+        """
+        chunks = []
+        current, current_tokens = [], 0
+        for sentence in split_sentences(text):
+            tokens = self.count_tokens(sentence)
+            if tokens > self.max_tokens:
+                pieces = self._split_words(sentence)
+            else:
+                pieces = [(sentence, tokens)]
+            for piece, piece_tokens in pieces:
+                if current and current_tokens + piece_tokens > self.max_tokens:
+                    chunks.append((" ".join(current), current_tokens))
+                    current, current_tokens = [], 0
+                current.append(piece)
+                current_tokens += piece_tokens
+        if current:
+            chunks.append((" ".join(current), current_tokens))
+        return chunks
+
+    def _split_words(self, sentence):
+        pieces = []
+        current, current_tokens = [], 0
+        for word in sentence.split():
+            # Cut anything that still does not fit (e.g. a run of characters without spaces)
+            while self.count_tokens(word) > self.max_tokens:
+                cut = max(1, len(word) * self.max_tokens // self.count_tokens(word))
+                pieces.extend(self._flush(current, current_tokens))
+                current, current_tokens = [], 0
+                pieces.append((word[:cut], self.count_tokens(word[:cut])))
+                word = word[cut:]
+            tokens = self.count_tokens(word)
+            if current and current_tokens + tokens > self.max_tokens:
+                pieces.extend(self._flush(current, current_tokens))
+                current, current_tokens = [], 0
+            current.append(word)
+            current_tokens += tokens
+        pieces.extend(self._flush(current, current_tokens))
+        return pieces
+
+    @staticmethod
+    def _flush(words, tokens):
+        return [(" ".join(words), tokens)] if words else []
+
+
+class ChunkPlan:
+    """
+    The chunks to classify for texts: the texts that fit as they are and the
+    chunks of those that do not, in order. regroup() maps the per-chunk
+    predictions back to one list per text.
+    """
+
+    def __init__(self, texts, chunker=None):
+        self.texts = list(texts)
+        self.chunks = []
+        self.weights = []
+        self.spans = []
+        for text in self.texts:
+            if chunker is None or chunker.fits(text):
+                pieces = [(text, 1)]
+            else:
+                pieces = chunker.split(text) or [(text, 1)]
+            start = len(self.chunks)
+            for chunk, tokens in pieces:
+                self.chunks.append(chunk)
+                self.weights.append(max(1, tokens))
+            self.spans.append((start, len(self.chunks)))
+
+    def regroup(self, outputs):
+        """
+        Yields, per text, the list of (chunk, weight, output) for its chunks.
+        """
+        outputs = list(outputs)
+        for start, end in self.spans:
+            yield list(zip(self.chunks[start:end], self.weights[start:end], outputs[start:end]))
+
+
+def combine_chunk_results(text, chunk_results, weights):
+    """
+    Combines the result dicts of a text's chunks into one result: compound
+    and scores are weighted means (by chunk token count), the label is the
+    one carrying the most weight, and `chunks` keeps the per-chunk detail.
+    """
+    total = float(sum(weights))
+    label_weights = defaultdict(float)
+    score_sums = defaultdict(float)
+    for result, weight in zip(chunk_results, weights):
+        label_weights[result['label']] += weight
+        for key, value in result['scores'].items():
+            score_sums[key] += value * weight
+
+    return {
+        'text': text,
+        'scores': {key: value / total for key, value in score_sums.items()},
+        'compound': sum(result['compound'] * weight for result, weight in zip(chunk_results, weights)) / total,
+        'label': max(label_weights, key=label_weights.get),
+        'chunks': [
+            {'text': result['text'], 'tokens': weight, 'label': result['label'], 'compound': result['compound']}
+            for result, weight in zip(chunk_results, weights)
+        ]
+    }
@@ -0,0 +1,122 @@
+import threading
+import time
+from collections import deque
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised in place of a call the breaker refused.
+    """
+
+
+class CircuitBreaker:
+    """
+    Failure-rate circuit breaker for a remote backend.
+
+    CLOSED: calls go through; the outcomes of the last window_size calls are
+        kept, and once at least min_calls are recorded and the failure rate
+        reaches failure_rate_threshold the breaker opens.
+    OPEN: calls are refused until open_timeout seconds have passed, after
+        which the breaker goes HALF_OPEN.
+    HALF_OPEN: up to half_open_max_calls probe calls are let through. A
+        successful probe closes the breaker with a fresh window; a failed one
+        opens it again for another open_timeout.
+
+    A call that carried several texts may be recorded as count outcomes, so
+    the window fills at the same rate whether texts are sent one by one or
+    in batches.
+
+    on_state_change(old_state, new_state) is called on every transition.
+    """
+
+    def __init__(self, failure_rate_threshold=0.5, window_size=20, min_calls=5,
+                 open_timeout=30.0, half_open_max_calls=1, on_state_change=None):
+        self.failure_rate_threshold = failure_rate_threshold
+        self.min_calls = min_calls
+        self.open_timeout = open_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.on_state_change = on_state_change
+
+        self._outcomes = deque(maxlen=window_size) # True = failure
+        self._failures = 0
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    @property
+    def failure_rate(self):
+        with self._lock:
+            return self._failures / len(self._outcomes) if self._outcomes else 0.0
+
+    def allow_request(self):
+        """
+        Returns True if a call may go to the backend now. Every allowed call
+        must be followed by record_success() or record_failure().
+        """
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._probes_in_flight < self.half_open_max_calls:
+                self._probes_in_flight += 1
+                return True
+            return False
+
+    def record_success(self, count=1):
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                self._reset_window()
+                self._transition(CLOSED)
+            elif self._state == CLOSED:
+                for _ in range(count):
+                    self._record(False)
+
+    def record_failure(self, count=1):
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                self._open()
+            elif self._state == CLOSED:
+                for _ in range(count):
+                    self._record(True)
+                if (len(self._outcomes) >= self.min_calls
+                        and self._failures / len(self._outcomes) >= self.failure_rate_threshold):
+                    self._open()
+
+    def _record(self, failed):
+        if len(self._outcomes) == self._outcomes.maxlen and self._outcomes[0]:
+            self._failures -= 1
+        self._outcomes.append(failed)
+        if failed:
+            self._failures += 1
+
+    def _reset_window(self):
+        self._outcomes.clear()
+        self._failures = 0
+
+    def _open(self):
+        self._opened_at = time.monotonic()
+        self._reset_window()
+        self._transition(OPEN)
+
+    def _maybe_half_open(self):
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_timeout:
+            self._probes_in_flight = 0
+            self._transition(HALF_OPEN)
+
+    def _transition(self, new_state):
+        old_state, self._state = self._state, new_state
+        if old_state != new_state and self.on_state_change is not None:
+            self.on_state_change(old_state, new_state)
@@ -0,0 +1,128 @@
+import threading
+from enum import IntEnum
+
+# Compact conversation records.
+#
+# A session keeps one Turn per message instead of a dict per turn plus a
+# second copy of every analysis: the text is stored once, the label as a
+# small integer code and the scores as a tuple of values whose key tuple is
+# shared by every turn scored by the same backend. The JSON shape the API and
+# the session store use ({'role', 'content', 'sentiment': {...}}) is built
+# only when a turn is serialized (to_dict). Turns still answer turn['role']
+# style lookups for code that treated them as dicts.
+
+
+class Label(IntEnum):
+    VERY_NEGATIVE = 0
+    NEGATIVE = 1
+    NEUTRAL = 2
+    POSITIVE = 3
+    VERY_POSITIVE = 4
+
+
+# Display label per code: 'Very Negative', 'Negative', ...
+_LABEL_NAMES = [label.name.replace('_', ' ').title() for label in Label]
+_LABEL_CODES = {name: code for code, name in enumerate(_LABEL_NAMES)}
+_label_lock = threading.Lock()
+
+
+def encode_label(name):
+    """
+    Returns the code of a display label. Labels outside Label (a model
+    with other classes) get the next free code for this process.
+    """
+    code = _LABEL_CODES.get(name)
+    if code is None:
+        with _label_lock:
+            code = _LABEL_CODES.get(name)
+            if code is None:
+                _LABEL_NAMES.append(name)
+                code = _LABEL_CODES[name] = len(_LABEL_NAMES) - 1
+    return code
+
+
+def decode_label(code):
+    return _LABEL_NAMES[code]
+
+
+# Keys of an analysis dict that have a slot of their own
+_ANALYSIS_KEYS = ('text', 'scores', 'compound', 'label')
+
+# One shared tuple per distinct set of score keys (VADER's, the models')
+_score_keys = {}
+
+USER = 'user'
+BOT = 'bot'
+
+
+class Turn:
+    """
+    One message of a conversation. User turns carry the analysis of their
+    text (label code, compound, scores, and any further keys such as
+    `chunks` in extra); bot turns have label None.
+    """
+    __slots__ = ('role', 'content', 'label', 'compound', 'score_keys', 'score_values', 'extra')
+
+    def __init__(self, role, content, label=None, compound=0.0, score_keys=(), score_values=(), extra=None):
+        self.role = role
+        self.content = content
+        self.label = label
+        self.compound = compound
+        self.score_keys = score_keys
+        self.score_values = score_values
+        self.extra = extra
+
+    @classmethod
+    def user(cls, text, analysis):
+        scores = analysis['scores']
+        keys = tuple(scores)
+        keys = _score_keys.setdefault(keys, keys)
+        extra = {key: value for key, value in analysis.items() if key not in _ANALYSIS_KEYS} or None
+        return cls(USER, text, encode_label(analysis['label']), analysis['compound'],
+                   keys, tuple(scores.values()), extra)
+
+    @classmethod
+    def bot(cls, text):
+        return cls(BOT, text)
+
+    @classmethod
+    def from_dict(cls, turn):
+        if turn.get('sentiment') is None:
+            return cls(turn['role'], turn['content'])
+        return cls.user(turn['content'], turn['sentiment'])
+
+    @property
+    def sentiment(self):
+        """
+        The analysis as the dict SentimentEngine returned, or None.
+        """
+        if self.label is None:
+            return None
+        analysis = {
+            'text': self.content,
+            'scores': dict(zip(self.score_keys, self.score_values)),
+            'compound': self.compound,
+            'label': decode_label(self.label)
+        }
+        if self.extra:
+            analysis.update(self.extra)
+        return analysis
+
+    def to_dict(self):
+        return {'role': self.role, 'content': self.content, 'sentiment': self.sentiment}
+
+    def __getitem__(self, key):
+        if key == 'role':
+            return self.role
+        if key == 'content':
+            return self.content
+        if key == 'sentiment':
+            return self.sentiment
+        raise KeyError(key)
+
+    def __repr__(self):
+        return f"Turn({self.role!r}, {self.content!r}, label={self.label!r}, compound={self.compound!r})"
+
+
+def turns_to_json(turns):
+    return [turn.to_dict() for turn in turns]
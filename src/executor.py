@@ -0,0 +1,216 @@
+import asyncio
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class ExecutorSaturated(Exception):
+    """
+    Raised when the inference queue is full and a request is rejected.
+    """
+    def __init__(self, retry_after):
+        super().__init__("Inference queue is full")
+        self.retry_after = retry_after
+
+
+class InferenceTimeout(Exception):
+    """
+    Raised when an inference job does not finish within the request timeout.
+    """
+
+
+class CommitGuard:
+    """
+    Lets a job and the request waiting for it agree, once, on whether the
+    job's side effects happen. The job calls commit() before it writes
+    anything; the request calls abandon() when it stops waiting (timeout).
+    Whichever comes first wins, so a request answered with a timeout leaves
+    nothing behind for its retry to duplicate.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._state = None
+
+    def commit(self):
+        with self._lock:
+            if self._state is None:
+                self._state = 'committed'
+            return self._state == 'committed'
+
+    def abandon(self):
+        with self._lock:
+            if self._state is None:
+                self._state = 'abandoned'
+            return self._state == 'abandoned'
+
+
+class InferenceExecutor:
+    """
+    Runs blocking inference work on a bounded thread pool so the event loop
+    stays free.
+
+    At most max_workers jobs run at once and at most max_queue_depth more may
+    wait for a worker; anything beyond that is rejected with ExecutorSaturated.
+    A job that overruns its timeout is reported as InferenceTimeout to the
+    caller, but keeps its slot until the worker thread actually finishes, so
+    slow backends still push back on new traffic. A job that times out
+    before a worker picked it up is dropped.
+
+    Waiting jobs are queued per key (the session) and workers take them
+    round-robin across keys, so one client with many queued requests
+    cannot starve the others. max_queue_per_key caps the jobs a single key
+    may have waiting. At most one job per key runs at a time, so jobs of one
+    session never touch its state concurrently; jobs without a key are not
+    serialized.
+    """
+
+    def __init__(self, max_workers=4, max_queue_depth=32, timeout=15.0, retry_after=1, max_queue_per_key=None):
+        self.max_workers = max(1, int(max_workers))
+        self.max_queue_depth = max(0, int(max_queue_depth))
+        self.max_queue_per_key = max_queue_per_key
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="inference")
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._running = 0
+        # key -> deque of waiting (future, fn, args, key); the first key is served next
+        self._queues = OrderedDict()
+        # Keys with a running job
+        self._active = set()
+
+    @property
+    def in_flight(self):
+        """
+        Number of jobs currently running or waiting for a worker.
+        """
+        return self._in_flight
+
+    @property
+    def queue_depth(self):
+        """
+        Number of jobs waiting to start, for a free worker or behind a
+        running job of the same key.
+        """
+        with self._lock:
+            return sum(len(queue) for queue in self._queues.values())
+
+    async def run(self, fn, *args, timeout=None, key=None):
+        """
+        Runs fn(*args) on the pool and awaits its result. key identifies
+        the client for fair queueing.
+        """
+        future = Future()
+        job = (future, fn, args, key)
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue_depth:
+                raise ExecutorSaturated(self.retry_after)
+            start = self._running < self.max_workers and key not in self._active
+            if start:
+                self._running += 1
+                if key is not None:
+                    self._active.add(key)
+            else:
+                queue = self._queues.get(key)
+                if queue is None:
+                    queue = self._queues[key] = deque()
+                elif self.max_queue_per_key is not None and len(queue) >= self.max_queue_per_key:
+                    raise ExecutorSaturated(self.retry_after)
+                queue.append(job)
+            self._in_flight += 1
+        future.add_done_callback(self._release)
+
+        if start:
+            self._start(job)
+
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            # shield: a timeout must not cancel the asyncio wrapper of a job
+            # that is still running on its thread
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+        except asyncio.TimeoutError:
+            # Only succeeds while the job is still waiting for a worker
+            if future.cancel():
+                self._drop(job)
+            raise InferenceTimeout(f"Inference did not finish within {timeout}s")
+
+    def shutdown(self, wait=False):
+        with self._lock:
+            waiting = [job for queue in self._queues.values() for job in queue]
+            self._queues.clear()
+        for future, _, _, _ in waiting:
+            future.cancel()
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+    def _start(self, job):
+        try:
+            self._pool.submit(self._work, job)
+        except Exception as e:
+            with self._lock:
+                self._running -= 1
+                self._active.discard(job[3])
+            job[0].set_exception(e)
+
+    def _work(self, job):
+        # Runs on a pool thread: after each job, take the next waiting one
+        # (round-robin across keys) until the queues are empty
+        while job is not None:
+            future, fn, args, key = job
+            if future.set_running_or_notify_cancel():
+                try:
+                    result = fn(*args)
+                except BaseException as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+            with self._lock:
+                self._active.discard(key)
+                job = self._next_job()
+                if job is None:
+                    self._running -= 1
+                # Jobs that waited only because their key was busy may
+                # now start on idle workers
+                ready = []
+                while self._running < self.max_workers:
+                    extra = self._next_job()
+                    if extra is None:
+                        break
+                    self._running += 1
+                    ready.append(extra)
+            for extra in ready:
+                self._start(extra)
+
+    def _next_job(self):
+        # The first waiting job, in round-robin order, whose key has no running job
+        for key, queue in self._queues.items():
+            if key is not None and key in self._active:
+                continue
+            job = queue.popleft()
+            if queue:
+                self._queues.move_to_end(key)
+            else:
+                del self._queues[key]
+            if key is not None:
+                self._active.add(key)
+            return job
+        return None
+
+    def _drop(self, job):
+        # A cancelled job leaves its queue at once, so it no longer counts
+        # against max_queue_per_key or the queue depth
+        key = job[3]
+        with self._lock:
+            queue = self._queues.get(key)
+            if queue is None:
+                return
+            for i, waiting in enumerate(queue):
+                if waiting is job:
+                    del queue[i]
+                    break
+            if not queue:
+                del self._queues[key]
+
+    def _release(self, _future=None):
+        with self._lock:
+            self._in_flight -= 1
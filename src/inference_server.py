@@ -0,0 +1,359 @@
+"""
+Dedicated inference server shared by several web workers.
+
+    INFERENCE_SERVER_SOCKET=/tmp/sentiment.sock python -m src.inference_server --replicas 2
+    INFERENCE_SERVER_SOCKET=/tmp/sentiment.sock SESSION_BACKEND=sqlite uvicorn main_api:app --workers 8
+
+The server holds the models; each of its replicas is a forked process with
+its own SentimentEngine, all accepting on the same Unix socket, so memory
+scales with replicas instead of web workers. With INFERENCE_SERVER_SOCKET
+set, get_engine() in a web worker returns an EngineClient instead of
+loading models. main_api's micro-batcher then coalesces concurrent
+statements into one RPC, and the server batches again across workers.
+
+Wire format: each message is a 4-byte big-endian length followed by that
+many bytes of UTF-8 JSON. Requests are {"method": ..., ...}; replies are
+{"result": ...} or {"error": "..."}.
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import socket
+import struct
+import sys
+import threading
+import time
+
+from src.batching import MicroBatcher
+from src.registry import create_local_engine
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct(">I")
+MAX_MESSAGE_BYTES = 16 * 1024 * 1024
+
+
+class ServerUnavailable(Exception):
+    pass
+
+
+class ServerTimeout(ServerUnavailable):
+    """
+    The server took the request but did not answer in time. It may still be
+    working on it, so the request is not resent.
+    """
+
+
+def send_message(sock, obj):
+    payload = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+    sock.sendall(_HEADER.pack(len(payload)) + payload)
+
+
+def recv_message(sock):
+    """
+    Reads one message; returns None when the peer closed the connection.
+    """
+    header = _recv_exact(sock, _HEADER.size)
+    if header is None:
+        return None
+    (length,) = _HEADER.unpack(header)
+    if length > MAX_MESSAGE_BYTES:
+        raise ValueError(f"Message of {length} bytes exceeds the {MAX_MESSAGE_BYTES} byte limit")
+    payload = _recv_exact(sock, length)
+    if payload is None:
+        raise ConnectionError("Connection closed mid-message")
+    return json.loads(payload)
+
+
+def _recv_exact(sock, size):
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        n = sock.recv_into(view[received:])
+        if n == 0:
+            if received == 0:
+                return None
+            raise ConnectionError("Connection closed mid-message")
+        received += n
+    return bytes(buffer)
+
+
+class InferenceServer:
+    """
+    Serves a SentimentEngine on a Unix socket.
+
+    serve_forever() runs `replicas` forked processes on one listening
+    socket, each building its engine with engine_factory after the fork.
+    start()/close() run a single replica on a background thread of the
+    current process instead (tests, embedding).
+    """
+
+    def __init__(self, path, engine_factory=create_local_engine, replicas=1,
+                 max_batch_size=32, max_wait_ms=5, warm_up=True):
+        self.path = path
+        self.engine_factory = engine_factory
+        self.replicas = max(1, int(replicas))
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.warm_up = warm_up
+        self._listener = None
+        self._thread = None
+
+    def _bind(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(self.path)
+        listener.listen(128)
+        self._listener = listener
+        return listener
+
+    def start(self):
+        listener = self._bind()
+        self._thread = threading.Thread(target=self._serve, args=(listener,), name="inference-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        if self._listener is not None:
+            # shutdown() wakes a thread blocked in accept(); close() alone may not
+            try:
+                self._listener.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._listener.close()
+            self._listener = None
+        if self._thread is not None:
+            self._thread.join(5)
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def serve_forever(self):
+        listener = self._bind()
+        if self.replicas == 1:
+            self._serve(listener)
+            return
+
+        context = multiprocessing.get_context("fork")
+        workers = [context.Process(target=self._serve_replica, args=(listener,), name=f"inference-replica-{i}")
+                   for i in range(self.replicas)]
+        for worker in workers:
+            worker.start()
+        logger.info("Inference server on %s with %d replicas", self.path, self.replicas)
+        try:
+            for worker in workers:
+                worker.join()
+        finally:
+            for worker in workers:
+                worker.terminate()
+            self.close()
+
+    def _serve_replica(self, listener):
+        from src.logging_config import configure_logging
+
+        configure_logging()
+        self._serve(listener)
+
+    def _serve(self, listener):
+        engine = self.engine_factory()
+        engine.preload()
+        if self.warm_up:
+            engine.warm_up()
+        batcher = MicroBatcher(engine, max_batch_size=self.max_batch_size, max_wait_ms=self.max_wait_ms)
+        connections = set()
+        logger.info("Inference replica %d ready on %s", os.getpid(), self.path)
+        try:
+            while True:
+                try:
+                    conn, _ = listener.accept()
+                except OSError:
+                    return # listener closed
+                connections.add(conn)
+                threading.Thread(target=self._handle, args=(conn, engine, batcher, connections), daemon=True).start()
+        finally:
+            # Disconnect clients so they reconnect or fall back instead of
+            # reaching a closed batcher
+            for conn in list(connections):
+                try:
+                    conn.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+            batcher.close()
+
+    def _handle(self, conn, engine, batcher, connections):
+        try:
+            self._handle_requests(conn, engine, batcher)
+        finally:
+            connections.discard(conn)
+            conn.close()
+
+    def _handle_requests(self, conn, engine, batcher):
+        while True:
+            try:
+                request = recv_message(conn)
+            except (OSError, ValueError) as e:
+                logger.warning("Dropping inference client connection: %s", e)
+                return
+            if request is None:
+                return
+            try:
+                reply = {'result': self._dispatch(request, engine, batcher)}
+            except Exception as e:
+                logger.exception("Inference request failed")
+                reply = {'error': str(e)}
+            try:
+                send_message(conn, reply)
+            except OSError:
+                return
+
+    def _dispatch(self, request, engine, batcher):
+        method = request.get('method')
+        if method == 'analyze_many':
+            return batcher.analyze_many(request['texts'])
+        if method == 'status':
+            return {'pid': os.getpid(), 'hinglish_model': bool(engine.has_hinglish_model)}
+        raise ValueError(f"Unknown method '{method}'")
+
+
+class EngineClient:
+    """
+    Thin stand-in for SentimentEngine in a web worker: analyze_many and
+    analyze_statement are forwarded to an InferenceServer over its Unix
+    socket. Idle connections are pooled and reused.
+
+    If the server cannot be reached or does not answer within timeout,
+    statements are scored by a local VADER-only engine rather than failing
+    the request, like any other backend outage. Keep timeout below the web
+    executor's deadline so the fallback is reached before the request
+    times out.
+    """
+
+    def __init__(self, path, timeout=10.0, pool_size=8, connect_timeout=60.0):
+        self.path = path
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self._idle = queue.LifoQueue(maxsize=pool_size)
+        self._fallback = None
+        self._fallback_lock = threading.Lock()
+
+    @property
+    def fallback(self):
+        if self._fallback is None:
+            with self._fallback_lock:
+                if self._fallback is None:
+                    from src.sentiment import SentimentEngine
+                    engine = SentimentEngine()
+                    engine.use_vader = True
+                    self._fallback = engine
+        return self._fallback
+
+    @property
+    def has_hinglish_model(self):
+        try:
+            return self._call('status')['hinglish_model']
+        except ServerUnavailable:
+            return False
+
+    def preload(self):
+        """
+        Waits until the server answers (it loads the models), up to
+        connect_timeout seconds.
+        """
+        deadline = time.monotonic() + self.connect_timeout
+        while True:
+            try:
+                return self._call('status')
+            except ServerUnavailable:
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.2)
+
+    def warm_up(self):
+        # The server warms up its own replicas
+        pass
+
+    def analyze_statement(self, text):
+        return self.analyze_many([text])[0]
+
+    def analyze_many(self, texts):
+        texts = list(texts)
+        if not texts:
+            return []
+        try:
+            return self._call('analyze_many', texts=texts)
+        except ServerUnavailable as e:
+            logger.warning("Inference server unavailable (%s). Falling back to VADER.", e)
+            return self.fallback.analyze_many(texts)
+
+    def analyze_conversation(self, statements):
+        return self.fallback.analyze_conversation(statements)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def _call(self, method, **params):
+        # A pooled connection may have gone stale (server restart); retry once on a fresh one.
+        # A read timeout is not retried: the server has the request and may still be busy with it.
+        try:
+            return self._call_once(self._idle.get_nowait(), method, params)
+        except queue.Empty:
+            pass
+        except ServerTimeout:
+            raise
+        except ServerUnavailable:
+            pass
+        return self._call_once(None, method, params)
+
+    def _call_once(self, conn, method, params):
+        try:
+            if conn is None:
+                conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                conn.settimeout(self.timeout)
+                conn.connect(self.path)
+            send_message(conn, dict(params, method=method))
+            reply = recv_message(conn)
+            if reply is None:
+                raise ConnectionError("Server closed the connection")
+        except socket.timeout as e:
+            conn.close()
+            raise ServerTimeout(f"No reply within {self.timeout}s") from e
+        except (OSError, ValueError) as e:
+            if conn is not None:
+                conn.close()
+            raise ServerUnavailable(str(e)) from e
+
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+        if 'error' in reply:
+            raise RuntimeError(f"Inference server error: {reply['error']}")
+        return reply['result']
+
+
+def main(argv=None):
+    from src.logging_config import configure_logging
+
+    parser = argparse.ArgumentParser(description="Serve the sentiment models to web workers over a Unix socket.")
+    parser.add_argument("--socket", default=os.getenv("INFERENCE_SERVER_SOCKET", "/tmp/sentiment-inference.sock"))
+    parser.add_argument("--replicas", type=int, default=int(os.getenv("INFERENCE_SERVER_REPLICAS", "1")),
+                        help="model replicas (processes) behind the socket")
+    parser.add_argument("--batch-size", type=int, default=int(os.getenv("SENTIMENT_BATCH_SIZE", "32")))
+    parser.add_argument("--batch-wait-ms", type=float, default=float(os.getenv("SENTIMENT_BATCH_WAIT_MS", "5")))
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    InferenceServer(args.socket, replicas=args.replicas, max_batch_size=args.batch_size,
+                    max_wait_ms=args.batch_wait_ms).serve_forever()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
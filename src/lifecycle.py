@@ -0,0 +1,119 @@
+"""
+Model loading at process start.
+
+ModelLoader preloads and warms up the engine, by default on a background
+thread so the server accepts traffic (and answers liveness probes) at once;
+main_api reports its status on /readyz.
+
+Run as a module to snapshot the local Hinglish model for faster restarts:
+    python -m src.lifecycle snapshot ./models/hinglish
+then start with HINGLISH_MODEL_PATH=./models/hinglish (and the same
+HINGLISH_RUNTIME).
+"""
+import argparse
+import logging
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+STARTING = 'starting'
+LOADING = 'loading'
+READY = 'ready'
+FAILED = 'failed'
+
+
+class ModelLoader:
+    """
+    Preloads an engine's backends and runs its warm-up pass.
+
+    mode is 'background' (load on a daemon thread), 'sync' (load inside
+    start()) or 'off' (nothing is preloaded, backends load on first use and
+    the loader is ready at once).
+    """
+
+    def __init__(self, engine, mode='background', warm_up=True):
+        if mode not in ('background', 'sync', 'off'):
+            raise ValueError(f"Unknown preload mode '{mode}' (expected 'background', 'sync' or 'off')")
+        self.engine = engine
+        self.mode = mode
+        self.warm_up = warm_up
+        self.state = STARTING
+        self.error = None
+        self.load_seconds = None
+        self._thread = None
+
+    @property
+    def ready(self):
+        return self.state == READY
+
+    def start(self):
+        if self.mode == 'off':
+            self.state = READY
+            return self
+        self.state = LOADING
+        if self.mode == 'sync':
+            self._load()
+        else:
+            self._thread = threading.Thread(target=self._load, name="model-loader", daemon=True)
+            self._thread.start()
+        return self
+
+    def wait(self, timeout=None):
+        """
+        Blocks until loading finished (or timeout). Returns ready.
+        """
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.ready
+
+    def status(self):
+        status = {
+            'status': self.state,
+            'mode': self.mode,
+            'load_seconds': self.load_seconds,
+            'error': self.error,
+        }
+        if self.state == READY and self.mode != 'off':
+            # Only read once loaded; before that it would trigger the load
+            status['hinglish_model'] = bool(self.engine.has_hinglish_model)
+        return status
+
+    def _load(self):
+        start = time.perf_counter()
+        try:
+            self.engine.preload()
+            if self.warm_up:
+                self.engine.warm_up()
+        except Exception as e:
+            logger.exception("Model preload failed")
+            self.error = str(e)
+            self.state = FAILED
+        else:
+            self.state = READY
+        self.load_seconds = round(time.perf_counter() - start, 3)
+        logger.info("Model preload finished: %s in %.1fs", self.state, self.load_seconds)
+
+
+def main(argv=None):
+    from src.backends import create_hinglish_backend
+
+    parser = argparse.ArgumentParser(description="Model lifecycle utilities.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    snapshot = commands.add_parser("snapshot", help="save the loaded Hinglish tokenizer and model to a directory")
+    snapshot.add_argument("path")
+    args = parser.parse_args(argv)
+
+    backend = create_hinglish_backend()
+    if not backend.available:
+        print(f"Could not load {backend.model_id}; nothing to snapshot.", file=sys.stderr)
+        return 1
+    backend.save_snapshot(args.path)
+    print(f"Saved {backend.model_id} ({backend.runtime_used} runtime) to {args.path}. "
+          f"Start with HINGLISH_MODEL_PATH={args.path} HINGLISH_RUNTIME={backend.runtime_used}.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,119 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+
+# Application logging.
+#
+# Modules log through logging.getLogger(__name__) with %-style arguments, so
+# a message below the configured level is never formatted. Records that pass
+# the level check are put on an in-process queue; a listener thread formats
+# and writes them, so request threads never block on stdout.
+#
+#   LOG_LEVEL   level for the application loggers (default INFO; DEBUG
+#               restores the old per-message routing/model output)
+#   LOG_FORMAT  'text' (default) or 'json', one object per line
+
+APP_LOGGERS = ("src", "main_api")
+
+# Attributes every LogRecord has; anything else was passed via extra=
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listener = None
+
+
+class StructuredFormatter(logging.Formatter):
+    """
+    Formats a record with the fields passed through extra= appended, as
+    key=value pairs or as a JSON object.
+    """
+
+    def __init__(self, json_output=False):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+        self.json_output = json_output
+
+    def format(self, record):
+        fields = {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRS}
+        if not self.json_output:
+            line = super().format(record)
+            if fields:
+                line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+            return line
+
+        entry = {
+            'ts': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entry.update(fields)
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread. The stock
+    prepare() formats in the calling thread; records here only carry
+    immutable arguments, so they can be queued as they are.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def configure_logging(level=None, fmt=None, stream=None):
+    """
+    Routes the application loggers through a background queue listener.
+    Safe to call more than once; later calls only update the level.
+    """
+    global _listener
+    level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+    for name in APP_LOGGERS:
+        logging.getLogger(name).setLevel(level)
+    if _listener is not None:
+        return _listener
+
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(StructuredFormatter(json_output=(fmt or os.getenv("LOG_FORMAT", "text")).lower() == "json"))
+
+    log_queue = queue.SimpleQueue()
+    for name in APP_LOGGERS:
+        logger = logging.getLogger(name)
+        logger.addHandler(_DeferredQueueHandler(log_queue))
+        logger.propagate = False
+
+    _listener = QueueListener(log_queue, handler)
+    _listener.start()
+    atexit.register(stop_logging)
+    return _listener
+
+
+def stop_logging():
+    """
+    Flushes queued records and stops the listener thread.
+    """
+    if _listener is None:
+        return
+    _listener.stop()
+    _detach()
+
+
+def _detach():
+    global _listener
+    for name in APP_LOGGERS:
+        logger = logging.getLogger(name)
+        for handler in [h for h in logger.handlers if isinstance(h, _DeferredQueueHandler)]:
+            logger.removeHandler(handler)
+        logger.propagate = True
+    _listener = None
+
+
+# A forked child (e.g. a bulk scoring worker) has the queue but not the
+# listener thread, so it starts from unconfigured logging instead
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_detach)
@@ -0,0 +1,228 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# In-process metrics rendered in the Prometheus text exposition format.
+#
+# Counters, gauges and histograms keep one value (or bucket array) per
+# label combination behind a lock, so recording is a dict lookup and an
+# add. Gauges can instead read a callback when scraped (queue depth, active
+# sessions), which costs nothing between scrapes. REGISTRY holds the
+# metrics used by the engine and the API; main_api serves REGISTRY.render()
+# on /metrics.
+
+# Seconds; spans a cached lookup (~10us) to a slow API round trip
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _label_key(labelnames, labels):
+    if set(labels) != set(labelnames):
+        raise ValueError(f"Expected labels {labelnames}, got {tuple(labels)}")
+    return tuple(str(labels[name]) for name in labelnames)
+
+
+def _format_labels(labelnames, key, extra=None):
+    pairs = list(zip(labelnames, key))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """
+    Monotonic count, one series per label combination.
+    """
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(_label_key(self.labelnames, labels), 0)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name, key, None, value) for key, value in items]
+
+
+class Gauge:
+    """
+    Value that goes up and down. With set_function, the value is read from
+    the callback at scrape time instead.
+    """
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._function = None
+        self._lock = threading.Lock()
+
+    def set(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = value
+
+    def set_function(self, fn):
+        self._function = fn
+
+    def value(self, **labels):
+        if self._function is not None:
+            return self._function()
+        return self._values.get(_label_key(self.labelnames, labels), 0)
+
+    def samples(self):
+        if self._function is not None:
+            try:
+                return [(self.name, (), None, self._function())]
+            except Exception:
+                return []
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name, key, None, value) for key, value in items]
+
+
+class Histogram:
+    """
+    Cumulative-bucket latency histogram with _sum and _count series.
+    """
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {} # key -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels):
+        series = self._series.get(_label_key(self.labelnames, labels))
+        return sum(series[:-1]) if series else 0
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(series)) for key, series in self._series.items()]
+        samples = []
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series[:-1]):
+                cumulative += count
+                samples.append((self.name + '_bucket', key, ('le', _format_value(bound)), cumulative))
+            samples.append((self.name + '_sum', key, None, series[-1]))
+            samples.append((self.name + '_count', key, None, cumulative))
+        return samples
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric '{metric.name}' is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self):
+        """
+        Returns every metric in the Prometheus text format (version 0.0.4).
+        """
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, key, extra, value in metric.samples():
+                lines.append(f"{name}{_format_labels(metric.labelnames, key, extra)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "sentiment_stage_seconds", "Time spent per analysis stage.", ("stage",)
+)
+BACKEND_SECONDS = REGISTRY.histogram(
+    "sentiment_backend_seconds", "Time per backend call (one batch).", ("backend",)
+)
+REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_seconds", "End-to-end latency per API endpoint.", ("endpoint",)
+)
+ANALYSES = REGISTRY.counter(
+    "sentiment_analyses_total", "Statements analyzed, by the backend that scored them.", ("backend",)
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    "sentiment_cache_requests_total", "Result cache lookups.", ("backend", "result")
+)
+FALLBACKS = REGISTRY.counter(
+    "sentiment_fallbacks_total", "Statements sent to VADER instead of a model.", ("reason",)
+)
+RATE_LIMITED = REGISTRY.counter(
+    "rate_limited_requests_total", "Requests refused by a rate limit.", ("scope",)
+)
+BREAKER_TRANSITIONS = REGISTRY.counter(
+    "sentiment_breaker_transitions_total", "Circuit breaker state changes.", ("from_state", "to_state")
+)
+INFERENCE_IN_FLIGHT = REGISTRY.gauge(
+    "inference_in_flight", "Jobs running or queued on the inference executor."
+)
+INFERENCE_QUEUE_DEPTH = REGISTRY.gauge(
+    "inference_queue_depth", "Jobs waiting to start on the inference executor, including jobs behind a busy session."
+)
+BATCHER_PENDING = REGISTRY.gauge(
+    "sentiment_batcher_pending", "Statements waiting in the micro-batcher."
+)
+ACTIVE_SESSIONS = REGISTRY.gauge(
+    "active_sessions", "Chat sessions held by the session store."
+)
@@ -0,0 +1,99 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class RateLimited(Exception):
+    """
+    Raised when a request exceeds its session's or the global rate limit.
+    """
+    def __init__(self, retry_after, scope):
+        super().__init__(f"Rate limit exceeded ({scope})")
+        self.retry_after = retry_after
+        self.scope = scope
+
+
+class TokenBucket:
+    """
+    Allows `rate` requests per second on average and bursts of up to
+    `burst`. Tokens are refilled lazily from the elapsed time when the
+    bucket is used, so an idle bucket costs nothing.
+    """
+    __slots__ = ('rate', 'burst', 'tokens', 'updated')
+
+    def __init__(self, rate, burst, now):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = now
+
+    def take(self, now, cost=1.0):
+        """
+        Takes cost tokens and returns 0, or returns the seconds until they
+        will be available (nothing is taken then).
+        """
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+    def give_back(self, cost=1.0):
+        self.tokens = min(self.burst, self.tokens + cost)
+
+
+class RateLimiter:
+    """
+    Per-session and global token buckets.
+
+    A request must get a token from its session's bucket and from the
+    global one. A rate of 0 (or None) disables that limit. Session buckets
+    live in an LRU bounded by max_sessions: a bucket evicted for being
+    least recently used has usually refilled anyway, so accounting stays
+    O(1) in time and bounded in memory however many sessions come and go.
+    """
+
+    def __init__(self, session_rate=5.0, session_burst=10, global_rate=None, global_burst=None,
+                 max_sessions=100000, clock=time.monotonic):
+        self.session_rate = session_rate
+        self.session_burst = session_burst
+        self.max_sessions = max_sessions
+        self.clock = clock
+        self._sessions = OrderedDict()
+        self._global = None
+        if global_rate:
+            self._global = TokenBucket(global_rate, global_burst or global_rate, clock())
+        self._lock = threading.Lock()
+
+    @property
+    def sessions(self):
+        return len(self._sessions)
+
+    def check(self, key):
+        """
+        Takes a token for key; raises RateLimited with the seconds to wait
+        when the session or the global limit is exhausted.
+        """
+        with self._lock:
+            now = self.clock()
+            bucket = None
+            if self.session_rate:
+                bucket = self._sessions.get(key)
+                if bucket is None:
+                    bucket = self._sessions[key] = TokenBucket(self.session_rate, self.session_burst, now)
+                    if len(self._sessions) > self.max_sessions:
+                        self._sessions.popitem(last=False)
+                else:
+                    self._sessions.move_to_end(key)
+                wait = bucket.take(now)
+                if wait:
+                    raise RateLimited(wait, 'session')
+
+            if self._global is not None:
+                wait = self._global.take(now)
+                if wait:
+                    # The request is refused, so the session keeps its token
+                    if bucket is not None:
+                        bucket.give_back()
+                    raise RateLimited(wait, 'global')
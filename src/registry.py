@@ -0,0 +1,71 @@
+import os
+import threading
+
+# Process-wide engines, keyed by name
+_engines = {}
+_lock = threading.Lock()
+
+
+def get_engine(name="default"):
+    """
+    Returns the shared engine registered under name. The default engine is
+    created on first request; backends inside it load lazily on first use.
+    """
+    engine = _engines.get(name)
+    if engine is None:
+        with _lock:
+            engine = _engines.get(name)
+            if engine is None:
+                if name != "default":
+                    raise KeyError(f"No sentiment engine registered as '{name}'")
+                engine = _engines[name] = _engine_from_env()
+    return engine
+
+
+def _engine_from_env():
+    # Web workers sharing a dedicated inference server hold only a client
+    socket_path = os.getenv("INFERENCE_SERVER_SOCKET")
+    if socket_path:
+        from src.inference_server import EngineClient
+        # Below the web executor's deadline, so a hung server falls back to VADER instead of a 504
+        default_timeout = float(os.getenv("INFERENCE_TIMEOUT_S", "15")) * 2 / 3
+        return EngineClient(socket_path, timeout=float(os.getenv("INFERENCE_SERVER_TIMEOUT_S", default_timeout)))
+    return create_local_engine()
+
+
+def create_local_engine():
+    """
+    Builds an in-process SentimentEngine configured from the environment.
+    """
+    from src.backends import create_hinglish_backend, create_multilingual_backend
+    from src.cache import SentimentCache
+    from src.circuit_breaker import CircuitBreaker
+    from src.sentiment import SentimentEngine
+
+    hedge_ms = os.getenv("SENTIMENT_HEDGE_MS")
+    remote_timeout = float(os.getenv("SENTIMENT_REMOTE_TIMEOUT_S", "10"))
+    return SentimentEngine(
+        cache=SentimentCache.from_env(),
+        breaker=CircuitBreaker(open_timeout=float(os.getenv("SENTIMENT_BREAKER_OPEN_S", "30"))),
+        hedge_after_ms=float(hedge_ms) if hedge_ms else None,
+        multilingual_backend=create_multilingual_backend(timeout=remote_timeout),
+        hinglish_backend=create_hinglish_backend()
+    )
+
+
+def register_engine(engine, name="default"):
+    """
+    Makes engine the shared instance for name, e.g. to install a wrapped or
+    preconfigured engine at application startup.
+    """
+    with _lock:
+        _engines[name] = engine
+    return engine
+
+
+def clear_engines():
+    """
+    Forgets every registered engine (mainly for tests).
+    """
+    with _lock:
+        _engines.clear()
@@ -0,0 +1,106 @@
+import re
+
+_DEVANAGARI = re.compile(r"[\u0900-\u097F]")
+_LATIN_TOKEN = re.compile(r"[a-z]+")
+
+# Hinglish keywords that are also everyday English words. They are weak
+# evidence: without a strong keyword they never decide a message on their own.
+AMBIGUOUS_WORDS = frozenset({
+    'the', 'main', 'h', 'ho', 'sun', 'hum', 'ha', 'ab', 'par', 'kam', 'ki',
+    'ya', 'wo', 'fir', 'bol', 'ka'
+})
+
+# Common English function words. When a message with only weak Hinglish
+# evidence contains one of these, it is routed as English without langdetect.
+ENGLISH_WORDS = frozenset({
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'but', 'by', 'for', 'from',
+    'i', 'in', 'is', 'it', 'me', 'my', 'not', 'of', 'on', 'or', 'so', 'that',
+    'this', 'to', 'was', 'we', 'were', 'what', 'with', 'you', 'your'
+})
+
+_langdetect = None
+
+
+def _load_langdetect(seed):
+    global _langdetect
+    if _langdetect is None:
+        from langdetect import DetectorFactory, detect, LangDetectException
+        # langdetect is randomized by default; a fixed seed makes it repeatable
+        DetectorFactory.seed = seed
+        _langdetect = (detect, LangDetectException)
+    return _langdetect
+
+
+class LanguageRouter:
+    """
+    Decides whether a message is Hinglish (Hindi-English code-mixing in Latin
+    script) and should go to the local Hinglish model.
+
+    All patterns and keyword sets are built once, at construction:
+      1. Any Devanagari character -> not Hinglish (pure Hindi goes to the
+         multilingual model).
+      2. Distinct lowercased Latin tokens (punctuation stripped) are checked
+         against the keyword sets.
+      3. Any strong keyword -> Hinglish, no keyword at all -> not Hinglish.
+      4. Only ambiguous words ("the main reason", "I love the sun"): English
+         if the message also has an English function word, and otherwise
+         settled by a seeded, lazily imported langdetect: Hinglish unless it
+         says English. Tie-break verdicts are memoized, since they are the
+         only expensive step.
+    The result depends only on the text, so routing is deterministic.
+    """
+
+    def __init__(self, keywords, ambiguous=AMBIGUOUS_WORDS, english_words=ENGLISH_WORDS,
+                 use_langdetect=True, seed=0, memo_size=4096):
+        keywords = frozenset(keywords)
+        self.strong_words = keywords - ambiguous
+        self.weak_words = keywords & ambiguous
+        self.english_words = frozenset(english_words) - keywords
+        self.use_langdetect = use_langdetect
+        self.seed = seed
+        self.memo_size = memo_size
+        self._memo = {}
+
+    def is_hinglish(self, text):
+        if _DEVANAGARI.search(text):
+            return False
+
+        tokens = set(_LATIN_TOKEN.findall(text.lower()))
+        if not tokens.isdisjoint(self.strong_words):
+            return True
+        # Ambiguous words alone are never conclusive, however many there are
+        if tokens.isdisjoint(self.weak_words):
+            return False
+        if not tokens.isdisjoint(self.english_words):
+            return False
+        return self._tie_break(text)
+
+    def preload(self):
+        """
+        Imports langdetect and loads its language profiles now instead of on
+        the first tie-break.
+        """
+        if self.use_langdetect:
+            self._detect("kal milte hai")
+
+    def _tie_break(self, text):
+        if not self.use_langdetect:
+            return False
+        verdict = self._memo.get(text)
+        if verdict is None:
+            verdict = self._detect(text)
+            if self.memo_size:
+                if len(self._memo) >= self.memo_size:
+                    self._memo.clear()
+                self._memo[text] = verdict
+        return verdict
+
+    def _detect(self, text):
+        try:
+            detect, LangDetectException = _load_langdetect(self.seed)
+        except ImportError:
+            return False
+        try:
+            return detect(text) != 'en'
+        except LangDetectException:
+            return False
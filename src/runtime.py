@@ -0,0 +1,103 @@
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Optimized CPU runtimes for local text-classification models.
+#
+#   torch      full-precision PyTorch eager mode (the original pipeline)
+#   quantized  PyTorch with dynamic int8 quantization of every nn.Linear
+#   onnx       ONNX export run by ONNX Runtime (needs `optimum[onnxruntime]`)
+#   auto       onnx, then quantized, then torch: the first one that loads
+#
+# transformers, torch and onnxruntime are imported on first build, so
+# importing this module (and the engine) stays cheap.
+#
+# Whatever is requested, a runtime that fails to load falls back to the next
+# one and finally to the plain torch pipeline, so a missing optional package
+# never takes the model down.
+
+FALLBACK_ORDER = {
+    'auto': ('onnx', 'quantized', 'torch'),
+    'onnx': ('onnx', 'torch'),
+    'quantized': ('quantized', 'torch'),
+    'torch': ('torch',),
+}
+
+
+def build_text_classifier(source, runtime='torch', intra_op_threads=None, inter_op_threads=None,
+                          cache_dir=None, local_files_only=False):
+    """
+    Builds a text-classification pipeline for source (a Hub model id or a
+    local directory) on the requested runtime.
+    Returns (pipeline, runtime actually used).
+    """
+    if runtime not in FALLBACK_ORDER:
+        raise ValueError(f"Unknown runtime '{runtime}' (expected one of {', '.join(FALLBACK_ORDER)})")
+
+    from transformers import AutoTokenizer, pipeline
+
+    tokenizer = AutoTokenizer.from_pretrained(source, cache_dir=cache_dir, local_files_only=local_files_only)
+    candidates = FALLBACK_ORDER[runtime]
+    for candidate in candidates:
+        try:
+            model = _BUILDERS[candidate](source, intra_op_threads, inter_op_threads, cache_dir, local_files_only)
+        except Exception as e:
+            if candidate == candidates[-1]:
+                raise
+            logger.warning("%s runtime unavailable for %s (%s). Falling back.", candidate, source, e)
+            continue
+        return pipeline("text-classification", model=model, tokenizer=tokenizer), candidate
+
+
+def _set_torch_threads(intra_op_threads, inter_op_threads):
+    import torch
+
+    if intra_op_threads:
+        torch.set_num_threads(intra_op_threads)
+    if inter_op_threads:
+        try:
+            torch.set_num_interop_threads(inter_op_threads)
+        except RuntimeError:
+            # Can only be set once, before any inter-op parallel work started
+            pass
+
+
+def _load_torch(source, intra_op_threads, inter_op_threads, cache_dir, local_files_only):
+    from transformers import AutoModelForSequenceClassification
+
+    _set_torch_threads(intra_op_threads, inter_op_threads)
+    model = AutoModelForSequenceClassification.from_pretrained(
+        source, cache_dir=cache_dir, local_files_only=local_files_only
+    )
+    return model.eval()
+
+
+def _load_quantized(source, intra_op_threads, inter_op_threads, cache_dir, local_files_only):
+    import torch
+
+    model = _load_torch(source, intra_op_threads, inter_op_threads, cache_dir, local_files_only)
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _load_onnx(source, intra_op_threads, inter_op_threads, cache_dir, local_files_only):
+    import onnxruntime
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+
+    options = onnxruntime.SessionOptions()
+    if intra_op_threads:
+        options.intra_op_num_threads = intra_op_threads
+    if inter_op_threads:
+        options.inter_op_num_threads = inter_op_threads
+    # A snapshot directory already holds the exported graph
+    exported = os.path.isfile(os.path.join(source, "model.onnx"))
+    return ORTModelForSequenceClassification.from_pretrained(
+        source, export=not exported, session_options=options, cache_dir=cache_dir, local_files_only=local_files_only
+    )
+
+
+_BUILDERS = {
+    'torch': _load_torch,
+    'quantized': _load_quantized,
+    'onnx': _load_onnx,
+}
@@ -12,32 +12,147 @@ if platform.system() == "Windows":
     except Exception:
         pass
 
-from huggingface_hub import InferenceClient
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
-import nltk
 from statistics import mean
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 import os
+import logging
+import threading
+import time
 from dotenv import load_dotenv
-from transformers import pipeline
+
+from src.analytics import conversation_label, conversation_trend
+from src.chunking import ChunkPlan, TextChunker, combine_chunk_results
+from src.backends import (
+    HINGLISH_MODEL_ID, MULTILINGUAL_MODEL_ID, LocalPipelineBackend, RemoteMultilingualBackend
+)
+from src.circuit_breaker import OPEN, CircuitBreaker, CircuitOpenError
+from src.metrics import ANALYSES, BACKEND_SECONDS, BREAKER_TRANSITIONS, CACHE_REQUESTS, FALLBACKS, STAGE_SECONDS
+from src.routing import LanguageRouter
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+def _hinglish_result(text, label, score):
+    """
+    Maps a Hinglish model prediction (positive, negative, neutral) to a result dict.
+    """
+    label = label.lower()
+    if 'positive' in label:
+        compound = score
+        display_label = 'Positive'
+    elif 'negative' in label:
+        compound = -score
+        display_label = 'Negative'
+    else: # neutral
+        compound = 0
+        display_label = 'Neutral'
+
+    return {
+        'text': text,
+        'scores': {'pos': score if 'positive' in label else 0, 'neg': score if 'negative' in label else 0},
+        'compound': compound,
+        'label': display_label
+    }
+
+def _multilingual_result(text, label, score):
+    """
+    Maps a Tabularisai prediction (5 classes: very negative, negative, neutral,
+    positive, very positive) to a result dict.
+    """
+    label = label.lower()
+    if 'very positive' in label or 'very_positive' in label:
+        compound = score
+        display_label = 'Very Positive'
+    elif 'very negative' in label or 'very_negative' in label:
+        compound = -score
+        display_label = 'Very Negative'
+    elif 'positive' in label and 'very' not in label:
+        compound = score * 0.5
+        display_label = 'Positive'
+    elif 'negative' in label and 'very' not in label:
+        compound = -score * 0.5
+        display_label = 'Negative'
+    elif 'neutral' in label:
+        compound = 0
+        display_label = 'Neutral'
+    else:
+        # Fallback
+        compound = 0
+        display_label = label.title()
+
+    return {
+        'text': text,
+        'scores': {'pos': score if display_label in ['Positive', 'Very Positive'] else 0,
+                   'neg': score if display_label in ['Negative', 'Very Negative'] else 0},
+        'compound': compound,
+        'label': display_label
+    }
+
+def _chunked_result(text, pieces, to_result):
+    """
+    Builds the result for text from the predictions of its chunks (see
+    src.chunking); a text that was not split maps as before.
+    """
+    if len(pieces) == 1:
+        _, _, (label, score) = pieces[0]
+        return to_result(text, label, score)
+    chunk_results = [to_result(chunk, label, score) for chunk, _, (label, score) in pieces]
+    return combine_chunk_results(text, chunk_results, [weight for _, weight, _ in pieces])
+
+# Dummy statements for warm_up: Hinglish, English and Hindi
+WARMUP_TEXTS = ["yeh bahut acha hai bhai", "I am really happy today", "This was terrible.", "\u092e\u0941\u091d\u0947 \u092f\u0939 \u092a\u0938\u0902\u0926 \u0939\u0948"]
+
+def _log_breaker_change(old_state, new_state):
+    logger.warning("Hugging Face API circuit breaker: %s -> %s", old_state, new_state)
+    BREAKER_TRANSITIONS.inc(from_state=old_state, to_state=new_state)
+
 class SentimentEngine:
-    def __init__(self):
+    def __init__(self, cache=None, breaker=None, remote_timeout=10.0, hedge_after_ms=None,
+                 multilingual_backend=None, hinglish_backend=None, max_chunk_tokens=None):
+        # Forces the VADER fallback for every statement when set
         self.use_vader = False
-        # Primary Multilingual Model (API) - Supports 22 languages
-        self.model_id = "tabularisai/multilingual-sentiment-analysis"
+        # Optional SentimentCache consulted before any backend runs
+        self.cache = cache
+        # Upper bound on parallel API requests when scoring a batch; further
+        # statements fall back to VADER instead of queueing behind a slow API
+        self.max_remote_concurrency = 8
+
+        # Primary Multilingual Model - Supports 22 languages. Served by the
+        # Inference API by default, or in process (see src.backends)
+        # remote_timeout bounds each API request (seconds)
+        self.multilingual_backend = multilingual_backend or RemoteMultilingualBackend(
+            MULTILINGUAL_MODEL_ID,
+            timeout=remote_timeout,
+            max_concurrency=self.max_remote_concurrency
+        )
+        self.model_id = self.multilingual_backend.model_id
+
+        # API failures trip this breaker instead of disabling the API for good;
+        # while it is open, statements fall back to VADER
+        self.breaker = breaker or CircuitBreaker()
+        if self.breaker.on_state_change is None:
+            self.breaker.on_state_change = _log_breaker_change
+        # If the API has not answered after this many ms, answer from VADER
+        # instead; the API result still lands in the cache when it arrives
+        self.hedge_after_ms = hedge_after_ms
+        self._remote_pool = None
+        self._remote_slots = None
+        # Statements longer than this many tokens are scored in sentence
+        # chunks; None uses each backend's own input limit
+        self.max_chunk_tokens = max_chunk_tokens
         
         # Specialized Hinglish Model (Local Pipeline)
-        print("Initializing local Hinglish model (this may take a moment)...")
-        try:
-            self.hinglish_pipe = pipeline("text-classification", model="pascalrai/hinglish-twitter-roberta-base-sentiment")
-            self.has_hinglish_model = True
-        except Exception as e:
-            print(f"Warning: Could not load local Hinglish model: {e}")
-            self.has_hinglish_model = False
-        
+        self.hinglish_backend = hinglish_backend or LocalPipelineBackend(HINGLISH_MODEL_ID)
+        self.hinglish_model_id = self.hinglish_backend.model_id
+
+        # Backends are loaded lazily on first use (see the properties below),
+        # so constructing an engine is cheap. Share one engine per process
+        # through src.registry rather than constructing new ones.
+        self._load_lock = threading.RLock()
+        self._vader = None
+
         # Hinglish indicators (common words)
         self.hinglish_words = {
             # Question words
@@ -59,175 +174,335 @@ class SentimentEngine:
             'abhi', 'ab', 'phir', 'fir', 'par', 'lekin', 'aur', 'ya', 'ki', 'ke', 'ka',
             'heh', 'hain', 'hoon', 'ho', 'hai'
         }
+        # Language routing is compiled once here and reused for every message
+        self.router = LanguageRouter(self.hinglish_words)
         
-        # Try to load token
-        token = os.getenv("HF_TOKEN")
-        
-        if token:
-            print(f"Initializing Hugging Face API with token from .env...")
-            self.client = InferenceClient(token=token)
-        else:
-            print("No HF_TOKEN found in .env. Using anonymous access (may be rate limited or restricted).")
-            self.client = InferenceClient()
+    @property
+    def hinglish_pipe(self):
+        return self.hinglish_backend.pipe
 
-        # Initialize VADER as fallback
-        try:
-            nltk.data.find('sentiment/vader_lexicon.zip')
-        except LookupError:
-            nltk.download('vader_lexicon', quiet=True)
-        self.vader = SentimentIntensityAnalyzer()
+    @hinglish_pipe.setter
+    def hinglish_pipe(self, pipe):
+        self.hinglish_backend.pipe = pipe
+
+    @property
+    def has_hinglish_model(self):
+        return self.hinglish_backend.available
+
+    @has_hinglish_model.setter
+    def has_hinglish_model(self, value):
+        self.hinglish_backend.available = value
+
+    @property
+    def client(self):
+        """
+        Inference API client of the remote multilingual backend.
+        """
+        return self.multilingual_backend.client
+
+    @client.setter
+    def client(self, client):
+        self.multilingual_backend.client = client
+
+    @property
+    def vader(self):
+        if self._vader is None:
+            with self._load_lock:
+                if self._vader is None:
+                    import nltk
+                    from nltk.sentiment.vader import SentimentIntensityAnalyzer
+                    from src.vader import BatchVader
+
+                    # Initialize VADER as fallback
+                    try:
+                        nltk.data.find('sentiment/vader_lexicon.zip')
+                    except LookupError:
+                        nltk.download('vader_lexicon', quiet=True)
+                    self._vader = BatchVader(SentimentIntensityAnalyzer())
+        return self._vader
+
+    @vader.setter
+    def vader(self, vader):
+        self._vader = vader
+
+    def preload(self):
+        """
+        Loads every backend now instead of on first use.
+        """
+        self.hinglish_backend.load()
+        self.multilingual_backend.load()
+        self.vader
+        self.router.preload()
+
+    def warm_up(self, texts=WARMUP_TEXTS, rounds=2):
+        """
+        Runs a few dummy inferences through the in-process backends so the
+        first real requests do not pay for kernel selection and buffer
+        allocation. The remote API and the result cache are left alone.
+        """
+        texts = list(texts)
+        for _ in range(rounds):
+            if self.has_hinglish_model:
+                self.hinglish_backend.classify(texts)
+            if not self.multilingual_backend.remote and self.multilingual_backend.available:
+                self.multilingual_backend.classify(texts)
+            self._analyze_vader_many(texts)
 
     def _is_hinglish(self, text):
         """
         Detects if text is Hinglish (Hindi-English code-mixing in Latin script).
-        Uses langdetect + script detection + keyword matching.
+        Uses script detection + keyword scoring, with langdetect as a tie-breaker
+        (see LanguageRouter).
         """
-        try:
-            from langdetect import detect, LangDetectException
-            
-            # Detect language
-            try:
-                lang = detect(text)
-                print(f"DEBUG: langdetect detected language: {lang} for text: '{text[:50]}...'")
-            except LangDetectException:
-                # If detection fails, fall back to keyword matching
-                lang = None
-                print(f"DEBUG: langdetect failed, using keyword matching for: '{text[:50]}...'")
-            
-            # Check if text contains Devanagari script (pure Hindi)
-            has_devanagari = any('\u0900' <= char <= '\u097F' for char in text)
-            
-            # If it's pure Devanagari Hindi, it's NOT Hinglish
-            if has_devanagari:
-                print(f"DEBUG: Devanagari detected, NOT Hinglish")
-                return False
-            
-            # Check for Hindi keywords in the text
-            words = set(text.lower().split())
-            has_hindi_keywords = bool(words.intersection(self.hinglish_words))
-            
-            # If langdetect says it's Hindi but no Devanagari, it's likely Hinglish (Romanized)
-            if lang == 'hi':
-                print(f"DEBUG: Detected as 'hi' (Hindi) in Latin script → Hinglish")
-                return True
-            
-            # If it has Hindi keywords (regardless of what langdetect says), it's Hinglish
-            if has_hindi_keywords:
-                print(f"DEBUG: Hindi keywords found ({words.intersection(self.hinglish_words)}) → Hinglish")
-                return True
-            
-            print(f"DEBUG: No Hinglish indicators found → Standard")
-            return False
-            
-        except ImportError:
-            # Fallback to simple keyword matching if langdetect not installed
-            print("Warning: langdetect not installed. Using keyword-based detection.")
-            words = set(text.lower().split())
-            return bool(words.intersection(self.hinglish_words))
+        is_hinglish = self.router.is_hinglish(text)
+        logger.debug("Routing -> %s", 'Hinglish' if is_hinglish else 'Standard')
+        return is_hinglish
 
     def analyze_statement(self, text):
         """
         Analyzes a single statement. Detects Hinglish vs Standard.
         """
+        return self.analyze_many([text])[0]
+
+    def analyze_many(self, texts):
+        """
+        Analyzes a batch of statements. Hinglish texts go through the local
+        pipeline in a single call; the rest go to the multilingual backend.
+        Returns one result dict per input text, in order.
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+
+        start = time.perf_counter()
+        results = [None] * len(texts)
+        # Backend that produced each result, for the analysis log record
+        sources = [None] * len(texts)
         if not self.use_vader:
-            try:
-                # Detect Language
-                if self.has_hinglish_model and self._is_hinglish(text):
-                    print(f"DEBUG: Detected Hinglish. Using local pipeline.")
-                    
-                    # Local Pipeline Inference
-                    result = self.hinglish_pipe(text)[0]
-                    label = result['label'].lower()
-                    score = result['score']
-                    
-                    print(f"DEBUG: Local Hinglish Model Output -> Label: {label}, Score: {score}")
-
-                    # Hinglish Model Mapping (positive, negative, neutral)
-                    # The model outputs 'positive', 'negative', 'neutral' directly based on your snippet
-                    if 'positive' in label:
-                        compound = score
-                        display_label = 'Positive'
-                    elif 'negative' in label:
-                        compound = -score
-                        display_label = 'Negative'
-                    else: # neutral
-                        compound = 0
-                        display_label = 'Neutral'
-                        
-                    return {
-                        'text': text,
-                        'scores': {'pos': score if 'positive' in label else 0, 'neg': score if 'negative' in label else 0},
-                        'compound': compound,
-                        'label': display_label
-                    }
-                
-                else:
-                    print(f"DEBUG: Detected Standard/Multilingual. Using API model: {self.model_id}")
-                    
-                    # HF Inference API
-                    response = self.client.text_classification(text, model=self.model_id)
-                    top_result = response[0]
-                    
-                    label = top_result.label.lower()
-                    score = top_result.score
-
-                    print(f"DEBUG: Hugging Face API Output -> Label: {top_result.label}, Score: {score}")
-
-                    # Tabularisai Model Mapping (5 classes: very negative, negative, neutral, positive, very positive)
-                    if 'very positive' in label or 'very_positive' in label:
-                        compound = score
-                        display_label = 'Very Positive'
-                    elif 'very negative' in label or 'very_negative' in label:
-                        compound = -score
-                        display_label = 'Very Negative'
-                    elif 'positive' in label and 'very' not in label:
-                        compound = score * 0.5
-                        display_label = 'Positive'
-                    elif 'negative' in label and 'very' not in label:
-                        compound = -score * 0.5
-                        display_label = 'Negative'
-                    elif 'neutral' in label:
-                        compound = 0
-                        display_label = 'Neutral'
+            hinglish_idx = []
+            standard_idx = []
+            with STAGE_SECONDS.time(stage='route'):
+                for i, text in enumerate(texts):
+                    # Detect Language
+                    # Routing first, so the local model only loads once Hinglish shows up
+                    if self._is_hinglish(text) and self.has_hinglish_model:
+                        hinglish_idx.append(i)
                     else:
-                        # Fallback
-                        compound = 0
-                        display_label = label.title()
-
-                    return {
-                        'text': text,
-                        'scores': {'pos': score if display_label in ['Positive', 'Very Positive'] else 0, 
-                                   'neg': score if display_label in ['Negative', 'Very Negative'] else 0},
-                        'compound': compound,
-                        'label': display_label
-                    }
-            
+                        standard_idx.append(i)
+
+            hinglish_idx = self._fill_from_cache(texts, hinglish_idx, results, 'hinglish', self.hinglish_model_id, sources)
+            standard_idx = self._fill_from_cache(texts, standard_idx, results, 'multilingual', self.model_id, sources)
+
+            if hinglish_idx:
+                logger.debug("Detected Hinglish. Using local pipeline for %d statement(s).", len(hinglish_idx))
+
+                try:
+                    # Local Pipeline Inference (one batched call, long texts as several chunks)
+                    plan = self._plan_chunks(self.hinglish_backend, [texts[i] for i in hinglish_idx])
+                    with BACKEND_SECONDS.time(backend='hinglish'):
+                        outputs = self.hinglish_backend.classify(plan.chunks)
+                    for i, pieces in zip(hinglish_idx, plan.regroup(outputs)):
+                        logger.debug("Local Hinglish Model Output -> %s", [output for _, _, output in pieces])
+                        results[i] = _chunked_result(texts[i], pieces, _hinglish_result)
+                        sources[i] = 'hinglish'
+                        self._store_in_cache(texts[i], results[i], 'hinglish', self.hinglish_model_id)
+                except Exception as e:
+                    logger.error("Error running local Hinglish model: %s. Falling back to VADER.", e)
+                    FALLBACKS.inc(len(hinglish_idx), reason='hinglish_error')
+
+            if standard_idx and not self.multilingual_backend.available:
+                # The local model failed to load (logged once, by load())
+                FALLBACKS.inc(len(standard_idx), reason='model_unavailable')
+            elif standard_idx:
+                logger.debug("Detected Standard/Multilingual. Using %s model: %s",
+                             self.multilingual_backend.name, self.model_id)
+
+                plan = self._plan_chunks(self.multilingual_backend, [texts[i] for i in standard_idx])
+                outputs = self._classify_multilingual(plan)
+                if outputs is not None:
+                    for i, pieces in zip(standard_idx, plan.regroup(outputs)):
+                        logger.debug("Multilingual Model Output -> %s", [output for _, _, output in pieces])
+                        results[i] = _chunked_result(texts[i], pieces, _multilingual_result)
+                        sources[i] = 'multilingual'
+                        self._store_in_cache(texts[i], results[i], 'multilingual', self.model_id)
+        else:
+            FALLBACKS.inc(len(texts), reason='forced')
+
+        # Fallback: VADER (for whatever the models did not score)
+        missing = [i for i, result in enumerate(results) if result is None]
+        missing = self._fill_from_cache(texts, missing, results, 'vader', 'vader_lexicon', sources)
+        if missing:
+            with BACKEND_SECONDS.time(backend='vader'):
+                scored = self._analyze_vader_many([texts[i] for i in missing])
+            for i, result in zip(missing, scored):
+                results[i] = result
+                sources[i] = 'vader'
+                self._store_in_cache(texts[i], result, 'vader', 'vader_lexicon')
+
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage='analyze')
+        for source in sources:
+            ANALYSES.inc(backend=source)
+
+        if logger.isEnabledFor(logging.INFO):
+            latency_ms = round((time.perf_counter() - start) * 1000, 2)
+            for result, source in zip(results, sources):
+                logger.info("analysis", extra={
+                    'backend': source, 'label': result['label'], 'compound': result['compound'],
+                    'latency_ms': latency_ms, 'batch_size': len(texts)
+                })
+        return results
+
+    def _fill_from_cache(self, texts, indices, results, backend, model_id, sources=None):
+        """
+        Fills results[i] for every cached text in indices and returns the
+        indices that still need the backend.
+        """
+        if self.cache is None or not indices:
+            return indices
+        misses = []
+        start = time.perf_counter()
+        for i in indices:
+            cached = self.cache.get(self.cache.make_key(texts[i], backend, model_id), texts[i])
+            if cached is None:
+                misses.append(i)
+            else:
+                results[i] = cached
+                if sources is not None:
+                    sources[i] = f"{backend}_cached"
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage='cache')
+        CACHE_REQUESTS.inc(len(indices) - len(misses), backend=backend, result='hit')
+        CACHE_REQUESTS.inc(len(misses), backend=backend, result='miss')
+        return misses
+
+    def _store_in_cache(self, text, result, backend, model_id):
+        if self.cache is not None:
+            self.cache.put(self.cache.make_key(text, backend, model_id), result)
+
+    def _plan_chunks(self, backend, texts):
+        """
+        Splits the texts longer than the backend's input limit into sentence
+        chunks. Backends without a tokenizer hook are given the texts as is.
+        """
+        if not hasattr(backend, 'count_tokens'):
+            return ChunkPlan(texts)
+        with STAGE_SECONDS.time(stage='chunk'):
+            chunker = TextChunker(backend.count_tokens, self.max_chunk_tokens or backend.max_tokens)
+            return ChunkPlan(texts, chunker)
+
+    def _classify_multilingual(self, plan):
+        """
+        Runs the multilingual backend on the chunks of plan. Remote backends
+        go through the circuit breaker and the hedge deadline. Returns the
+        (label, score) prediction per chunk, or None when the caller should
+        fall back.
+        """
+        texts = plan.chunks
+        if not self.multilingual_backend.remote:
+            try:
+                with BACKEND_SECONDS.time(backend=self.multilingual_backend.name):
+                    return self.multilingual_backend.classify(texts)
             except Exception as e:
-                print(f"Error calling HF API: {e}")
-                print("Falling back to VADER for this session.")
-                self.use_vader = True
-        
-        # Fallback: VADER
-        return self._analyze_vader(text)
+                logger.error("Error running local multilingual model: %s. Falling back to VADER.", e)
+                FALLBACKS.inc(len(texts), reason='model_error')
+                return None
 
-    def _analyze_vader(self, text):
-        scores = self.vader.polarity_scores(text)
-        compound = scores['compound']
-        
-        label = 'Neutral'
-        if compound >= 0.05:
-            label = 'Positive'
-        elif compound <= -0.05:
-            label = 'Negative'
-            
-        print(f"DEBUG: VADER Output -> {label} ({compound})")
-        
-        return {
-            'text': text,
-            'scores': scores,
-            'compound': compound,
-            'label': label
-        }
+        # The breaker is consulted again when the call starts (see
+        # _classify_remote_recorded); this check only avoids queueing
+        if self.breaker.state == OPEN:
+            logger.debug("Circuit open, skipping API. Falling back to VADER.")
+            FALLBACKS.inc(len(texts), reason='breaker_open')
+            return None
+
+        pool, slots = self._get_remote_pool()
+        if not slots.acquire(blocking=False):
+            logger.debug("%d API calls in flight, answering from VADER.", self.max_remote_concurrency)
+            FALLBACKS.inc(len(texts), reason='remote_saturated')
+            return None
+        try:
+            future = pool.submit(self._classify_remote_recorded, texts)
+        except Exception:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: slots.release())
+
+        hedge = self.hedge_after_ms / 1000.0 if self.hedge_after_ms is not None else None
+        try:
+            return future.result(timeout=hedge)
+        except FutureTimeout:
+            logger.debug("API slower than %sms, answering from VADER.", self.hedge_after_ms)
+            FALLBACKS.inc(len(texts), reason='hedge')
+            future.add_done_callback(lambda f: self._cache_late_results(plan, f))
+        except CircuitOpenError:
+            logger.debug("Circuit %s, skipping API. Falling back to VADER.", self.breaker.state)
+            FALLBACKS.inc(len(texts), reason='breaker_open')
+        except Exception as e:
+            logger.warning("Error calling HF API: %s. Falling back to VADER for this request.", e)
+            FALLBACKS.inc(len(texts), reason='api_error')
+        return None
+
+    def _classify_remote_recorded(self, texts):
+        # Runs on the remote pool: the breaker may have opened since the call was queued
+        if not self.breaker.allow_request():
+            raise CircuitOpenError(self.breaker.state)
+        # One outcome per text: a failed batch of n texts weighs like n failed calls
+        try:
+            with BACKEND_SECONDS.time(backend=self.multilingual_backend.name):
+                outputs = self.multilingual_backend.classify(texts)
+        except Exception:
+            self.breaker.record_failure(len(texts))
+            raise
+        self.breaker.record_success(len(texts))
+        return outputs
+
+    def _cache_late_results(self, plan, future):
+        if future.cancelled() or future.exception() is not None:
+            return
+        for text, pieces in zip(plan.texts, plan.regroup(future.result())):
+            result = _chunked_result(text, pieces, _multilingual_result)
+            self._store_in_cache(text, result, 'multilingual', self.model_id)
+
+    def _get_remote_pool(self):
+        """
+        Returns the remote call pool and the semaphore bounding the calls in
+        flight on it (one per worker, so calls never queue in the pool).
+        """
+        if self._remote_pool is None:
+            with self._load_lock:
+                if self._remote_pool is None:
+                    self._remote_slots = threading.BoundedSemaphore(self.max_remote_concurrency)
+                    self._remote_pool = ThreadPoolExecutor(
+                        max_workers=self.max_remote_concurrency, thread_name_prefix="remote-sentiment"
+                    )
+        return self._remote_pool, self._remote_slots
+
+    def _analyze_vader_many(self, texts):
+        """
+        Scores a batch with VADER, using the vectorized analyze_many when the
+        analyzer has one.
+        """
+        if hasattr(self.vader, 'analyze_many'):
+            all_scores = self.vader.analyze_many(texts)
+        else:
+            all_scores = [self.vader.polarity_scores(text) for text in texts]
+
+        results = []
+        for text, scores in zip(texts, all_scores):
+            compound = scores['compound']
+
+            label = 'Neutral'
+            if compound >= 0.05:
+                label = 'Positive'
+            elif compound <= -0.05:
+                label = 'Negative'
+
+            results.append({
+                'text': text,
+                'scores': scores,
+                'compound': compound,
+                'label': label
+            })
+        logger.debug("VADER scored %d statement(s)", len(texts))
+        return results
 
     def analyze_conversation(self, statements):
         """
@@ -251,12 +526,7 @@ class SentimentEngine:
             if not first_half or not second_half:
                 pass # Not enough data
             else:
-                mean_first = mean(first_half)
-                mean_second = mean(second_half)
-                if mean_second - mean_first > 0.2:
-                    trend = "Improving"
-                elif mean_first - mean_second > 0.2:
-                    trend = "Declining"
+                trend = conversation_trend(mean(first_half), mean(second_half))
 
         return {
             'compound': avg_compound,
@@ -265,9 +535,4 @@ class SentimentEngine:
         }
 
     def _get_label(self, compound_score):
-        if compound_score >= 0.1:
-            return 'Positive'
-        elif compound_score <= -0.1:
-            return 'Negative'
-        else:
-            return 'Neutral'
+        return conversation_label(compound_score)
@@ -0,0 +1,259 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class SessionConflict(Exception):
+    """
+    Raised by save() when the session changed (another request, worker or
+    a reset) since the bot being saved was loaded. Reload and redo the change.
+    """
+    def __init__(self, user_id):
+        super().__init__(f"Session '{user_id}' was modified concurrently")
+        self.user_id = user_id
+
+
+class InMemorySessionStore:
+    """
+    Keeps Chatbot sessions in process memory as an LRU.
+
+    At most max_sessions are kept; the least recently used one is dropped
+    when a new session would exceed the cap. Sessions untouched for
+    idle_timeout seconds are dropped as well. Because the LRU order is also
+    last-access order, idle sessions are always at the front, so the sweep
+    only looks at entries it is going to evict.
+    """
+
+    def __init__(self, bot_factory, max_sessions=10000, idle_timeout=3600):
+        self.bot_factory = bot_factory
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self._sessions = OrderedDict() # user_id -> (last_seen, Chatbot)
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, user_id, create=True):
+        """
+        Returns the session for user_id, creating one if needed (or None when
+        create is False and there is no live session).
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._sessions.get(user_id)
+            if entry is None:
+                if not create:
+                    return None
+                bot = self.bot_factory()
+                self._add(user_id, bot, now)
+                return bot
+            self._sessions[user_id] = (now, entry[1])
+            self._sessions.move_to_end(user_id)
+            return entry[1]
+
+    def save(self, user_id, bot):
+        """
+        Records that the session changed. Sessions live in memory, so this
+        only refreshes their position in the LRU. Raises SessionConflict
+        when the session was replaced (reset) since bot was loaded.
+        """
+        with self._lock:
+            entry = self._sessions.get(user_id)
+            if entry is None:
+                self._add(user_id, bot, time.monotonic())
+            elif entry[1] is not bot:
+                raise SessionConflict(user_id)
+            else:
+                self._sessions[user_id] = (time.monotonic(), bot)
+                self._sessions.move_to_end(user_id)
+
+    def reset(self, user_id):
+        bot = self.bot_factory()
+        with self._lock:
+            self._sessions.pop(user_id, None)
+            self._add(user_id, bot, time.monotonic())
+        return bot
+
+    def delete(self, user_id):
+        with self._lock:
+            self._sessions.pop(user_id, None)
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __contains__(self, user_id):
+        return user_id in self._sessions
+
+    def _add(self, user_id, bot, now):
+        self._sessions[user_id] = (now, bot)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+            self.evictions += 1
+
+    def _evict_idle(self, now):
+        if self.idle_timeout is None:
+            return
+        cutoff = now - self.idle_timeout
+        while self._sessions:
+            user_id, (last_seen, _) = next(iter(self._sessions.items()))
+            if last_seen > cutoff:
+                break
+            del self._sessions[user_id]
+            self.evictions += 1
+
+
+class SqliteSessionStore:
+    """
+    Persists sessions to a sqlite file so several uvicorn workers can serve
+    the same user and sessions survive restarts.
+
+    Every get() reads the session's saved state and every save() writes it
+    back. Nothing is cached in process, so a session updated by another
+    worker is always seen fresh. Each row has a version: save() only
+    succeeds if the row still has the version the bot was loaded with
+    (compare-and-swap) and raises SessionConflict otherwise, so concurrent
+    writers never overwrite each other's turns. A new session is written by
+    its first save(). Idle and over-cap sessions are swept from the file at
+    most once per sweep_interval seconds.
+    """
+
+    def __init__(self, bot_factory, path="sessions.db", max_sessions=10000, idle_timeout=3600, sweep_interval=60):
+        self.bot_factory = bot_factory
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.sweep_interval = sweep_interval
+        self._lock = threading.Lock()
+        self._last_sweep = 0
+        self.evictions = 0
+
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS sessions "
+            "(user_id TEXT PRIMARY KEY, state TEXT NOT NULL, last_seen REAL NOT NULL, version INTEGER NOT NULL DEFAULT 1)"
+        )
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(sessions)")]
+        if 'version' not in columns:
+            # File created before sessions were versioned
+            self._db.execute("ALTER TABLE sessions ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+        self._db.execute("CREATE INDEX IF NOT EXISTS sessions_last_seen ON sessions (last_seen)")
+        self._db.commit()
+
+    def get(self, user_id, create=True):
+        with self._lock:
+            self._maybe_sweep()
+            row = self._db.execute(
+                "SELECT state, last_seen, version FROM sessions WHERE user_id = ?", (user_id,)
+            ).fetchone()
+
+        if row is not None and (self.idle_timeout is None or row[1] > time.time() - self.idle_timeout):
+            bot = self.bot_factory()
+            bot.load_state(json.loads(row[0]))
+            bot.store_version = row[2]
+            return bot
+
+        if not create:
+            return None
+        bot = self.bot_factory()
+        # An expired row not swept yet is replaced by the first save
+        bot.store_version = row[2] if row is not None else None
+        return bot
+
+    def save(self, user_id, bot):
+        state = json.dumps(bot.to_state())
+        with self._lock:
+            if bot.store_version is None:
+                cursor = self._db.execute(
+                    "INSERT OR IGNORE INTO sessions (user_id, state, last_seen, version) VALUES (?, ?, ?, 1)",
+                    (user_id, state, time.time())
+                )
+                version = 1
+            else:
+                cursor = self._db.execute(
+                    "UPDATE sessions SET state = ?, last_seen = ?, version = version + 1 "
+                    "WHERE user_id = ? AND version = ?",
+                    (state, time.time(), user_id, bot.store_version)
+                )
+                version = bot.store_version + 1
+            self._db.commit()
+        if cursor.rowcount == 0:
+            raise SessionConflict(user_id)
+        bot.store_version = version
+
+    def reset(self, user_id):
+        """
+        Replaces the session with an empty one, whatever its version.
+        """
+        bot = self.bot_factory()
+        state = json.dumps(bot.to_state())
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE sessions SET state = ?, last_seen = ?, version = version + 1 WHERE user_id = ?",
+                (state, time.time(), user_id)
+            )
+            if cursor.rowcount == 0:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO sessions (user_id, state, last_seen, version) VALUES (?, ?, ?, 1)",
+                    (user_id, state, time.time())
+                )
+            bot.store_version = self._db.execute(
+                "SELECT version FROM sessions WHERE user_id = ?", (user_id,)
+            ).fetchone()[0]
+            self._db.commit()
+        return bot
+
+    def delete(self, user_id):
+        with self._lock:
+            self._db.execute("DELETE FROM sessions WHERE user_id = ?", (user_id,))
+            self._db.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def __contains__(self, user_id):
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM sessions WHERE user_id = ?", (user_id,)).fetchone() is not None
+
+    def close(self):
+        self._db.close()
+
+    def _maybe_sweep(self):
+        now = time.time()
+        if now - self._last_sweep < self.sweep_interval:
+            return
+        self._last_sweep = now
+
+        evicted = 0
+        if self.idle_timeout is not None:
+            evicted += self._db.execute("DELETE FROM sessions WHERE last_seen <= ?", (now - self.idle_timeout,)).rowcount
+        evicted += self._db.execute(
+            "DELETE FROM sessions WHERE user_id IN "
+            "(SELECT user_id FROM sessions ORDER BY last_seen DESC LIMIT -1 OFFSET ?)",
+            (self.max_sessions,)
+        ).rowcount
+        self._db.commit()
+        self.evictions += evicted
+
+
+def create_session_store(bot_factory):
+    """
+    Builds the session store selected by the SESSION_* environment variables.
+    """
+    backend = os.getenv("SESSION_BACKEND", "memory").lower()
+    max_sessions = int(os.getenv("SESSION_MAX", "10000"))
+    idle_timeout = float(os.getenv("SESSION_IDLE_TIMEOUT_S", "3600"))
+
+    if backend == "sqlite":
+        return SqliteSessionStore(
+            bot_factory,
+            path=os.getenv("SESSION_DB_PATH", "sessions.db"),
+            max_sessions=max_sessions,
+            idle_timeout=idle_timeout
+        )
+    if backend != "memory":
+        raise ValueError(f"Unknown SESSION_BACKEND '{backend}' (expected 'memory' or 'sqlite')")
+    return InMemorySessionStore(bot_factory, max_sessions=max_sessions, idle_timeout=idle_timeout)
@@ -0,0 +1,136 @@
+"""
+Offline stand-ins shared by the tests and the benchmarks: a local HTTP
+server that answers like the Hugging Face Inference API, and a tiny
+randomly initialised RoBERTa classifier for the local Hinglish backend.
+"""
+import json
+import os
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LABELS = ("Very Negative", "Negative", "Neutral", "Positive", "Very Positive")
+
+
+def _label(text):
+    return LABELS[zlib.crc32(str(text).encode('utf-8')) % len(LABELS)]
+
+
+class StubInferenceServer:
+    """
+    Serves text-classification responses on 127.0.0.1 after latency_ms.
+    The label is label_for(text), by default derived from a checksum of the
+    input so runs are reproducible; each prediction list also carries a
+    lower-scored runner-up, as the API returns every class. Pass url as the
+    model id to point InferenceClient at it.
+
+    For tests, queued (status, headers) entries in failures are answered
+    first, and the stub records request payloads, client connections and
+    the peak number of requests in flight.
+    """
+
+    def __init__(self, latency_ms=20.0, label_for=None):
+        self.latency_ms = latency_ms
+        self.label_for = label_for or _label
+        self.requests = 0
+        self.failures = []
+        self.payloads = []
+        self.connections = set()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes; without this,
+            # Nagle plus delayed ACKs add ~40ms to every keep-alive request
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                with stub.lock:
+                    stub.requests += 1
+                    stub.payloads.append(payload)
+                    stub.connections.add(self.client_address)
+                    stub.in_flight += 1
+                    stub.peak_in_flight = max(stub.peak_in_flight, stub.in_flight)
+                    failure = stub.failures.pop(0) if stub.failures else None
+                time.sleep(stub.latency_ms / 1000.0)
+                with stub.lock:
+                    stub.in_flight -= 1
+
+                if failure:
+                    status, headers = failure
+                    body = b'{"error": "stub failure"}'
+                else:
+                    status, headers = 200, {}
+                    inputs = payload.get('inputs', '')
+                    if isinstance(inputs, list):
+                        # Batched inputs: one prediction list per text
+                        predictions = [stub.predictions(text) for text in inputs]
+                    else:
+                        predictions = [stub.predictions(inputs)]
+                    body = json.dumps(predictions).encode('utf-8')
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        # A short poll interval keeps shutdown quick
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,),
+                                        name="stub-hf-api", daemon=True)
+
+    def predictions(self, text):
+        label = self.label_for(text)
+        runner_up = 'Neutral' if label != 'Neutral' else 'Positive'
+        return [{'label': label, 'score': 0.9}, {'label': runner_up, 'score': 0.05}]
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+TINY_MODEL_WORDS = ("yeh", "bahut", "acha", "hai", "bhai", "kya", "mast", "yaar", "nahi", "bekaar")
+
+
+def build_tiny_model(path, words=TINY_MODEL_WORDS):
+    """
+    Saves a small randomly initialised RoBERTa classifier with the Hinglish
+    model's labels to path, with words as its vocabulary. Its latency is far
+    below the real model's; use it to compare runs, not to size production.
+    The runtime tests use it too, to compare runtimes without the network.
+    """
+    import torch
+    from transformers import BertTokenizer, RobertaConfig, RobertaForSequenceClassification
+
+    torch.manual_seed(0)
+    vocab_path = os.path.join(path, "vocab.txt")
+    with open(vocab_path, "w") as f:
+        f.write("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + list(words)))
+    BertTokenizer(vocab_path).save_pretrained(path)
+    config = RobertaConfig(
+        vocab_size=100, hidden_size=64, num_hidden_layers=2, num_attention_heads=2,
+        intermediate_size=128, max_position_embeddings=130, num_labels=3, pad_token_id=0,
+        id2label={0: 'negative', 1: 'neutral', 2: 'positive'},
+        label2id={'negative': 0, 'neutral': 1, 'positive': 2}
+    )
+    RobertaForSequenceClassification(config).save_pretrained(path)
+    return path
@@ -0,0 +1,174 @@
+import re
+import string
+from types import SimpleNamespace
+
+import numpy as np
+from nltk.sentiment.vader import VaderConstants
+
+# Batch scoring for NLTK's VADER analyzer.
+#
+# Most chat messages contain no word that VADER's context rules look at
+# (boosters, negations, "but", "least", "never so/this", "kind of", the
+# special-case idioms). For those the valence of every token is just its
+# lexicon value (plus the ALL CAPS emphasis) and comes from one NumPy
+# gather. Messages that do touch a rule get their token valences from the
+# analyzer's own rule code. Either way the scoring (sums, punctuation
+# emphasis, normalization) runs for the whole batch in NumPy, and results
+# match polarity_scores up to the final rounding.
+
+_PUNCTUATION = re.compile(f"[{re.escape(string.punctuation)}]")
+
+_RULE_WORDS = (
+    set(VaderConstants.NEGATE)
+    | {word for key in VaderConstants.BOOSTER_DICT for word in key.split()}
+    | {"but", "least", "never", "this", "kind"}
+)
+_IDIOMS = tuple(VaderConstants.SPECIAL_CASE_IDIOMS) + tuple(
+    key for key in VaderConstants.BOOSTER_DICT if ' ' in key
+)
+
+
+class BatchVader:
+    """
+    Wraps a SentimentIntensityAnalyzer with a vectorized analyze_many.
+
+    The lexicon is compiled once into a word -> index dict over a float
+    array of valences. polarity_scores is passed through unchanged.
+    """
+
+    def __init__(self, analyzer):
+        self.analyzer = analyzer
+        words = list(analyzer.lexicon)
+        self._index = {word: i for i, word in enumerate(words)}
+        self._valences = np.array([analyzer.lexicon[word] for word in words] + [0.0])
+        self._missing = len(words)
+        self._punc = set(VaderConstants.PUNC_LIST)
+        self.fast_path_hits = 0
+        self.fallbacks = 0
+
+    def polarity_scores(self, text):
+        return self.analyzer.polarity_scores(text)
+
+    def analyze_many(self, texts):
+        """
+        Returns polarity_scores(text) for every text, in order.
+        """
+        texts = list(texts)
+        token_ids = []
+        rule_valences = []
+        emphasis = []
+        segments = []
+        for i, text in enumerate(texts):
+            tokens = self._tokens(text)
+            cap_diff = 0 < sum(token.isupper() for token in tokens) < len(tokens)
+            if self._needs_rules(tokens):
+                self.fallbacks += 1
+                token_ids.extend([-1] * len(tokens))
+                rule_valences.extend(self._rule_valences(tokens, cap_diff))
+                emphasis.extend([False] * len(tokens))
+            else:
+                self.fast_path_hits += 1
+                token_ids.extend(self._index.get(token.lower(), self._missing) for token in tokens)
+                rule_valences.extend([0.0] * len(tokens))
+                emphasis.extend(cap_diff and token.isupper() for token in tokens)
+            segments.extend([i] * len(tokens))
+
+        return self._score(
+            texts, np.array(token_ids, dtype=np.intp), np.array(rule_valences, dtype=float),
+            np.array(emphasis, dtype=bool), np.array(segments, dtype=np.intp)
+        )
+
+    def _tokens(self, text):
+        """
+        VADER's tokenization (SentiText.words_and_emoticons): whitespace
+        split, one-character tokens dropped, and punctuation stripped from
+        either end of a word when what remains is a word of the text.
+        """
+        words = None
+        tokens = []
+        for token in text.split():
+            if len(token) < 2:
+                continue
+            if token[0] in string.punctuation or token[-1] in string.punctuation:
+                if words is None:
+                    words = {word for word in _PUNCTUATION.sub("", text).split() if len(word) > 1}
+                for k in range(1, 5):
+                    if token[:k] in self._punc and token[k:] in words:
+                        token = token[k:]
+                        break
+                    if token[-k:] in self._punc and token[:-k] in words:
+                        token = token[:-k]
+                        break
+            tokens.append(token)
+        return tokens
+
+    def _rule_valences(self, tokens, cap_diff):
+        """
+        Per-token valences from the analyzer's own rule code (the body of
+        polarity_scores), run on already tokenized text.
+        """
+        analyzer = self.analyzer
+        sentitext = SimpleNamespace(words_and_emoticons=tokens, is_cap_diff=cap_diff)
+        first_index = {}
+        for idx, token in enumerate(tokens):
+            first_index.setdefault(token, idx)
+
+        sentiments = []
+        for item in tokens:
+            i = first_index[item]
+            if ((i < len(tokens) - 1 and item.lower() == "kind" and tokens[i + 1].lower() == "of")
+                    or item.lower() in VaderConstants.BOOSTER_DICT):
+                sentiments.append(0)
+                continue
+            sentiments = analyzer.sentiment_valence(0, sentitext, item, i, sentiments)
+        return analyzer._but_check(tokens, sentiments)
+
+    def _needs_rules(self, tokens):
+        for token in tokens:
+            lower = token.lower()
+            if lower in _RULE_WORDS or "n't" in lower:
+                return True
+        joined = " ".join(tokens)
+        return any(idiom in joined for idiom in _IDIOMS)
+
+    def _score(self, texts, token_ids, rule_valences, emphasis, segments):
+        """
+        score_valence for a batch, with each text's tokens laid out
+        contiguously (segments[j] is the text token j belongs to). Tokens
+        with id -1 take their valence from rule_valences.
+        """
+        n = len(texts)
+        valence = np.where(token_ids >= 0, self._valences[token_ids], rule_valences)
+        in_lexicon = (token_ids >= 0) & (token_ids != self._missing)
+        caps = emphasis & in_lexicon
+        valence[caps] += np.where(valence[caps] > 0, VaderConstants.C_INCR, -VaderConstants.C_INCR)
+
+        count = np.bincount(segments, minlength=n)
+        sum_s = np.bincount(segments, weights=valence, minlength=n)
+        pos_sum = np.bincount(segments, weights=np.where(valence > 0, valence + 1, 0.0), minlength=n)
+        neg_sum = np.bincount(segments, weights=np.where(valence < 0, valence - 1, 0.0), minlength=n)
+        neu_count = np.bincount(segments, weights=(valence == 0).astype(float), minlength=n)
+
+        exclamations = np.minimum([text.count("!") for text in texts], 4)
+        questions = np.array([text.count("?") for text in texts])
+        amplifier = exclamations * 0.292 + np.where(
+            questions > 1, np.where(questions <= 3, questions * 0.18, 0.96), 0.0
+        )
+
+        sum_s = sum_s + np.sign(sum_s) * amplifier
+        compound = sum_s / np.sqrt(sum_s * sum_s + 15)
+        pos_wins = pos_sum > -neg_sum
+        neg_wins = pos_sum < -neg_sum
+        pos_sum = pos_sum + np.where(pos_wins, amplifier, 0.0)
+        neg_sum = neg_sum - np.where(neg_wins, amplifier, 0.0)
+        total = pos_sum - neg_sum + neu_count
+        total[total == 0] = 1.0
+
+        empty = count == 0
+        columns = {
+            'neg': np.where(empty, 0.0, np.abs(neg_sum / total)).round(3),
+            'neu': np.where(empty, 0.0, np.abs(neu_count / total)).round(3),
+            'pos': np.where(empty, 0.0, np.abs(pos_sum / total)).round(3),
+            'compound': np.where(empty, 0.0, compound).round(4),
+        }
+        return [{key: float(values[j]) for key, values in columns.items()} for j in range(n)]
@@ -0,0 +1,48 @@
+"""
+Shared test doubles.
+"""
+import threading
+import time
+
+
+class FakeEngine:
+    """
+    Stands in for SentimentEngine so tests run offline. A text scores
+    len(text) / 100 and is labelled 'Positive'; every batch is recorded.
+    delay_s slows each batch down, fail_after raises once that many batches
+    have been served, and fail makes preload raise. Clear release to hold
+    preload until it is set again.
+    """
+    def __init__(self, delay_s=0.0, fail_after=None, fail=False):
+        self.delay_s = delay_s
+        self.fail_after = fail_after
+        self.fail = fail
+        self.batches = []
+        self.calls = []
+        self.has_hinglish_model = True
+        self.release = threading.Event()
+        self.release.set()
+        self.lock = threading.Lock()
+
+    def preload(self):
+        self.release.wait(5)
+        self.calls.append('preload')
+        if self.fail:
+            raise RuntimeError("model missing")
+
+    def warm_up(self):
+        self.calls.append('warm_up')
+
+    def analyze_statement(self, text):
+        return self.analyze_many([text])[0]
+
+    def analyze_many(self, texts):
+        with self.lock:
+            if self.fail_after is not None and len(self.batches) >= self.fail_after:
+                raise RuntimeError("worker died")
+            self.batches.append(list(texts))
+        time.sleep(self.delay_s)
+        return [{'text': t, 'scores': {}, 'compound': len(t) / 100, 'label': 'Positive'} for t in texts]
+
+    def analyze_conversation(self, statements):
+        return {'compound': 0.5, 'label': 'Positive', 'trend': 'Stable'}
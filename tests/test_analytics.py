@@ -0,0 +1,137 @@
+import random
+import unittest
+from src.analytics import ConversationAggregator, EwmaTrend, SlopeTrend, WindowTrend
+from src.sentiment import SentimentEngine
+
+
+class TestConversationAggregator(unittest.TestCase):
+    def test_matches_analyze_conversation(self):
+        engine = SentimentEngine()
+        rng = random.Random(7)
+        aggregator = ConversationAggregator()
+        statements = []
+        self.assertEqual(aggregator.summary(), engine.analyze_conversation(statements))
+
+        for _ in range(50):
+            compound = rng.uniform(-1, 1)
+            statements.append({'compound': compound})
+            aggregator.add(compound)
+
+            expected = engine.analyze_conversation(statements)
+            actual = aggregator.summary()
+            self.assertAlmostEqual(actual['compound'], expected['compound'])
+            self.assertEqual(actual['label'], expected['label'])
+            self.assertEqual(actual['trend'], expected['trend'])
+
+    def test_state_round_trip(self):
+        aggregator = ConversationAggregator()
+        for compound in (0.9, 0.8, -0.5, -0.7, -0.9):
+            aggregator.add(compound)
+
+        restored = ConversationAggregator.from_state(aggregator.to_state())
+        self.assertEqual(restored.summary(), aggregator.summary())
+        self.assertEqual(restored.summary()['trend'], 'Declining')
+
+    def test_estimator_state_round_trip(self):
+        aggregator = ConversationAggregator(ewma_alpha=0.5, window=4)
+        for compound in (0.1, 0.4, -0.2, 0.6, 0.9, -0.3):
+            aggregator.add(compound)
+
+        restored = ConversationAggregator.from_state(aggregator.to_state(), ewma_alpha=0.5, window=4)
+        self.assertEqual(restored.trends(), aggregator.trends())
+
+    def test_legacy_state_replays_estimators(self):
+        aggregator = ConversationAggregator()
+        for compound in (0.2, 0.5, 0.9):
+            aggregator.add(compound)
+        state = aggregator.to_state()
+        legacy = {key: state[key] for key in ('scores', 'total', 'first_half_total')}
+
+        restored = ConversationAggregator.from_state(legacy)
+        self.assertEqual(restored.count, 3)
+        self.assertEqual(restored.trends(), aggregator.trends())
+
+    def test_max_scores_bounds_memory(self):
+        engine = SentimentEngine()
+        aggregator = ConversationAggregator(window=10, max_scores=20)
+        statements = []
+        for i in range(200):
+            compound = 0.9 if i < 100 else -0.9
+            statements.append({'compound': compound})
+            aggregator.add(compound)
+            self.assertLessEqual(len(aggregator.scores), 20)
+            if i < 30:
+                # The exact half-split trend survives until its split score is trimmed
+                self.assertEqual(aggregator.summary()['trend'], engine.analyze_conversation(statements)['trend'])
+
+        self.assertFalse(aggregator.exact_trend)
+        summary = aggregator.summary()
+        self.assertEqual(aggregator.count, 200)
+        self.assertAlmostEqual(summary['compound'], 0.0)
+        # The last 10 scores are all -0.9: no change within the window
+        self.assertEqual(summary['trend'], 'Stable')
+        self.assertEqual(list(aggregator.scores), [-0.9] * 20)
+
+
+class TestTrendEstimators(unittest.TestCase):
+    def test_ewma_follows_recent_scores(self):
+        ewma = EwmaTrend(alpha=0.5)
+        self.assertEqual(ewma.summary(0.0)['trend'], 'No data')
+        for compound in (1.0, 0.0, 0.0):
+            ewma.add(compound)
+        self.assertAlmostEqual(ewma.value, 0.25)
+        self.assertEqual(ewma.summary(1 / 3)['trend'], 'Stable')
+
+        for compound in [-0.8] * 5:
+            ewma.add(compound)
+        self.assertEqual(ewma.summary(-0.3)['trend'], 'Declining')
+
+    def test_ewma_rejects_bad_alpha(self):
+        with self.assertRaises(ValueError):
+            EwmaTrend(alpha=0)
+
+    def test_window_keeps_last_scores(self):
+        window = WindowTrend(size=4)
+        for compound in (0.9, 0.9, 0.9, 0.9, -0.5, -0.5, 0.5, 0.5):
+            window.add(compound)
+        summary = window.summary()
+        self.assertEqual(summary['count'], 4)
+        self.assertAlmostEqual(summary['mean'], 0.0)
+        self.assertEqual(summary['trend'], 'Improving')
+
+    def test_slope_matches_weighted_least_squares(self):
+        rng = random.Random(3)
+        ys = [0.02 * x + rng.uniform(-0.1, 0.1) for x in range(40)]
+        slope = SlopeTrend(horizon=20)
+        for y in ys:
+            slope.add(y)
+
+        n = len(ys)
+        weights = [slope.decay ** (n - 1 - x) for x in range(n)]
+        total = sum(weights)
+        mean_x = sum(w * x for x, w in enumerate(weights)) / total
+        mean_y = sum(w * y for w, y in zip(weights, ys)) / total
+        expected = (sum(w * (x - mean_x) * (y - mean_y) for x, (w, y) in enumerate(zip(weights, ys)))
+                    / sum(w * (x - mean_x) ** 2 for x, w in enumerate(weights)))
+        self.assertAlmostEqual(slope.slope, expected)
+        # About 0.4 over a 20-message horizon
+        self.assertEqual(slope.summary()['trend'], 'Improving')
+
+    def test_estimators_respond_late_in_long_conversation(self):
+        aggregator = ConversationAggregator(window=10)
+        for _ in range(500):
+            aggregator.add(0.6)
+        for _ in range(10):
+            aggregator.add(-0.6)
+
+        # The half-split means barely move; the windowed estimators see the drop
+        self.assertEqual(aggregator.summary()['trend'], 'Stable')
+        trends = aggregator.trends()
+        self.assertEqual(trends['ewma']['trend'], 'Declining')
+        self.assertEqual(trends['slope']['trend'], 'Declining')
+        self.assertLess(trends['slope']['per_message'], -0.02)
+        self.assertAlmostEqual(trends['window']['mean'], -0.6)
+
+
+if __name__ == '__main__':
+    unittest.main()
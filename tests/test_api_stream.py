@@ -0,0 +1,213 @@
+import os
+import threading
+import time
+import unittest
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+import main_api
+from src.executor import ExecutorSaturated
+from src.ratelimit import RateLimiter
+from src.registry import clear_engines, register_engine
+from src.sentiment import SentimentEngine
+
+
+class TestChatStream(unittest.TestCase):
+    # The app's shutdown hook stops its executor for good, so it starts once
+    @classmethod
+    def setUpClass(cls):
+        engine = SentimentEngine()
+        engine.use_vader = True
+        register_engine(engine)
+        with mock.patch.dict(os.environ, {"MODEL_PRELOAD": "off"}):
+            cls.app_client = TestClient(main_api.app)
+            cls.app_client.__enter__()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.app_client.__exit__(None, None, None)
+        clear_engines()
+
+    def setUp(self):
+        self.client = self.app_client
+        self.client.cookies.set('user_id', 'stream-user')
+        # Tests send bursts of messages; the rate limit has tests of its own
+        patcher = mock.patch.object(main_api, 'rate_limiter', RateLimiter(session_rate=0))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.client.post("/reset")
+
+    def test_pushes_sentiment_reply_and_analysis(self):
+        with self.client.websocket_connect("/ws") as ws:
+            session = ws.receive_json()
+            self.assertEqual(session['type'], 'session')
+            self.assertEqual(session['user_id'], 'stream-user')
+            self.assertEqual(session['analysis']['history_scores'], [])
+
+            ws.send_json({'message': 'I love this'})
+            sentiment = ws.receive_json()
+            reply = ws.receive_json()
+            analysis = ws.receive_json()
+
+        self.assertEqual((sentiment['type'], sentiment['seq']), ('sentiment', 0))
+        self.assertEqual(sentiment['sentiment']['label'], 'Positive')
+        self.assertEqual((reply['type'], reply['seq']), ('reply', 1))
+        self.assertEqual(analysis['type'], 'analysis')
+        self.assertEqual(analysis['cursor'], 2)
+        self.assertEqual(analysis['score'], sentiment['sentiment']['compound'])
+
+        # The turn was persisted like a /chat turn
+        polled = self.client.get("/analysis").json()
+        self.assertEqual(polled['history_scores'], [analysis['score']])
+        self.assertEqual(polled['label'], analysis['label'])
+        self.assertEqual(polled['trends'], analysis['trends'])
+        self.assertAlmostEqual(polled['trends']['ewma']['value'], analysis['score'])
+
+    def test_analysis_without_session_has_empty_trends(self):
+        self.client.cookies.clear()
+        polled = self.client.get("/analysis").json()
+        self.assertEqual(polled['trend'], 'No data')
+        self.assertEqual(polled['trends']['window']['trend'], 'No data')
+        self.assertIsNone(polled['trends']['slope']['per_message'])
+
+    def test_session_event_carries_existing_scores(self):
+        self.client.post("/chat", json={'message': 'I hate this'})
+        with self.client.websocket_connect("/ws") as ws:
+            session = ws.receive_json()
+        self.assertEqual(session['cursor'], 2)
+        self.assertEqual(len(session['analysis']['history_scores']), 1)
+
+    def test_rejects_malformed_messages(self):
+        with self.client.websocket_connect("/ws") as ws:
+            ws.receive_json()
+            ws.send_json({'text': 'wrong field'})
+            error = ws.receive_json()
+        self.assertEqual((error['type'], error['status']), ('error', 422))
+
+    def test_bad_frame_keeps_the_connection(self):
+        with self.client.websocket_connect("/ws") as ws:
+            ws.receive_json()
+            ws.send_text("not json")
+            error = ws.receive_json()
+            ws.send_json({'message': 'I love this'})
+            sentiment = ws.receive_json()
+        self.assertEqual((error['type'], error['status']), ('error', 422))
+        self.assertEqual(sentiment['type'], 'sentiment')
+
+    def test_failed_turn_reports_500_and_keeps_the_connection(self):
+        with self.client.websocket_connect("/ws") as ws:
+            ws.receive_json()
+            with mock.patch.object(main_api, 'run_turn', side_effect=RuntimeError("boom")):
+                ws.send_json({'message': 'I love this'})
+                error = ws.receive_json()
+            ws.send_json({'message': 'I love this'})
+            sentiment = ws.receive_json()
+        self.assertEqual((error['type'], error['status']), ('error', 500))
+        self.assertEqual(sentiment['type'], 'sentiment')
+
+    def test_rate_limited_session_gets_429(self):
+        strict = RateLimiter(session_rate=0.01, session_burst=1)
+        with mock.patch.object(main_api, 'rate_limiter', strict):
+            self.assertEqual(self.client.post("/chat", json={'message': 'hi'}).status_code, 200)
+            response = self.client.post("/chat", json={'message': 'hi again'})
+            self.assertEqual(response.status_code, 429)
+            self.assertGreaterEqual(int(response.headers['Retry-After']), 1)
+
+            with self.client.websocket_connect("/ws") as ws:
+                ws.receive_json()
+                ws.send_json({'message': 'still here'})
+                error = ws.receive_json()
+        self.assertEqual((error['type'], error['status']), ('error', 429))
+
+    def test_session_reads_do_not_use_the_inference_pool(self):
+        self.client.post("/chat", json={'message': 'I love this'})
+        with mock.patch.object(main_api.inference_executor, 'run', side_effect=ExecutorSaturated(1)):
+            self.assertEqual(self.client.post("/chat", json={'message': 'hi'}).status_code, 503)
+            self.assertEqual(len(self.client.get("/analysis").json()['history_scores']), 1)
+            self.assertEqual(self.client.get("/history").json()['cursor'], 2)
+            self.assertEqual(self.client.post("/reset").status_code, 200)
+        self.assertEqual(self.client.get("/history").json()['cursor'], 0)
+
+    def test_timed_out_turn_is_not_stored(self):
+        engine = main_api.global_sentiment_engine
+        analyze = engine.analyze_statement
+
+        def slow_analyze(text):
+            time.sleep(0.3)
+            return analyze(text)
+
+        with mock.patch.object(engine, 'analyze_statement', side_effect=slow_analyze), \
+                mock.patch.object(main_api.inference_executor, 'timeout', 0.05):
+            response = self.client.post("/chat", json={'message': 'I love this'})
+        self.assertEqual(response.status_code, 504)
+        time.sleep(0.4)
+
+        # A retry records the turn once
+        retry = self.client.post("/chat", json={'message': 'I love this'})
+        self.assertEqual(retry.json()['cursor'], 2)
+        self.assertEqual(len(self.client.get("/analysis").json()['history_scores']), 1)
+
+    def test_reset_during_chat_is_kept(self):
+        self.client.post("/chat", json={'message': 'before the reset'})
+        engine = main_api.global_sentiment_engine
+        analyze = engine.analyze_statement
+
+        def slow_analyze(text):
+            time.sleep(0.3)
+            return analyze(text)
+
+        with mock.patch.object(engine, 'analyze_statement', side_effect=slow_analyze):
+            in_flight = threading.Thread(target=self.client.post, args=("/chat",), kwargs={'json': {'message': 'after'}})
+            in_flight.start()
+            time.sleep(0.1)
+            self.client.post("/reset")
+            in_flight.join()
+
+        # The in-flight turn lands on the fresh session instead of restoring the old one
+        turns = self.client.get("/history").json()['turns']
+        self.assertEqual([turn['content'] for turn in turns if turn['role'] == 'user'], ['after'])
+
+    def test_chat_returns_turns_since_cursor(self):
+        first = self.client.post("/chat", json={'message': 'I love this', 'since': 0}).json()
+        self.assertEqual([turn['role'] for turn in first['history']], ['user', 'bot'])
+        self.assertEqual(first['cursor'], 2)
+
+        second = self.client.post("/chat", json={'message': 'I hate this', 'since': first['cursor']}).json()
+        self.assertEqual([turn['content'] for turn in second['history']][0], 'I hate this')
+        self.assertEqual(len(second['history']), 2)
+        self.assertEqual(second['cursor'], 4)
+
+        # Without since, every retained turn comes back
+        full = self.client.post("/chat", json={'message': 'ok'}).json()
+        self.assertEqual(len(full['history']), 6)
+
+    def test_history_pages_through_turns(self):
+        for i in range(3):
+            self.client.post("/chat", json={'message': f'message {i}'})
+
+        page = self.client.get("/history", params={'offset': 0, 'limit': 4}).json()
+        self.assertEqual((len(page['turns']), page['offset'], page['next'], page['cursor']), (4, 0, 4, 6))
+        page = self.client.get("/history", params={'offset': page['next'], 'limit': 4}).json()
+        self.assertEqual((len(page['turns']), page['offset'], page['next']), (2, 4, None))
+        self.assertEqual(page['turns'][0]['content'], 'message 2')
+
+    def test_history_starts_at_oldest_retained_turn(self):
+        with mock.patch.dict(os.environ, {"SESSION_MAX_HISTORY": "4"}):
+            self.client.post("/reset")
+            for i in range(3):
+                self.client.post("/chat", json={'message': f'message {i}'})
+
+        page = self.client.get("/history", params={'offset': 0}).json()
+        self.assertEqual((page['offset'], page['cursor'], page['next']), (2, 6, None))
+        self.assertEqual(page['turns'][0]['content'], 'message 1')
+
+    def test_history_without_session(self):
+        self.client.cookies.clear()
+        self.assertEqual(self.client.get("/history").json(), {'turns': [], 'offset': 0, 'next': None, 'cursor': 0})
+
+
+if __name__ == '__main__':
+    unittest.main()
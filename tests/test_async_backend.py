@@ -0,0 +1,105 @@
+import asyncio
+import time
+import unittest
+
+from src.backends import AsyncRemoteBackend, RemoteBackendError
+from src.sentiment import SentimentEngine
+from src.testing import StubInferenceServer
+
+LABELS = {'love': 'Very Positive', 'like': 'Positive', 'meh': 'Neutral', 'dislike': 'Negative', 'hate': 'Very Negative'}
+
+
+def first_word_label(text):
+    return LABELS[text.split()[0]]
+
+
+class TestAsyncRemoteBackend(unittest.TestCase):
+    def setUp(self):
+        self.stub = StubInferenceServer(latency_ms=0, label_for=first_word_label).__enter__()
+        self.backends = []
+
+    def tearDown(self):
+        for backend in self.backends:
+            backend.close()
+        self.stub.__exit__(None, None, None)
+
+    def backend(self, **kwargs):
+        kwargs.setdefault('backoff_s', 0.01)
+        backend = AsyncRemoteBackend(self.stub.url, timeout=5.0, **kwargs)
+        self.backends.append(backend)
+        return backend
+
+    def test_one_request_per_text_over_pooled_connections(self):
+        backend = self.backend()
+        self.assertEqual(backend.classify(["love it", "hate it", "meh"]),
+                         [('Very Positive', 0.9), ('Very Negative', 0.9), ('Neutral', 0.9)])
+        for _ in range(5):
+            backend.classify(["like it"])
+        self.assertEqual(len(self.stub.payloads), 8)
+        # Sequential calls reuse one kept-alive connection
+        self.assertLessEqual(len(self.stub.connections), 3)
+
+    def test_batched_inputs(self):
+        backend = self.backend(batch_inputs=True, max_batch_size=2)
+        texts = ["love it", "hate it", "meh", "like it", "dislike it"]
+        labels = [label for label, _ in backend.classify(texts)]
+        self.assertEqual(labels, [first_word_label(text) for text in texts])
+        # Batches are sent concurrently, so they may arrive in any order
+        self.assertCountEqual([p['inputs'] for p in self.stub.payloads],
+                              [["love it", "hate it"], ["meh", "like it"], ["dislike it"]])
+
+    def test_concurrency_is_bounded(self):
+        self.stub.latency_ms = 50
+        backend = self.backend(max_concurrency=2)
+        backend.classify(["like it"] * 6)
+        self.assertEqual(self.stub.peak_in_flight, 2)
+
+    def test_retries_server_errors(self):
+        self.stub.failures = [(503, {}), (502, {})]
+        backend = self.backend()
+        self.assertEqual(backend.classify(["love it"]), [('Very Positive', 0.9)])
+        self.assertEqual(backend.requests, 3)
+
+    def test_rate_limit_honors_retry_after(self):
+        self.stub.failures = [(429, {'Retry-After': '0.3'})]
+        backend = self.backend()
+        start = time.perf_counter()
+        backend.classify(["love it"])
+        self.assertGreaterEqual(time.perf_counter() - start, 0.3)
+        self.assertEqual(backend.requests, 2)
+
+    def test_client_errors_are_not_retried(self):
+        self.stub.failures = [(400, {})]
+        backend = self.backend()
+        with self.assertRaises(RemoteBackendError) as raised:
+            backend.classify(["love it"])
+        self.assertEqual(raised.exception.status, 400)
+        self.assertEqual(backend.requests, 1)
+
+    def test_gives_up_after_max_retries(self):
+        self.stub.failures = [(500, {})] * 3
+        backend = self.backend(max_retries=2)
+        with self.assertRaises(RemoteBackendError):
+            backend.classify(["love it"])
+        self.assertEqual(backend.requests, 3)
+
+    def test_awaitable_from_another_loop(self):
+        backend = self.backend()
+
+        async def main():
+            return await asyncio.gather(backend.classify_async(["love it"]), backend.classify_async(["hate it"]))
+
+        self.assertEqual(asyncio.run(main()), [[('Very Positive', 0.9)], [('Very Negative', 0.9)]])
+
+    def test_engine_falls_back_when_the_endpoint_fails(self):
+        self.stub.failures = [(500, {})] * 2
+        engine = SentimentEngine(multilingual_backend=self.backend(max_retries=1))
+        engine.has_hinglish_model = False
+        result = engine.analyze_statement("I love it")
+        self.assertEqual(result['label'], 'Positive') # VADER's label set
+        self.assertEqual(engine.breaker.failure_rate, 1.0)
+        self.assertEqual(engine.analyze_statement("love it")['label'], 'Very Positive')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import threading
+import unittest
+from types import SimpleNamespace
+from src import metrics
+from src.backends import LocalPipelineBackend, RemoteMultilingualBackend
+from src.sentiment import SentimentEngine
+
+LABELS = {'love': 'Very Positive', 'like': 'Positive', 'meh': 'Neutral', 'dislike': 'Negative', 'hate': 'Very Negative'}
+
+
+class FakePipeline:
+    """
+    Stands in for a transformers text-classification pipeline: labels each
+    text by its first word and records every batch it receives.
+    """
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, texts, **kwargs):
+        self.batches.append(list(texts))
+        return [{'label': LABELS[text.split()[0]], 'score': 0.8} for text in texts]
+
+
+class FakeClient:
+    def __init__(self):
+        self.threads = set()
+
+    def text_classification(self, text, model=None):
+        self.threads.add(threading.current_thread().name)
+        return [SimpleNamespace(label=LABELS[text.split()[0]], score=0.8)]
+
+
+class TestMultilingualBackends(unittest.TestCase):
+    def setUp(self):
+        self.pipe = FakePipeline()
+        local = LocalPipelineBackend("local-model", pipeline_factory=lambda: self.pipe)
+        self.local_engine = SentimentEngine(multilingual_backend=local)
+        self.local_engine.has_hinglish_model = False
+
+        remote = RemoteMultilingualBackend("local-model")
+        remote.client = FakeClient()
+        self.remote_engine = SentimentEngine(multilingual_backend=remote)
+        self.remote_engine.has_hinglish_model = False
+
+    def test_local_backend_runs_one_batch_offline(self):
+        texts = [f"{word} it" for word in LABELS]
+        results = self.local_engine.analyze_many(texts)
+
+        self.assertEqual(self.pipe.batches, [texts])
+        self.assertEqual([r['label'] for r in results], list(LABELS.values()))
+
+    def test_local_and_remote_share_the_mapping(self):
+        texts = [f"{word} it" for word in LABELS]
+        local = self.local_engine.analyze_many(texts)
+        remote = self.remote_engine.analyze_many(texts)
+        self.assertEqual(local, remote)
+        self.assertEqual([r['compound'] for r in local], [0.8, 0.4, 0, -0.4, -0.8])
+
+    def test_unavailable_local_model_falls_back(self):
+        def broken():
+            raise OSError("no weights on disk")
+
+        loads = []
+        backend = LocalPipelineBackend("missing", pipeline_factory=lambda: loads.append(1) or broken())
+        engine = SentimentEngine(multilingual_backend=backend)
+        engine.has_hinglish_model = False
+        engine.vader = SimpleNamespace(polarity_scores=lambda text: {'neg': 0, 'neu': 1, 'pos': 0, 'compound': 0.0})
+        self.assertEqual(engine.analyze_statement("love it")['label'], 'Neutral')
+
+        # Later statements go straight to the fallback: no retry, no error per message
+        unavailable = metrics.FALLBACKS.value(reason='model_unavailable')
+        with self.assertNoLogs('src.sentiment', level='ERROR'):
+            for _ in range(3):
+                engine.analyze_statement("love it again")
+        self.assertEqual(loads, [1])
+        self.assertEqual(metrics.FALLBACKS.value(reason='model_unavailable'), unavailable + 3)
+
+    def test_remote_batches_share_one_pool(self):
+        backend = self.remote_engine.multilingual_backend
+        texts = [f"{word} it" for word in LABELS]
+        backend.classify(texts)
+        pool = backend._pool
+        backend.classify(texts)
+        self.assertIs(backend._pool, pool)
+        self.assertTrue(all(name.startswith("remote-backend") for name in backend.client.threads))
+        self.assertLessEqual(len(backend.client.threads), backend.max_concurrency)
+        backend.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import threading
+import time
+import unittest
+from src.batching import MicroBatcher
+from tests.helpers import FakeEngine
+
+
+class TestMicroBatcher(unittest.TestCase):
+    def setUp(self):
+        self.engine = FakeEngine(delay_s=0.01)
+        self.batcher = MicroBatcher(self.engine, max_batch_size=8, max_wait_ms=50)
+
+    def tearDown(self):
+        self.batcher.close()
+
+    def test_concurrent_calls_are_coalesced(self):
+        results = {}
+
+        def worker(i):
+            results[i] = self.batcher.analyze_statement(f"message {i}")
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        # Every caller gets its own result back
+        for i in range(8):
+            self.assertEqual(results[i]['text'], f"message {i}")
+        self.assertLess(len(self.engine.batches), 8)
+
+    def test_batch_size_limit(self):
+        results = self.batcher.analyze_many([f"m{i}" for i in range(20)])
+        self.assertEqual([r['text'] for r in results], [f"m{i}" for i in range(20)])
+        self.assertTrue(all(len(b) <= 8 for b in self.engine.batches))
+
+    def test_slow_batch_does_not_hold_up_the_next(self):
+        release = threading.Event()
+        analyze = self.engine.analyze_many
+
+        def analyze_many(texts):
+            if "slow" in texts:
+                release.wait(5)
+            return analyze(texts)
+
+        self.engine.analyze_many = analyze_many
+        slow = threading.Thread(target=self.batcher.analyze_statement, args=("slow",))
+        slow.start()
+        time.sleep(0.1)
+        try:
+            start = time.monotonic()
+            self.assertEqual(self.batcher.analyze_statement("fast")['text'], "fast")
+            self.assertLess(time.monotonic() - start, 1)
+        finally:
+            release.set()
+            slow.join()
+
+    def test_forwards_engine_attributes(self):
+        self.assertEqual(self.batcher.analyze_conversation([])['trend'], 'Stable')
+
+
+if __name__ == '__main__':
+    unittest.main()
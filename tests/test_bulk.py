@@ -0,0 +1,81 @@
+import csv
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.bulk import load_checkpoint, score_file
+from tests.helpers import FakeEngine
+
+
+def fake_engine():
+    return FakeEngine()
+
+
+class TestBulkScoring(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.input = os.path.join(self.dir, "in.jsonl")
+        self.output = os.path.join(self.dir, "out.jsonl")
+        with open(self.input, "w") as f:
+            for i in range(10):
+                f.write(json.dumps({'request_id': f"r{i}", 'body': "x" * i}) + "\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def read_output(self):
+        with open(self.output) as f:
+            return [json.loads(line) for line in f]
+
+    def test_scores_in_batches_and_order(self):
+        engine = FakeEngine()
+        stats = score_file(self.input, self.output, text_field='body', batch_size=4, engine=engine)
+
+        self.assertEqual([len(b) for b in engine.batches], [4, 4, 2])
+        self.assertEqual(stats['records'], 10)
+        rows = self.read_output()
+        self.assertEqual([r['request_id'] for r in rows], [f"r{i}" for i in range(10)])
+        self.assertAlmostEqual(rows[3]['sentiment']['compound'], 0.03)
+        self.assertEqual(load_checkpoint(self.output)['records'], 10)
+
+    def test_resume_after_failure(self):
+        with self.assertRaises(RuntimeError):
+            score_file(self.input, self.output, text_field='body', batch_size=4, engine=FakeEngine(fail_after=2))
+        self.assertEqual(load_checkpoint(self.output)['records'], 8)
+
+        engine = FakeEngine()
+        stats = score_file(self.input, self.output, text_field='body', batch_size=4, engine=engine, resume=True)
+        self.assertEqual([len(b) for b in engine.batches], [2])
+        self.assertEqual(stats['skipped'], 8)
+        self.assertEqual([r['request_id'] for r in self.read_output()], [f"r{i}" for i in range(10)])
+
+    def test_resume_drops_uncheckpointed_output(self):
+        with self.assertRaises(RuntimeError):
+            score_file(self.input, self.output, text_field='body', batch_size=4, engine=FakeEngine(fail_after=1))
+        with open(self.output, "a") as f:
+            f.write('{"partial": ')
+
+        score_file(self.input, self.output, text_field='body', batch_size=4, engine=FakeEngine(), resume=True)
+        self.assertEqual(len(self.read_output()), 10)
+
+    def test_csv_input(self):
+        path = os.path.join(self.dir, "in.csv")
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=['id', 'text'])
+            writer.writeheader()
+            writer.writerows([{'id': 1, 'text': "good"}, {'id': 2, 'text': "bad"}])
+
+        score_file(path, self.output, engine=FakeEngine())
+        self.assertEqual([r['id'] for r in self.read_output()], ["1", "2"])
+
+    def test_process_pool(self):
+        stats = score_file(self.input, self.output, text_field='body', batch_size=3, workers=2,
+                           engine_factory=fake_engine)
+        self.assertEqual(stats['records'], 10)
+        self.assertEqual([r['request_id'] for r in self.read_output()], [f"r{i}" for i in range(10)])
+
+
+if __name__ == '__main__':
+    unittest.main()
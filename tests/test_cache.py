@@ -0,0 +1,110 @@
+import os
+import tempfile
+import time
+import unittest
+from src.cache import SentimentCache
+from src.sentiment import SentimentEngine
+
+
+def make_result(compound):
+    return {'text': 'x', 'scores': {'pos': 0, 'neg': 0}, 'compound': compound, 'label': 'Neutral'}
+
+
+class CountingVader:
+    """
+    Stands in for SentimentIntensityAnalyzer and counts how often it is called.
+    """
+    def __init__(self):
+        self.calls = 0
+
+    def polarity_scores(self, text):
+        self.calls += 1
+        return {'neg': 0.0, 'neu': 0.3, 'pos': 0.7, 'compound': 0.6}
+
+
+class TestSentimentCache(unittest.TestCase):
+    def test_key_normalizes_whitespace_and_separates_backends(self):
+        key = SentimentCache.make_key("  bhai   sahi hai ", 'hinglish', 'm1')
+        self.assertEqual(key, SentimentCache.make_key("bhai sahi hai", 'hinglish', 'm1'))
+        self.assertNotEqual(key, SentimentCache.make_key("bhai sahi hai", 'hinglish', 'm2'))
+        self.assertNotEqual(key, SentimentCache.make_key("bhai sahi hai", 'vader', 'm1'))
+
+    def test_hit_returns_callers_text(self):
+        cache = SentimentCache()
+        cache.put('k', make_result(0.5))
+        result = cache.get('k', 'ok ')
+        self.assertEqual(result['text'], 'ok ')
+        self.assertEqual(result['compound'], 0.5)
+        self.assertIsNone(cache.get('other', 'ok'))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_lru_eviction(self):
+        cache = SentimentCache(max_entries=2)
+        cache.put('a', make_result(1))
+        cache.put('b', make_result(2))
+        cache.get('a', 'a') # 'b' is now least recently used
+        cache.put('c', make_result(3))
+        self.assertIsNone(cache.get('b', 'b'))
+        self.assertIsNotNone(cache.get('a', 'a'))
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_byte_bound(self):
+        cache = SentimentCache(max_bytes=200)
+        for i in range(10):
+            cache.put(str(i), make_result(i))
+        self.assertLessEqual(cache.stats()['bytes'], 200)
+        self.assertLess(len(cache), 10)
+
+    def test_ttl_expiry(self):
+        cache = SentimentCache(ttl=0.01)
+        cache.put('k', make_result(1))
+        time.sleep(0.02)
+        self.assertIsNone(cache.get('k', 'k'))
+        self.assertEqual(cache.stats()['expirations'], 1)
+
+    def test_sqlite_tier_survives_restart(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'cache.db')
+            first = SentimentCache(persist_path=path)
+            first.put('k', make_result(0.25))
+            first.close()
+
+            cache = SentimentCache(persist_path=path)
+            self.assertEqual(cache.get('k', 'k')['compound'], 0.25)
+            self.assertEqual(cache.stats()['disk_hits'], 1)
+            cache.close()
+
+    def test_sqlite_writes_are_batched_off_the_caller(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'cache.db')
+            cache = SentimentCache(persist_path=path)
+            for i in range(200):
+                cache.put(f'k{i}', make_result(i / 200))
+            cache.flush()
+
+            reader = SentimentCache(persist_path=path)
+            self.assertEqual(reader.get('k199', 'k199')['compound'], 0.995)
+            self.assertEqual(reader._db.execute("PRAGMA journal_mode").fetchone()[0], 'wal')
+
+            cache.clear()
+            cache.flush()
+            self.assertIsNone(reader.get('k0', 'k0'))
+            reader.close()
+            cache.close()
+
+
+class TestEngineCache(unittest.TestCase):
+    def test_repeated_messages_skip_the_backend(self):
+        engine = SentimentEngine(cache=SentimentCache())
+        engine.use_vader = True
+        engine.vader = CountingVader()
+
+        first = engine.analyze_statement("thanks")
+        second = engine.analyze_statement("thanks ")
+        self.assertEqual(engine.vader.calls, 1)
+        self.assertEqual(first['compound'], second['compound'])
+        self.assertEqual(second['text'], "thanks ")
+
+
+if __name__ == '__main__':
+    unittest.main()
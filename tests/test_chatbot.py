@@ -34,6 +34,13 @@ class TestChatbot(unittest.TestCase):
     def setUp(self):
         self.bot = Chatbot()
 
+    def test_sessions_share_engine(self):
+        # New sessions (and resets) reuse the process-wide engine
+        self.assertIs(Chatbot().sentiment_engine, self.bot.sentiment_engine)
+
+        engine = SentimentEngine()
+        self.assertIs(Chatbot(sentiment_engine=engine).sentiment_engine, engine)
+
     def test_interaction_flow(self):
         # User sends a message
         response = self.bot.process_user_input("Hello, I am happy.")
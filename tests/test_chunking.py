@@ -0,0 +1,122 @@
+import os
+import shutil
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+from transformers import BertTokenizer
+
+from src.backends import LocalPipelineBackend, RemoteMultilingualBackend
+from src.chunking import ChunkPlan, TextChunker, split_sentences
+from src.sentiment import SentimentEngine
+
+LABELS = {'love': 'Very Positive', 'like': 'Positive', 'hate': 'Very Negative'}
+
+
+def count_words(text):
+    return len(text.split())
+
+
+class WordTokenizer:
+    """
+    One token per word, with a 6 token model limit (4 after special tokens).
+    """
+    model_max_length = 6
+
+    def __call__(self, text, add_special_tokens=True):
+        return {'input_ids': text.split()}
+
+    def num_special_tokens_to_add(self):
+        return 2
+
+
+class FakePipeline:
+    """
+    Labels each text by its first word and records every batch it receives.
+    """
+    def __init__(self):
+        self.tokenizer = WordTokenizer()
+        self.batches = []
+
+    def __call__(self, texts, **kwargs):
+        self.batches.append(list(texts))
+        return [{'label': LABELS[text.split()[0]], 'score': 0.8} for text in texts]
+
+
+class TestTextChunker(unittest.TestCase):
+    def test_split_sentences(self):
+        self.assertEqual(split_sentences("Great start! Then it broke.\nAwful? yes"),
+                         ["Great start!", "Then it broke.", "Awful?", "yes"])
+        self.assertEqual(split_sentences("यह अच्छा है। वह बुरा है।"),
+                         ["यह अच्छा है।", "वह बुरा है।"])
+
+    def test_packs_whole_sentences_under_the_limit(self):
+        text = "one two three. four five. six seven eight nine. ten."
+        chunks = TextChunker(count_words, 5).split(text)
+        self.assertEqual([chunk for chunk, _ in chunks], ["one two three. four five.", "six seven eight nine. ten."])
+        self.assertEqual([tokens for _, tokens in chunks], [5, 5])
+
+    def test_splits_overlong_sentences_between_words(self):
+        text = " ".join(f"w{i}" for i in range(12))
+        chunks = TextChunker(count_words, 5).split(text)
+        self.assertTrue(all(tokens <= 5 for _, tokens in chunks))
+        self.assertEqual(" ".join(chunk for chunk, _ in chunks), text)
+
+    def test_short_texts_are_not_split(self):
+        plan = ChunkPlan(["a b", "c d e f g h i j k l m n o p"], TextChunker(count_words, 8))
+        groups = list(plan.regroup(range(len(plan.chunks))))
+        self.assertEqual(len(groups[0]), 1)
+        self.assertEqual(len(groups[1]), 2)
+        self.assertEqual(plan.chunks[0], "a b")
+
+
+class TestEngineChunking(unittest.TestCase):
+    def setUp(self):
+        self.pipe = FakePipeline()
+        backend = LocalPipelineBackend("local-model", pipeline_factory=lambda: self.pipe)
+        self.engine = SentimentEngine(multilingual_backend=backend)
+        self.engine.has_hinglish_model = False
+
+    def test_long_text_is_scored_by_chunk_and_weighted(self):
+        long_text = "love it a lot. hate it so much. hate this."
+        short, long = self.engine.analyze_many(["like it", long_text])
+
+        # Short text and chunks go through the model in one batch
+        self.assertEqual(self.pipe.batches, [["like it", "love it a lot.", "hate it so much.", "hate this."]])
+        self.assertNotIn('chunks', short)
+
+        self.assertEqual(long['text'], long_text)
+        self.assertEqual([chunk['tokens'] for chunk in long['chunks']], [4, 4, 2])
+        self.assertAlmostEqual(long['compound'], (0.8 * 4 - 0.8 * 4 - 0.8 * 2) / 10)
+        self.assertEqual(long['label'], 'Very Negative')
+
+    def test_max_chunk_tokens_overrides_the_model_limit(self):
+        self.engine.max_chunk_tokens = 8
+        result = self.engine.analyze_statement("love it a lot. hate it so much. hate this.")
+        self.assertEqual([chunk['text'] for chunk in result['chunks']], ["love it a lot. hate it so much.", "hate this."])
+
+
+class TestBackendTokenLimits(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        with open(os.path.join(self.dir, "vocab.txt"), "w") as f:
+            f.write("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", "yeh", "acha", "hai"]))
+        self.tokenizer = BertTokenizer(os.path.join(self.dir, "vocab.txt"))
+
+    def tearDown(self):
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_local_backend_counts_with_its_tokenizer(self):
+        backend = LocalPipelineBackend("tiny", pipeline_factory=lambda: SimpleNamespace(tokenizer=self.tokenizer))
+        self.assertEqual(backend.count_tokens("yeh acha hai"), 3)
+        # No model_max_length saved: capped at the 512 token model limit
+        self.assertEqual(backend.max_tokens, 510)
+
+    def test_remote_backend_estimates(self):
+        backend = RemoteMultilingualBackend("remote")
+        self.assertGreaterEqual(backend.count_tokens("I really liked it"), 4)
+        self.assertEqual(backend.max_tokens, 510)
+
+
+if __name__ == '__main__':
+    unittest.main()
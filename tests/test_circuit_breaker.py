@@ -0,0 +1,127 @@
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from src import metrics
+from src.circuit_breaker import CircuitBreaker, CircuitOpenError, CLOSED, OPEN, HALF_OPEN
+from src.sentiment import SentimentEngine
+
+
+class FakeClient:
+    """
+    Stands in for InferenceClient. Fails while `failing` is set and waits for
+    `release` before answering when `slow` is set.
+    """
+    def __init__(self):
+        self.calls = 0
+        self.failing = False
+        self.slow = False
+        self.release = threading.Event()
+
+    def text_classification(self, text, model=None):
+        self.calls += 1
+        if self.failing:
+            raise ConnectionError("API unavailable")
+        if self.slow:
+            self.release.wait(5)
+        return [SimpleNamespace(label='very positive', score=0.9)]
+
+
+class FakeVader:
+    def polarity_scores(self, text):
+        return {'neg': 0.0, 'neu': 1.0, 'pos': 0.0, 'compound': 0.0}
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_on_failure_rate_and_recovers_through_half_open(self):
+        changes = []
+        breaker = CircuitBreaker(failure_rate_threshold=0.5, window_size=4, min_calls=4,
+                                 open_timeout=0.05, on_state_change=lambda a, b: changes.append(b))
+        for failed in (False, True, False, True):
+            self.assertTrue(breaker.allow_request())
+            breaker.record_failure() if failed else breaker.record_success()
+        self.assertEqual(breaker.state, OPEN)
+        self.assertFalse(breaker.allow_request())
+
+        time.sleep(0.06)
+        self.assertEqual(breaker.state, HALF_OPEN)
+        self.assertTrue(breaker.allow_request()) # the probe
+        self.assertFalse(breaker.allow_request()) # only one probe at a time
+        breaker.record_success()
+        self.assertEqual(breaker.state, CLOSED)
+        self.assertEqual(changes, [OPEN, HALF_OPEN, CLOSED])
+
+    def test_failed_probe_reopens(self):
+        breaker = CircuitBreaker(window_size=2, min_calls=2, open_timeout=0.05)
+        breaker.record_failure()
+        breaker.record_failure()
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow_request())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, OPEN)
+
+
+class TestEngineFallback(unittest.TestCase):
+    def setUp(self):
+        self.engine = SentimentEngine(breaker=CircuitBreaker(window_size=2, min_calls=2, open_timeout=0.05))
+        self.engine.has_hinglish_model = False
+        self.engine.client = FakeClient()
+        self.engine.vader = FakeVader()
+
+    def test_outage_is_not_sticky(self):
+        self.engine.client.failing = True
+        for _ in range(3):
+            self.assertEqual(self.engine.analyze_statement("I love it")['label'], 'Neutral')
+        # The breaker opened after two failures, so the third call skipped the API
+        self.assertEqual(self.engine.client.calls, 2)
+
+        # Once the API is back, the next probe closes the breaker again
+        self.engine.client.failing = False
+        time.sleep(0.06)
+        self.assertEqual(self.engine.analyze_statement("I love it")['label'], 'Very Positive')
+        self.assertEqual(self.engine.breaker.state, CLOSED)
+
+    def test_hedged_fallback(self):
+        self.engine.hedge_after_ms = 20
+        self.engine.client.slow = True
+        start = time.monotonic()
+        result = self.engine.analyze_statement("I love it")
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(result['label'], 'Neutral')
+        self.engine.client.release.set()
+
+    def test_in_flight_calls_are_bounded(self):
+        self.engine.max_remote_concurrency = 2
+        self.engine.hedge_after_ms = 20
+        self.engine.client.slow = True
+        saturated = metrics.FALLBACKS.value(reason='remote_saturated')
+        try:
+            for text in ("one", "two", "three", "four"):
+                self.assertEqual(self.engine.analyze_statement(text)['label'], 'Neutral')
+            # Two calls hang on the API; the others fell back without queueing
+            self.assertEqual(self.engine.client.calls, 2)
+            self.assertEqual(metrics.FALLBACKS.value(reason='remote_saturated'), saturated + 2)
+        finally:
+            self.engine.client.release.set()
+
+    def test_failed_batch_counts_once_per_text(self):
+        engine = SentimentEngine(breaker=CircuitBreaker(window_size=20, min_calls=5))
+        engine.has_hinglish_model = False
+        engine.client = FakeClient()
+        engine.client.failing = True
+        engine.vader = FakeVader()
+        engine.analyze_many(["one", "two", "three", "four", "five"])
+        # One failed batch of five texts fills min_calls on its own
+        self.assertEqual(engine.breaker.state, OPEN)
+
+    def test_breaker_is_checked_when_the_call_starts(self):
+        # A call queued before the breaker opened must not go out afterwards
+        self.engine.breaker.record_failure()
+        self.engine.breaker.record_failure()
+        with self.assertRaises(CircuitOpenError):
+            self.engine._classify_remote_recorded(["I love it"])
+        self.assertEqual(self.engine.client.calls, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import json
+import unittest
+
+from src.chatbot import Chatbot
+from src.conversation import Label, Turn, decode_label, encode_label
+from tests.helpers import FakeEngine
+
+
+class TestTurn(unittest.TestCase):
+    def test_user_turn_round_trips_the_analysis(self):
+        analysis = {'text': "so good", 'scores': {'neg': 0.0, 'neu': 0.3, 'pos': 0.7, 'compound': 0.6},
+                    'compound': 0.6, 'label': 'Very Positive', 'chunks': [{'text': "so good", 'tokens': 2}]}
+        turn = Turn.user("so good", analysis)
+
+        self.assertEqual(turn.label, Label.VERY_POSITIVE)
+        self.assertEqual(turn.sentiment, analysis)
+        self.assertEqual(turn.to_dict(), {'role': 'user', 'content': "so good", 'sentiment': analysis})
+        self.assertEqual(Turn.from_dict(turn.to_dict()).to_dict(), turn.to_dict())
+
+    def test_bot_turn(self):
+        turn = Turn.bot("Interesting.")
+        self.assertEqual(turn['role'], 'bot')
+        self.assertIsNone(turn['sentiment'])
+        self.assertEqual(Turn.from_dict(turn.to_dict()).to_dict(), turn.to_dict())
+        with self.assertRaises(KeyError):
+            turn['missing']
+
+    def test_labels_outside_the_enum_get_their_own_code(self):
+        code = encode_label('Mixed')
+        self.assertGreater(code, max(Label))
+        self.assertEqual(encode_label('Mixed'), code)
+        self.assertEqual(decode_label(code), 'Mixed')
+        self.assertEqual(decode_label(encode_label('Neutral')), 'Neutral')
+
+    def test_turns_have_no_instance_dict(self):
+        self.assertFalse(hasattr(Turn.bot("hi"), '__dict__'))
+
+
+class TestChatbotState(unittest.TestCase):
+    def test_state_keeps_the_json_shape(self):
+        bot = Chatbot(sentiment_engine=FakeEngine())
+        bot.process_user_input("hello")
+        state = json.loads(json.dumps(bot.to_state()))
+
+        self.assertEqual(state['history'][0], {
+            'role': 'user', 'content': "hello",
+            'sentiment': {'text': "hello", 'scores': {}, 'compound': 0.05, 'label': 'Positive'}
+        })
+        self.assertEqual(state['analytics']['scores'], [0.05])
+
+        restored = Chatbot(sentiment_engine=FakeEngine())
+        restored.load_state(state)
+        self.assertEqual(restored.to_state(), bot.to_state())
+        self.assertEqual(restored.user_statements_analysis[0]['text'], "hello")
+
+    def test_loads_state_saved_without_aggregates(self):
+        legacy = {
+            'history': [{'role': 'user', 'content': "hi", 'sentiment': {'text': "hi", 'scores': {}, 'compound': -0.5, 'label': 'Negative'}},
+                        {'role': 'bot', 'content': "Tell me more.", 'sentiment': None}],
+            'user_statements_analysis': [{'text': "hi", 'scores': {}, 'compound': -0.5, 'label': 'Negative'}]
+        }
+        bot = Chatbot(sentiment_engine=FakeEngine())
+        bot.load_state(legacy)
+        self.assertEqual(bot.get_final_analysis()['label'], 'Negative')
+        self.assertEqual(bot.history[1]['content'], "Tell me more.")
+
+
+if __name__ == '__main__':
+    unittest.main()
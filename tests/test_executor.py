@@ -0,0 +1,197 @@
+import asyncio
+import threading
+import unittest
+from src.executor import CommitGuard, InferenceExecutor, ExecutorSaturated, InferenceTimeout
+
+
+class TestInferenceExecutor(unittest.TestCase):
+    def setUp(self):
+        self.executor = InferenceExecutor(max_workers=1, max_queue_depth=1, timeout=5)
+        self.release = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+        self.executor.shutdown(wait=True)
+
+    def test_runs_off_the_event_loop(self):
+        async def main():
+            return await self.executor.run(threading.current_thread)
+
+        worker = asyncio.run(main())
+        self.assertIsNot(worker, threading.current_thread())
+
+    def test_rejects_when_saturated(self):
+        async def main():
+            # One running job plus one queued job fill the executor
+            running = asyncio.ensure_future(self.executor.run(self.release.wait))
+            queued = asyncio.ensure_future(self.executor.run(self.release.wait))
+            await asyncio.sleep(0.05)
+            with self.assertRaises(ExecutorSaturated):
+                await self.executor.run(self.release.wait)
+            self.release.set()
+            await asyncio.gather(running, queued)
+            # Slots are freed once the jobs finish
+            self.assertEqual(self.executor.in_flight, 0)
+
+        asyncio.run(main())
+
+    def test_timeout(self):
+        async def main():
+            with self.assertRaises(InferenceTimeout):
+                await self.executor.run(self.release.wait, timeout=0.05)
+
+        asyncio.run(main())
+
+
+class TestFairQueueing(unittest.TestCase):
+    def setUp(self):
+        self.executor = InferenceExecutor(max_workers=1, max_queue_depth=16, timeout=5, max_queue_per_key=3)
+        self.release = threading.Event()
+        self.order = []
+
+    def tearDown(self):
+        self.release.set()
+        self.executor.shutdown(wait=True)
+
+    def job(self, name):
+        self.order.append(name)
+        return name
+
+    def test_waiting_jobs_are_served_round_robin_by_key(self):
+        async def main():
+            blocker = asyncio.ensure_future(self.executor.run(self.release.wait, key='blocker'))
+            await asyncio.sleep(0.05)
+            jobs = [asyncio.ensure_future(self.executor.run(self.job, name, key=key))
+                    for name, key in (('heavy-1', 'heavy'), ('heavy-2', 'heavy'), ('heavy-3', 'heavy'),
+                                      ('light-1', 'light'))]
+            await asyncio.sleep(0.05)
+            self.release.set()
+            await asyncio.gather(blocker, *jobs)
+
+        asyncio.run(main())
+        self.assertEqual(self.order, ['heavy-1', 'light-1', 'heavy-2', 'heavy-3'])
+
+    def test_queue_per_key_is_capped(self):
+        async def main():
+            blocker = asyncio.ensure_future(self.executor.run(self.release.wait, key='blocker'))
+            await asyncio.sleep(0.05)
+            queued = [asyncio.ensure_future(self.executor.run(self.job, i, key='heavy')) for i in range(3)]
+            await asyncio.sleep(0.05)
+            with self.assertRaises(ExecutorSaturated):
+                await self.executor.run(self.job, 3, key='heavy')
+            # Other sessions still get in
+            other = asyncio.ensure_future(self.executor.run(self.job, 'other', key='light'))
+            self.release.set()
+            await asyncio.gather(blocker, other, *queued)
+
+        asyncio.run(main())
+        self.assertEqual(sorted(map(str, self.order)), ['0', '1', '2', 'other'])
+
+    def test_jobs_timing_out_in_the_queue_are_dropped(self):
+        async def main():
+            blocker = asyncio.ensure_future(self.executor.run(self.release.wait, key='blocker'))
+            await asyncio.sleep(0.05)
+            with self.assertRaises(InferenceTimeout):
+                await self.executor.run(self.job, 'late', timeout=0.05, key='a')
+            self.release.set()
+            await blocker
+            await self.executor.run(self.job, 'next', key='a')
+
+        asyncio.run(main())
+        self.assertEqual(self.order, ['next'])
+        self.assertEqual(self.executor.in_flight, 0)
+
+    def test_queue_depth_counts_jobs_behind_a_busy_key(self):
+        async def main():
+            # A free worker, but 'a' already has a running job
+            executor = InferenceExecutor(max_workers=4, max_queue_depth=16, timeout=5, max_queue_per_key=2)
+            blocker = asyncio.ensure_future(executor.run(self.release.wait, key='a'))
+            await asyncio.sleep(0.05)
+            queued = [asyncio.ensure_future(executor.run(self.job, i, key='a')) for i in range(2)]
+            await asyncio.sleep(0.05)
+            self.assertEqual(executor.queue_depth, 2)
+            self.release.set()
+            await asyncio.gather(blocker, *queued)
+            self.assertEqual(executor.queue_depth, 0)
+            executor.shutdown(wait=True)
+
+        asyncio.run(main())
+
+    def test_timed_out_jobs_leave_the_queue(self):
+        async def main():
+            blocker = asyncio.ensure_future(self.executor.run(self.release.wait, key='blocker'))
+            await asyncio.sleep(0.05)
+            for i in range(3):
+                with self.assertRaises(InferenceTimeout):
+                    await self.executor.run(self.job, i, timeout=0.01, key='heavy')
+            self.assertEqual(self.executor.queue_depth, 0)
+            # The per-key cap is free again
+            queued = [asyncio.ensure_future(self.executor.run(self.job, i, key='heavy')) for i in range(3)]
+            await asyncio.sleep(0.05)
+            self.assertEqual(self.executor.queue_depth, 3)
+            self.release.set()
+            await asyncio.gather(blocker, *queued)
+
+        asyncio.run(main())
+        self.assertEqual(self.order, [0, 1, 2])
+
+
+class TestPerKeySerialization(unittest.TestCase):
+    def setUp(self):
+        self.executor = InferenceExecutor(max_workers=4, max_queue_depth=16, timeout=5)
+        self.lock = threading.Lock()
+        self.running = {}
+        self.overlaps = []
+
+    def tearDown(self):
+        self.executor.shutdown(wait=True)
+
+    def job(self, key):
+        with self.lock:
+            self.running[key] = self.running.get(key, 0) + 1
+            if self.running[key] > 1:
+                self.overlaps.append(key)
+        threading.Event().wait(0.02)
+        with self.lock:
+            self.running[key] -= 1
+        return threading.current_thread().name
+
+    def test_one_job_per_key_runs_at_a_time(self):
+        async def main():
+            jobs = [self.executor.run(self.job, key, key=key) for key in ('a', 'a', 'a', 'b', 'b')]
+            return await asyncio.gather(*jobs)
+
+        asyncio.run(main())
+        self.assertEqual(self.overlaps, [])
+        self.assertEqual(self.executor.in_flight, 0)
+
+    def test_other_keys_use_idle_workers(self):
+        release = threading.Event()
+
+        async def main():
+            blocked = asyncio.ensure_future(self.executor.run(release.wait, key='a'))
+            queued = asyncio.ensure_future(self.executor.run(self.job, 'a', key='a'))
+            await asyncio.sleep(0.05)
+            # 'b' does not wait behind 'a'
+            await asyncio.wait_for(self.executor.run(self.job, 'b', key='b'), 1)
+            self.assertFalse(queued.done())
+            release.set()
+            await asyncio.gather(blocked, queued)
+
+        asyncio.run(main())
+
+
+class TestCommitGuard(unittest.TestCase):
+    def test_first_decision_wins(self):
+        guard = CommitGuard()
+        self.assertTrue(guard.abandon())
+        self.assertFalse(guard.commit())
+
+        guard = CommitGuard()
+        self.assertTrue(guard.commit())
+        self.assertFalse(guard.abandon())
+        self.assertTrue(guard.commit())
+
+
+if __name__ == '__main__':
+    unittest.main()
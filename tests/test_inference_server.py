@@ -0,0 +1,127 @@
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from src import registry
+from src.inference_server import EngineClient, InferenceServer, recv_message, send_message
+from tests.helpers import FakeEngine
+
+
+class TestInferenceServer(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "inference.sock")
+        self.engine = FakeEngine()
+        self.server = InferenceServer(self.path, engine_factory=lambda: self.engine, max_wait_ms=20).start()
+        self.client = EngineClient(self.path, timeout=5, connect_timeout=5)
+
+    def tearDown(self):
+        self.client.close()
+        self.server.close()
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_round_trip(self):
+        self.client.preload()
+        results = self.client.analyze_many(["ab", "abcd"])
+        self.assertEqual([r['compound'] for r in results], [0.02, 0.04])
+        self.assertEqual(self.client.analyze_statement("héllo")['text'], "héllo")
+        self.assertTrue(self.client.has_hinglish_model)
+
+    def test_concurrent_clients_share_batches(self):
+        self.client.preload()
+        clients = [EngineClient(self.path, timeout=5) for _ in range(8)]
+        results = {}
+
+        def call(i):
+            results[i] = clients[i].analyze_statement("x" * i)
+
+        threads = [threading.Thread(target=call, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for client in clients:
+            client.close()
+
+        self.assertEqual({i: r['text'] for i, r in results.items()}, {i: "x" * i for i in range(8)})
+        self.assertLess(len(self.engine.batches), 8)
+
+    def test_falls_back_to_vader_when_server_is_down(self):
+        self.client.preload()
+        self.server.close()
+        result = self.client.analyze_statement("I love this")
+        self.assertEqual(result['label'], 'Positive')
+        self.assertFalse(self.client.has_hinglish_model)
+
+
+class TestHungServer(unittest.TestCase):
+    """
+    A server that answers status requests but never analyze_many.
+    """
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "hung.sock")
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.listener.bind(self.path)
+        self.listener.listen()
+        self.accepted = []
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.listener.accept()
+            except OSError:
+                return
+            self.accepted.append(conn)
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        try:
+            while True:
+                request = recv_message(conn)
+                if request is None:
+                    return
+                if request['method'] == 'status':
+                    send_message(conn, {'result': {'pid': 0, 'hinglish_model': True}})
+        except OSError:
+            return
+
+    def tearDown(self):
+        self.listener.close()
+        for conn in self.accepted:
+            conn.close()
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+    def test_read_timeout_falls_back_without_resending(self):
+        client = EngineClient(self.path, timeout=0.2)
+        client.preload()
+        start = time.monotonic()
+        result = client.analyze_statement("I love this")
+        self.assertLess(time.monotonic() - start, 1.0)
+        self.assertEqual(result['label'], 'Positive')
+        self.assertEqual(len(self.accepted), 1)
+        client.close()
+
+
+class TestRegistryClient(unittest.TestCase):
+    def test_socket_env_selects_client(self):
+        with mock.patch.dict(os.environ, {"INFERENCE_SERVER_SOCKET": "/tmp/missing.sock"}):
+            engine = registry._engine_from_env()
+        self.assertIsInstance(engine, EngineClient)
+        self.assertEqual(engine.path, "/tmp/missing.sock")
+
+    def test_client_timeout_is_below_the_executor_deadline(self):
+        env = {"INFERENCE_SERVER_SOCKET": "/tmp/missing.sock", "INFERENCE_TIMEOUT_S": "6"}
+        with mock.patch.dict(os.environ, env):
+            engine = registry._engine_from_env()
+        self.assertEqual(engine.timeout, 4.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
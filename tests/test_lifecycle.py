@@ -0,0 +1,71 @@
+import subprocess
+import sys
+import unittest
+
+from src.backends import LocalPipelineBackend, RemoteMultilingualBackend
+from src.cache import SentimentCache
+from src.lifecycle import FAILED, READY, ModelLoader
+from src.sentiment import SentimentEngine
+from tests.helpers import FakeEngine
+
+
+class RefusingClient:
+    def text_classification(self, text, model=None):
+        raise AssertionError("warm-up must not call the remote API")
+
+
+class TestModelLoader(unittest.TestCase):
+    def test_background_load_reports_readiness(self):
+        engine = FakeEngine()
+        engine.release.clear()
+        loader = ModelLoader(engine).start()
+        self.assertFalse(loader.ready)
+        self.assertEqual(loader.status()['status'], 'loading')
+
+        engine.release.set()
+        self.assertTrue(loader.wait(5))
+        self.assertEqual(engine.calls, ['preload', 'warm_up'])
+        self.assertTrue(loader.status()['hinglish_model'])
+
+    def test_failed_load(self):
+        engine = FakeEngine(fail=True)
+        loader = ModelLoader(engine, mode='sync').start()
+        self.assertEqual(loader.state, FAILED)
+        self.assertEqual(loader.status()['error'], "model missing")
+
+    def test_off_is_ready_without_loading(self):
+        engine = FakeEngine()
+        loader = ModelLoader(engine, mode='off').start()
+        self.assertEqual(loader.state, READY)
+        self.assertEqual(engine.calls, [])
+
+    def test_warm_up_skips_remote_and_cache(self):
+        remote = RemoteMultilingualBackend("remote-model")
+        remote.client = RefusingClient()
+        cache = SentimentCache()
+        batches = []
+
+        def pipe(texts, **kwargs):
+            batches.append(list(texts))
+            return [{'label': 'neutral', 'score': 0.5} for _ in texts]
+
+        engine = SentimentEngine(
+            cache=cache, multilingual_backend=remote,
+            hinglish_backend=LocalPipelineBackend("hinglish", pipeline_factory=lambda: pipe)
+        )
+        engine.warm_up(rounds=2)
+
+        self.assertEqual(len(batches), 2)
+        self.assertEqual(cache.stats()['entries'], 0)
+
+
+class TestColdImport(unittest.TestCase):
+    def test_engine_import_defers_heavy_modules(self):
+        code = ("import sys, src.sentiment, src.chatbot; "
+                "print(sorted(m for m in ('transformers', 'torch', 'huggingface_hub', 'nltk') if m in sys.modules))")
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.strip(), "[]")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import io
+import json
+import logging
+import unittest
+
+from src.logging_config import configure_logging, stop_logging
+from src.sentiment import SentimentEngine
+
+
+class RecordingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class TestLogging(unittest.TestCase):
+    def setUp(self):
+        self.handler = RecordingHandler()
+        self.logger = logging.getLogger("src")
+        self.logger.addHandler(self.handler)
+        self.level = self.logger.level
+
+    def tearDown(self):
+        self.logger.removeHandler(self.handler)
+        self.logger.setLevel(self.level)
+        stop_logging()
+
+    def analyze(self, texts):
+        engine = SentimentEngine()
+        engine.use_vader = True
+        return engine.analyze_many(texts)
+
+    def test_one_analysis_record_per_statement(self):
+        self.logger.setLevel(logging.INFO)
+        self.analyze(["I love it", "I hate it"])
+
+        analyses = [r for r in self.handler.records if r.getMessage() == "analysis"]
+        self.assertEqual([r.label for r in analyses], ['Positive', 'Negative'])
+        self.assertEqual({r.backend for r in analyses}, {'vader'})
+        self.assertTrue(all(r.latency_ms >= 0 and r.batch_size == 2 for r in analyses))
+        self.assertFalse([r for r in self.handler.records if r.levelno == logging.DEBUG])
+
+    def test_debug_is_level_gated(self):
+        self.logger.setLevel(logging.DEBUG)
+        self.analyze(["I love it"])
+        self.assertTrue([r for r in self.handler.records if r.levelno == logging.DEBUG])
+
+        self.handler.records.clear()
+        self.logger.setLevel(logging.WARNING)
+        self.analyze(["I love it"])
+        self.assertEqual(self.handler.records, [])
+
+    def test_json_lines_through_the_queue(self):
+        stream = io.StringIO()
+        configure_logging(level="INFO", fmt="json", stream=stream)
+        logging.getLogger("src.sentiment").info("analysis", extra={'backend': 'vader', 'label': 'Positive'})
+        stop_logging()
+
+        entry = json.loads(stream.getvalue().strip())
+        self.assertEqual(entry['message'], "analysis")
+        self.assertEqual(entry['backend'], 'vader')
+        self.assertEqual(entry['level'], 'INFO')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+
+from src import metrics
+from src.metrics import MetricsRegistry
+from src.sentiment import SentimentEngine
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def test_counter_and_gauge_text_format(self):
+        counter = self.registry.counter("requests_total", "Requests.", ("code",))
+        counter.inc(code=200)
+        counter.inc(2, code=200)
+        gauge = self.registry.gauge("depth", "Queue depth.")
+        gauge.set_function(lambda: 7)
+
+        text = self.registry.render()
+        self.assertIn("# TYPE requests_total counter", text)
+        self.assertIn('requests_total{code="200"} 3', text)
+        self.assertIn("depth 7", text)
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = self.registry.histogram("latency_seconds", "Latency.", ("stage",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value, stage="route")
+
+        text = self.registry.render()
+        self.assertIn('latency_seconds_bucket{stage="route",le="0.1"} 1', text)
+        self.assertIn('latency_seconds_bucket{stage="route",le="1.0"} 2', text)
+        self.assertIn('latency_seconds_bucket{stage="route",le="+Inf"} 3', text)
+        self.assertIn('latency_seconds_count{stage="route"} 3', text)
+        self.assertIn('latency_seconds_sum{stage="route"} 5.55', text)
+
+    def test_label_values_are_escaped(self):
+        counter = self.registry.counter("odd_total", "Odd labels.", ("name",))
+        counter.inc(name='say "hi"\n')
+        self.assertIn('odd_total{name="say \\"hi\\"\\n"} 1', self.registry.render())
+
+    def test_wrong_labels_rejected(self):
+        counter = self.registry.counter("typed_total", "Typed.", ("backend",))
+        with self.assertRaises(ValueError):
+            counter.inc(stage="route")
+        with self.assertRaises(ValueError):
+            self.registry.counter("typed_total", "Again.")
+
+
+class TestEngineMetrics(unittest.TestCase):
+    def test_engine_records_stages_and_fallbacks(self):
+        engine = SentimentEngine()
+        engine.use_vader = True
+        analyzed = metrics.ANALYSES.value(backend='vader')
+        forced = metrics.FALLBACKS.value(reason='forced')
+        vader_calls = metrics.BACKEND_SECONDS.count(backend='vader')
+
+        engine.analyze_many(["I love it", "I hate it"])
+
+        self.assertEqual(metrics.ANALYSES.value(backend='vader'), analyzed + 2)
+        self.assertEqual(metrics.FALLBACKS.value(reason='forced'), forced + 2)
+        self.assertEqual(metrics.BACKEND_SECONDS.count(backend='vader'), vader_calls + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+
+from src.ratelimit import RateLimited, RateLimiter, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_burst_then_refill(self):
+        bucket = TokenBucket(rate=2.0, burst=3, now=0.0)
+        self.assertEqual([bucket.take(0.0) for _ in range(3)], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(bucket.take(0.0), 0.5)
+        # Half a second refills one token
+        self.assertEqual(bucket.take(0.5), 0.0)
+        self.assertGreater(bucket.take(0.5), 0.0)
+
+
+class TestRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def test_sessions_are_limited_independently(self):
+        limiter = RateLimiter(session_rate=1.0, session_burst=2, clock=self.clock)
+        limiter.check('a')
+        limiter.check('a')
+        with self.assertRaises(RateLimited) as raised:
+            limiter.check('a')
+        self.assertEqual(raised.exception.scope, 'session')
+        self.assertAlmostEqual(raised.exception.retry_after, 1.0)
+
+        limiter.check('b')
+        self.clock.now += 1.0
+        limiter.check('a')
+
+    def test_global_limit_keeps_the_session_token(self):
+        limiter = RateLimiter(session_rate=1.0, session_burst=1, global_rate=1.0, global_burst=1, clock=self.clock)
+        limiter.check('a')
+        with self.assertRaises(RateLimited) as raised:
+            limiter.check('b')
+        self.assertEqual(raised.exception.scope, 'global')
+
+        # 'b' was refused by the global bucket, so its own token is still there
+        self.clock.now += 1.0
+        limiter.check('b')
+
+    def test_zero_rate_disables_the_limit(self):
+        limiter = RateLimiter(session_rate=0, clock=self.clock)
+        for _ in range(1000):
+            limiter.check('a')
+        self.assertEqual(limiter.sessions, 0)
+
+    def test_session_buckets_are_bounded(self):
+        limiter = RateLimiter(session_rate=1.0, session_burst=1, max_sessions=100, clock=self.clock)
+        for i in range(1000):
+            limiter.check(f"user-{i}")
+        self.assertEqual(limiter.sessions, 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
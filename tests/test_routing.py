@@ -0,0 +1,43 @@
+import unittest
+from src.routing import LanguageRouter
+from src.sentiment import SentimentEngine
+
+
+class TestLanguageRouter(unittest.TestCase):
+    def setUp(self):
+        self.router = SentimentEngine().router
+
+    def test_readme_examples(self):
+        self.assertTrue(self.router.is_hinglish("tu mujhe pasandh heh"))
+        self.assertTrue(self.router.is_hinglish("yeh bahut acha hai bhai"))
+        self.assertFalse(self.router.is_hinglish("I am happy"))
+        self.assertFalse(self.router.is_hinglish("मुझे यह पसंद है"))
+
+    def test_punctuation_and_case(self):
+        self.assertTrue(self.router.is_hinglish("Bhai, SAHI hai!!"))
+        self.assertTrue(self.router.is_hinglish("kya?"))
+
+    def test_lone_ambiguous_word_is_not_enough(self):
+        # 'the' and 'main' are Hinglish keywords but also plain English
+        self.assertFalse(self.router.is_hinglish("This is the best day"))
+        router = LanguageRouter({'main', 'hai'}, use_langdetect=False)
+        self.assertFalse(router.is_hinglish("the main thing"))
+        self.assertTrue(router.is_hinglish("main yahan hai"))
+
+    def test_several_ambiguous_words_are_not_enough(self):
+        # Two ambiguous words used to add up to a full keyword
+        for text in ("I love the sun", "The main reason is the price", "Is the main door open?"):
+            self.assertFalse(self.router.is_hinglish(text), text)
+        router = LanguageRouter({'main', 'the', 'sun', 'hai'}, use_langdetect=False)
+        self.assertFalse(router.is_hinglish("the main sun"))
+        self.assertTrue(router.is_hinglish("main sun hai"))
+
+    def test_deterministic(self):
+        texts = ["ok ab chalo", "see you at the park", "kam se kam", "ya sure"]
+        first = [self.router.is_hinglish(t) for t in texts]
+        for _ in range(5):
+            self.assertEqual([self.router.is_hinglish(t) for t in texts], first)
+
+
+if __name__ == '__main__':
+    unittest.main()
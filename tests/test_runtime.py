@@ -0,0 +1,128 @@
+import importlib.util
+import shutil
+import tempfile
+import unittest
+
+from src import runtime
+from src.backends import HINGLISH_MODEL_ID, LocalPipelineBackend
+from src.runtime import build_text_classifier
+from src.testing import build_tiny_model
+
+TEXTS = ["yeh bahut acha hai", "bilkul bekaar movie", "kal milte hai", "mast hai yaar"]
+WORDS = ["yeh", "bahut", "acha", "hai", "bilkul", "bekaar", "movie", "kal", "milte", "mast", "yaar"]
+
+# Largest per-class probability difference tolerated against the fp32 model
+MAX_SCORE_DRIFT = 0.05
+
+
+def probabilities(pipe, texts):
+    outputs = pipe(texts, top_k=None)
+    return [{output['label']: output['score'] for output in scores} for scores in outputs]
+
+
+class TestRuntimes(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.model_dir = tempfile.mkdtemp()
+        build_tiny_model(cls.model_dir, WORDS)
+        cls.reference, _ = build_text_classifier(cls.model_dir, local_files_only=True)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.model_dir, ignore_errors=True)
+
+    def assert_parity(self, runtime_name):
+        pipe, used = build_text_classifier(self.model_dir, runtime=runtime_name, local_files_only=True)
+        self.assertEqual(used, runtime_name)
+        for expected, actual in zip(probabilities(self.reference, TEXTS), probabilities(pipe, TEXTS)):
+            self.assertEqual(set(expected), set(actual))
+            for label in expected:
+                self.assertAlmostEqual(expected[label], actual[label], delta=MAX_SCORE_DRIFT)
+
+    def test_quantized_matches_fp32(self):
+        self.assert_parity('quantized')
+
+    @unittest.skipUnless(importlib.util.find_spec("optimum") and importlib.util.find_spec("onnxruntime"),
+                         "optimum[onnxruntime] not installed")
+    def test_onnx_matches_fp32(self):
+        self.assert_parity('onnx')
+
+    def test_falls_back_to_torch(self):
+        original = runtime._BUILDERS['onnx']
+
+        def broken(*args):
+            raise ImportError("no onnxruntime")
+
+        runtime._BUILDERS['onnx'] = broken
+        try:
+            pipe, used = build_text_classifier(self.model_dir, runtime='onnx', local_files_only=True)
+        finally:
+            runtime._BUILDERS['onnx'] = original
+        self.assertEqual(used, 'torch')
+        self.assertEqual(len(pipe(TEXTS)), len(TEXTS))
+
+    def test_unknown_runtime(self):
+        with self.assertRaises(ValueError):
+            build_text_classifier(self.model_dir, runtime='tensorrt')
+
+    def test_backend_records_runtime(self):
+        backend = LocalPipelineBackend("tiny", model_path=self.model_dir, runtime='quantized', intra_op_threads=1)
+        labels = [label for label, _ in backend.classify(TEXTS)]
+        self.assertEqual(backend.runtime_used, 'quantized')
+        self.assertTrue(set(labels) <= {'negative', 'neutral', 'positive'})
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.model_dir = tempfile.mkdtemp()
+        self.snapshot_dir = tempfile.mkdtemp()
+        build_tiny_model(self.model_dir, WORDS)
+
+    def tearDown(self):
+        shutil.rmtree(self.model_dir, ignore_errors=True)
+        shutil.rmtree(self.snapshot_dir, ignore_errors=True)
+
+    def test_snapshot_round_trip(self):
+        original = LocalPipelineBackend("tiny", model_path=self.model_dir)
+        original.save_snapshot(self.snapshot_dir)
+        restored = LocalPipelineBackend("tiny", model_path=self.snapshot_dir)
+        self.assertEqual(original.classify(TEXTS), restored.classify(TEXTS))
+
+    def test_quantized_snapshot_refused(self):
+        backend = LocalPipelineBackend("tiny", model_path=self.model_dir, runtime='quantized')
+        with self.assertRaises(ValueError):
+            backend.save_snapshot(self.snapshot_dir)
+
+
+class TestHinglishModelParity(unittest.TestCase):
+    """
+    Bounds label and score drift of the optimized runtimes against the fp32
+    Hinglish model. Skipped when the model cannot be loaded (e.g. offline).
+    """
+    texts = ["yeh movie bahut acchi thi", "bilkul bekaar service hai yaar", "kal office jaana hai",
+             "tum bahut ache ho", "mujhe yeh pasand nahi aaya"]
+
+    @classmethod
+    def setUpClass(cls):
+        try:
+            cls.reference, _ = build_text_classifier(HINGLISH_MODEL_ID)
+        except Exception as e:
+            raise unittest.SkipTest(f"Hinglish model unavailable: {e}")
+
+    def assert_parity(self, runtime_name):
+        pipe, used = build_text_classifier(HINGLISH_MODEL_ID, runtime=runtime_name)
+        if used != runtime_name:
+            self.skipTest(f"{runtime_name} runtime unavailable")
+        for expected, actual in zip(self.reference(self.texts), pipe(self.texts)):
+            self.assertEqual(expected['label'], actual['label'])
+            self.assertAlmostEqual(expected['score'], actual['score'], delta=MAX_SCORE_DRIFT)
+
+    def test_quantized_parity(self):
+        self.assert_parity('quantized')
+
+    def test_onnx_parity(self):
+        self.assert_parity('onnx')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+from src.chatbot import Chatbot
+from src.session_store import InMemorySessionStore, SessionConflict, SqliteSessionStore
+from tests.helpers import FakeEngine
+
+
+def new_bot(max_history=None):
+    return Chatbot(sentiment_engine=FakeEngine(), max_history=max_history)
+
+
+class TestInMemorySessionStore(unittest.TestCase):
+    def test_max_sessions_evicts_least_recently_used(self):
+        store = InMemorySessionStore(new_bot, max_sessions=2, idle_timeout=None)
+        first = store.get('a')
+        store.get('b')
+        store.get('a') # 'b' is now least recently used
+        store.get('c')
+
+        self.assertEqual(len(store), 2)
+        self.assertNotIn('b', store)
+        self.assertIs(store.get('a'), first)
+
+    def test_idle_sessions_are_evicted(self):
+        store = InMemorySessionStore(new_bot, idle_timeout=0.01)
+        store.get('a')
+        time.sleep(0.02)
+        self.assertIsNone(store.get('a', create=False))
+        self.assertEqual(store.evictions, 1)
+
+    def test_save_after_reset_conflicts(self):
+        store = InMemorySessionStore(new_bot, idle_timeout=None)
+        bot = store.get('a')
+        store.reset('a')
+        bot.process_user_input("in flight")
+        with self.assertRaises(SessionConflict):
+            store.save('a', bot)
+        self.assertEqual(store.get('a').history, [])
+
+
+class TestSqliteSessionStore(unittest.TestCase):
+    def test_sessions_are_shared_through_the_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'sessions.db')
+            worker_a = SqliteSessionStore(new_bot, path=path)
+            worker_b = SqliteSessionStore(new_bot, path=path)
+
+            bot = worker_a.get('user')
+            bot.process_user_input("hello")
+            worker_a.save('user', bot)
+
+            # Another worker (or a restarted one) rehydrates the same conversation
+            restored = worker_b.get('user', create=False)
+            self.assertEqual(len(restored.history), 2)
+            self.assertEqual(restored.user_statements_analysis[0]['text'], "hello")
+
+            worker_b.reset('user')
+            self.assertEqual(worker_a.get('user').history, [])
+            worker_a.close()
+            worker_b.close()
+
+    def test_stale_save_conflicts(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'sessions.db')
+            worker_a = SqliteSessionStore(new_bot, path=path)
+            worker_b = SqliteSessionStore(new_bot, path=path)
+            worker_a.save('user', worker_a.get('user'))
+
+            first, second = worker_a.get('user'), worker_b.get('user')
+            first.process_user_input("one")
+            second.process_user_input("two")
+            worker_a.save('user', first)
+            with self.assertRaises(SessionConflict):
+                worker_b.save('user', second)
+
+            # A reset wins over a save that started before it
+            stale = worker_a.get('user')
+            worker_b.reset('user')
+            stale.process_user_input("three")
+            with self.assertRaises(SessionConflict):
+                worker_a.save('user', stale)
+            self.assertEqual(worker_b.get('user').history, [])
+            worker_a.close()
+            worker_b.close()
+
+    def test_concurrent_writers_keep_every_turn(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'sessions.db')
+            workers = [SqliteSessionStore(new_bot, path=path) for _ in range(4)]
+            start = threading.Barrier(len(workers))
+
+            def chat(store, text):
+                start.wait()
+                while True:
+                    bot = store.get('user')
+                    bot.process_user_input(text)
+                    try:
+                        store.save('user', bot)
+                        return
+                    except SessionConflict:
+                        pass
+
+            threads = [threading.Thread(target=chat, args=(store, f"message {i}")) for i, store in enumerate(workers)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            bot = workers[0].get('user')
+            self.assertEqual(sorted(a['text'] for a in bot.user_statements_analysis),
+                             [f"message {i}" for i in range(4)])
+            self.assertEqual(bot.analytics.count, 4)
+            for store in workers:
+                store.close()
+
+    def test_unversioned_file_is_migrated(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'sessions.db')
+            db = sqlite3.connect(path)
+            db.execute("CREATE TABLE sessions (user_id TEXT PRIMARY KEY, state TEXT NOT NULL, last_seen REAL NOT NULL)")
+            db.execute("INSERT INTO sessions VALUES ('user', '{\"history\": []}', ?)", (time.time(),))
+            db.commit()
+            db.close()
+
+            store = SqliteSessionStore(new_bot, path=path)
+            bot = store.get('user', create=False)
+            self.assertEqual(bot.store_version, 1)
+            bot.process_user_input("hello")
+            store.save('user', bot)
+            self.assertEqual(len(store.get('user').history), 2)
+            store.close()
+
+
+class TestHistoryCap(unittest.TestCase):
+    def test_history_is_capped(self):
+        bot = new_bot(max_history=4)
+        for i in range(10):
+            bot.process_user_input(f"message {i}")
+
+        self.assertEqual(len(bot.history), 4)
+        self.assertEqual(bot.history[0]['content'], "message 8")
+        self.assertEqual(len(bot.user_statements_analysis), 2)
+
+    def test_turns_since_cursor(self):
+        bot = new_bot(max_history=4)
+        bot.process_user_input("first")
+        cursor = bot.cursor
+        bot.process_user_input("second")
+
+        delta = bot.turns_since(cursor)
+        self.assertEqual([t['role'] for t in delta], ['user', 'bot'])
+        self.assertEqual(delta[0]['content'], "second")
+        self.assertEqual(bot.cursor, 4)
+
+        # Sequence numbers stay stable once old turns are trimmed
+        for i in range(3):
+            bot.process_user_input(f"more {i}")
+        self.assertEqual(bot.history_offset, 6)
+        self.assertEqual(bot.turns_since(8)[0]['content'], "more 2")
+        self.assertEqual(len(bot.turns_since(0)), 4)
+        self.assertEqual(bot.history_page(6, 1)[0]['content'], "more 1")
+
+
+if __name__ == '__main__':
+    unittest.main()
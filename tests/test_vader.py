@@ -0,0 +1,69 @@
+import unittest
+
+from nltk.sentiment.vader import SentimentIntensityAnalyzer
+
+from src.sentiment import SentimentEngine
+from src.vader import BatchVader
+
+# polarity_scores rounds to 3 decimals; the batch path rounds in NumPy
+TOLERANCE = 0.0011
+
+TEXTS = [
+    "I love this!",
+    "The food was GOOD, the service bad.",
+    "Worst experience EVER!!!",
+    "why is this so complicated??",
+    "It isn't that great, but the staff were kind.",
+    "I am not happy at all",
+    "It was kind of okay",
+    "at least it works",
+    "least helpful answer",
+    "never so happy",
+    "yeah right, that was the bomb",
+    "I'm extremely happy :)",
+    "hello?!",
+    "",
+    "a",
+    "ok ok ok good good",
+    "(great) movie, terrible ending...",
+]
+
+
+class TestBatchVader(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.analyzer = SentimentIntensityAnalyzer()
+
+    def setUp(self):
+        self.vader = BatchVader(self.analyzer)
+
+    def test_matches_polarity_scores(self):
+        for text, actual in zip(TEXTS, self.vader.analyze_many(TEXTS)):
+            expected = self.analyzer.polarity_scores(text)
+            for key in expected:
+                self.assertAlmostEqual(expected[key], actual[key], delta=TOLERANCE, msg=f"{text!r} {key}")
+
+    def test_plain_messages_skip_rule_code(self):
+        self.vader.analyze_many(["I love the movie", "terrible food", "I'm not sure"])
+        self.assertEqual(self.vader.fast_path_hits, 2)
+        self.assertEqual(self.vader.fallbacks, 1)
+
+    def test_engine_scores_fallback_in_one_batch(self):
+        calls = []
+
+        class Recording(BatchVader):
+            def analyze_many(self, texts):
+                calls.append(len(texts))
+                return super().analyze_many(texts)
+
+        engine = SentimentEngine()
+        engine.use_vader = True
+        engine.vader = Recording(self.analyzer)
+        results = engine.analyze_many(["I love it", "I hate it", "see you tomorrow"])
+
+        self.assertEqual(calls, [3])
+        self.assertEqual([r['label'] for r in results], ['Positive', 'Negative', 'Neutral'])
+
+
+if __name__ == '__main__':
+    unittest.main()